@@ -0,0 +1,219 @@
+"""Time equipment parsing, Ferminator to Tilt linking and entity property reads.
+
+Synthetic accounts with 10 to 10,000 devices and a mix of Ferminators and Tilts
+are parsed the way every equipment refresh and device twin push is handled:
+- parse: build the equipment models from the equipment JSON
+- link: connect every Ferminator to its Tilts
+- read: read the properties each entity reads when writing its state
+- list: list_equipment end-to-end against the local fake backend
+
+Results can be saved and compared against an earlier run to catch regressions.
+
+Usage: python -m benchmarks.equipment_parsing [--sizes N ...] [--tilt-ratios R ...]
+    [--repeat N] [--output results.json] [--compare baseline.json]
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from collections.abc import Callable
+from typing import Any
+
+from custom_components.brewcreator.api import (
+    BrewCreatorAPI,
+    BrewCreatorEquipment,
+    Ferminator,
+    FerminatorMode,
+    Tilt,
+    TokenBucketRateLimiter,
+    _link_connected_equipment,
+)
+from tests.fake_brewcreator import (
+    FakeBrewCreator,
+    MemoryTokenStorage,
+    ferminator_json,
+    tilt_json,
+)
+
+
+def _read_batch_info(e: BrewCreatorEquipment, field: str) -> Any:
+    batch_info = e.batch_info
+    return getattr(batch_info, field) if batch_info is not None else None
+
+
+# Properties read by the state of each Ferminator entity, availability included
+FERMINATOR_ENTITY_READS: list[Callable[[Ferminator], Any]] = [
+    # Climate
+    lambda e: e.actual_temperature,
+    lambda e: e.target_temperature,
+    lambda e: e.mode != FerminatorMode.READY,
+    lambda e: e.mode,
+    lambda e: e.fan_speed,
+    lambda e: e.is_connected,
+    # Sensors
+    lambda e: (e.last_activity_time, e.is_connected),
+    lambda e: (_read_batch_info(e, "brew_date"), e.is_connected),
+    lambda e: (_read_batch_info(e, "owner"), e.is_connected),
+    lambda e: (_read_batch_info(e, "ebc"), e.is_connected),
+    lambda e: (_read_batch_info(e, "ibu"), e.is_connected),
+    lambda e: (_read_batch_info(e, "volume"), e.is_connected),
+    lambda e: (_read_batch_info(e, "fermentation_type"), e.is_connected),
+    lambda e: (_read_batch_info(e, "beer_style"), e.is_connected),
+    # Numbers, switch and text
+    lambda e: (_read_batch_info(e, "og"), e.is_connected),
+    lambda e: (_read_batch_info(e, "fg"), e.is_connected),
+    lambda e: (e.is_logging_data, e.is_connected),
+    lambda e: (_read_batch_info(e, "brew_name"), e.is_connected),
+]
+
+
+def _tilt_available(e: Tilt) -> bool:
+    return (
+        e.specific_gravity is not None or e.actual_temperature is not None
+    ) and e.last_activity_time is not None
+
+
+# Properties read by the state of each Tilt entity, availability included
+TILT_ENTITY_READS: list[Callable[[Tilt], Any]] = [
+    lambda e: (e.actual_temperature, _tilt_available(e)),
+    lambda e: (e.specific_gravity, _tilt_available(e)),
+    lambda e: (e.last_activity_time, _tilt_available(e)),
+    lambda e: (e.abv, _tilt_available(e)),
+]
+
+
+def generate_equipment_json(size: int, tilt_ratio: float) -> list[dict[str, Any]]:
+    """Generate equipment JSON where each Ferminator is connected to a Tilt."""
+    tilts = round(size * tilt_ratio)
+    ferminators = size - tilts
+    equipment = [tilt_json(f"t{i}", sg=1 + i % 50 / 1000) for i in range(tilts)]
+    equipment += [
+        ferminator_json(f"f{i}", [f"t{i % tilts}"] if tilts else [])
+        for i in range(ferminators)
+    ]
+    return equipment
+
+
+def parse(
+    api: BrewCreatorAPI, data: list[dict[str, Any]]
+) -> list[BrewCreatorEquipment]:
+    return [api._BrewCreatorAPI__get_equipment_from_json(e) for e in data]
+
+
+def link(equipment: list[BrewCreatorEquipment]) -> None:
+    _link_connected_equipment({e.id: e for e in equipment})
+
+
+def read(equipment: list[BrewCreatorEquipment]) -> None:
+    for e in equipment:
+        reads = (
+            FERMINATOR_ENTITY_READS if isinstance(e, Ferminator) else TILT_ENTITY_READS
+        )
+        for r in reads:
+            r(e)
+
+
+async def list_equipment(data: list[dict[str, Any]], repeat: int) -> list[float]:
+    unlimited = float("inf")
+    async with FakeBrewCreator(data) as server:
+        api = BrewCreatorAPI(
+            server.username,
+            server.password,
+            MemoryTokenStorage(),
+            read_rate_limiter=TokenBucketRateLimiter(unlimited, unlimited),
+            api_url=server.url,
+            identity_url=server.url,
+        )
+        try:
+            await api.verify_username_and_password()
+            timings = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                await api.list_equipment()
+                timings.append(time.perf_counter() - start)
+            return timings
+        finally:
+            await api.close()
+
+
+async def measure(
+    size: int, tilt_ratio: float, repeat: int, end_to_end: bool
+) -> dict[str, float]:
+    data = generate_equipment_json(size, tilt_ratio)
+    api = BrewCreatorAPI("user", "password", MemoryTokenStorage())
+    timings: dict[str, list[float]] = {"parse": [], "link": [], "read": []}
+    for _ in range(repeat):
+        start = time.perf_counter()
+        equipment = parse(api, data)
+        timings["parse"].append(time.perf_counter() - start)
+        start = time.perf_counter()
+        link(equipment)
+        timings["link"].append(time.perf_counter() - start)
+        start = time.perf_counter()
+        read(equipment)
+        timings["read"].append(time.perf_counter() - start)
+    await api.close()
+    if end_to_end:
+        timings["list"] = await list_equipment(data, repeat)
+    return {name: statistics.median(t) for name, t in timings.items()}
+
+
+def _key(size: int, tilt_ratio: float) -> str:
+    return f"{size}/{tilt_ratio:g}"
+
+
+async def run(
+    args: argparse.Namespace, baseline: dict[str, dict[str, float]]
+) -> dict[str, dict[str, float]]:
+    results = {}
+    print(
+        f"{'devices/tilts':<14} {'phase':<6} {'ms':>10} {'us/device':>10} {'change':>8}"
+    )
+    for size in args.sizes:
+        for tilt_ratio in args.tilt_ratios:
+            key = _key(size, tilt_ratio)
+            results[key] = await measure(
+                size, tilt_ratio, args.repeat, not args.no_end_to_end
+            )
+            for phase, seconds in results[key].items():
+                previous = baseline.get(key, {}).get(phase)
+                change = f"{seconds / previous - 1:+.0%}" if previous else ""
+                print(
+                    f"{key:<14} {phase:<6} {seconds * 1e3:>10.3f} "
+                    f"{seconds / size * 1e6:>10.2f} {change:>8}"
+                )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 10000])
+    parser.add_argument(
+        "--tilt-ratios",
+        type=float,
+        nargs="+",
+        default=[0.0, 0.5, 0.9],
+        help="fraction of the devices that are Tilts",
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--no-end-to-end", action="store_true", help="skip list_equipment timings"
+    )
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="compare against results from this file")
+    args = parser.parse_args()
+    # Files are read and written outside the event loop the timings run in
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    results = asyncio.run(run(args, baseline))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Compare decoding cost and frame size of the SignalR JSON and MessagePack protocols.
+
+Usage: python -m benchmarks.signalr_protocols [--frames N] [--batch N]
+"""
+
+import argparse
+import json
+import random
+import time
+import zlib
+from datetime import UTC, datetime, timedelta
+
+import msgpack
+
+from custom_components.brewcreator.api import (
+    SignalRJsonProtocol,
+    SignalRMessagePackProtocol,
+)
+
+# Device twin update as pushed for a Ferminator on the telemetry socket
+DEVICE_TWIN_UPDATE = {
+    "id": "3fa85f64-5717-4562-b3fc-2c963f66afa6",
+    "iotHubBrewEquipmentId": "FERMINATOR-0001",
+    "actualTemperature": 18.4,
+    "setTemperature": 18.0,
+    "fanSpeed": 2,
+    "lProcess": "Cooling",
+    "lStatus": "Start",
+    "isRegulatingTemperature": True,
+    "lastActivityTime": datetime(2024, 10, 1, 12, 0, tzinfo=UTC),
+    "deviceTwinState": {
+        "connectionState": "Connected",
+        "reportedSwVersion": "1.4.2",
+        "reportedHwVersion": "2.0",
+    },
+}
+
+
+def generate_updates(count: int) -> list[dict]:
+    rng = random.Random(42)
+    updates = []
+    for i in range(count):
+        update = dict(DEVICE_TWIN_UPDATE)
+        update["iotHubBrewEquipmentId"] = f"FERMINATOR-{i % 12:04d}"
+        update["actualTemperature"] = round(rng.uniform(4, 24), 1)
+        update["lastActivityTime"] = DEVICE_TWIN_UPDATE["lastActivityTime"] + timedelta(
+            seconds=i
+        )
+        updates.append(update)
+    return updates
+
+
+def json_frame(updates: list[dict]) -> str:
+    return "".join(
+        json.dumps(
+            {"type": 1, "target": "devicetwin", "arguments": [u]},
+            separators=(",", ":"),
+            default=datetime.isoformat,
+        )
+        + SignalRJsonProtocol.RECORD_SEPARATOR
+        for u in updates
+    )
+
+
+def messagepack_frame(updates: list[dict]) -> bytes:
+    frame = bytearray()
+    for update in updates:
+        payload = msgpack.packb([1, {}, None, "devicetwin", [update]], datetime=True)
+        length = len(payload)
+        while length >= 0x80:
+            frame.append((length & 0x7F) | 0x80)
+            length >>= 7
+        frame.append(length)
+        frame += payload
+    return bytes(frame)
+
+
+def deflated_size(data: bytes) -> int:
+    compressor = zlib.compressobj(wbits=-zlib.MAX_WBITS)
+    return len(compressor.compress(data) + compressor.flush(zlib.Z_SYNC_FLUSH))
+
+
+def measure(protocol, frames: list) -> tuple[float, int, int]:
+    start = time.perf_counter()
+    messages = 0
+    for frame in frames:
+        messages += len(protocol.parse_messages(frame))
+    elapsed = time.perf_counter() - start
+    raw = [f.encode() if isinstance(f, str) else f for f in frames]
+    return (
+        elapsed / messages,
+        sum(len(f) for f in raw) // len(raw),
+        sum(deflated_size(f) for f in raw) // len(raw),
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--frames", type=int, default=10000)
+    parser.add_argument("--batch", type=int, default=1, help="messages per frame")
+    args = parser.parse_args()
+    updates = generate_updates(args.frames * args.batch)
+    batches = [updates[i : i + args.batch] for i in range(0, len(updates), args.batch)]
+    results = {
+        "json": measure(SignalRJsonProtocol(), [json_frame(b) for b in batches]),
+        "messagepack": measure(
+            SignalRMessagePackProtocol(), [messagepack_frame(b) for b in batches]
+        ),
+    }
+    print(f"{'protocol':<12} {'us/message':>10} {'bytes/frame':>12} {'deflated':>9}")
+    for name, (seconds, size, deflated) in results.items():
+        print(f"{name:<12} {seconds * 1e6:>10.2f} {size:>12} {deflated:>9}")
+
+
+if __name__ == "__main__":
+    main()
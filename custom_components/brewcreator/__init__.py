@@ -1,15 +1,28 @@
 """The BrewCreator integration."""
 
 import logging
+from functools import partial
+from typing import Any
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_PASSWORD, CONF_USERNAME, Platform
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import ConfigEntryError
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
 
-from .api import BrewCreatorAPI
+from .api import BrewCreatorAPI, ConnectionStagger, SignalRJsonProtocol
+from .const import (
+    CONF_HUB_PROTOCOL,
+    CONNECTION_JITTER,
+    CONNECTION_STAGGER,
+    DOMAIN,
+    MIN_REFRESH_INTERVAL,
+    REFRESH_TIMEOUT,
+    WRITE_TIMEOUT,
+)
 from .coordinator import BrewCreatorDataUpdateCoordinator
-from .token_store import BrewCreatorTokenStore
+from .snapshot_store import BrewCreatorSnapshotStore
+from .token_store import BrewCreatorTokenStore, account_key
 
 PLATFORMS: list[Platform] = [
     Platform.CLIMATE,
@@ -22,27 +35,176 @@ PLATFORMS: list[Platform] = [
 _LOGGER = logging.getLogger(__name__)
 
 
+class BrewCreatorConnectionManager:
+    """Owns the API clients of all BrewCreator accounts in Home Assistant.
+
+    Logins and WebSocket connects of all accounts are staggered, so that accounts
+    do not all connect at once after a restart or when the cloud recovers. An
+    account is used by a single config entry.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self._hass = hass
+        self._stagger = ConnectionStagger(
+            CONNECTION_STAGGER.total_seconds(), CONNECTION_JITTER.total_seconds()
+        )
+        # Account key -> coordinator of the config entry using the account
+        self._coordinators: dict[str, BrewCreatorDataUpdateCoordinator] = {}
+
+    @classmethod
+    def get(cls, hass: HomeAssistant) -> "BrewCreatorConnectionManager":
+        domain_data = hass.data.setdefault(DOMAIN, {})
+        if "connection_manager" not in domain_data:
+            domain_data["connection_manager"] = cls(hass)
+        return domain_data["connection_manager"]
+
+    def create_coordinator(
+        self, entry: ConfigEntry[BrewCreatorDataUpdateCoordinator]
+    ) -> BrewCreatorDataUpdateCoordinator:
+        username = entry.data[CONF_USERNAME]
+        account = account_key(username)
+        existing = self._coordinators.get(account)
+        if existing is not None and existing.config_entry.entry_id != entry.entry_id:
+            raise ConfigEntryError(
+                f"Account {username} is already set up by "
+                f"'{existing.config_entry.title}'"
+            )
+        api = BrewCreatorAPI(
+            username,
+            entry.data[CONF_PASSWORD],
+            BrewCreatorTokenStore.for_account(self._hass, username),
+            async_get_clientsession(self._hass),
+            min_refresh_interval=MIN_REFRESH_INTERVAL.total_seconds(),
+            hub_protocol=hub_protocol(entry),
+            connection_stagger=self._stagger,
+            read_timeout=REFRESH_TIMEOUT.total_seconds(),
+            write_timeout=WRITE_TIMEOUT.total_seconds(),
+        )
+        coordinator = BrewCreatorDataUpdateCoordinator(self._hass, api, entry)
+        self._coordinators[account] = coordinator
+        return coordinator
+
+    async def async_release(
+        self, entry: ConfigEntry[BrewCreatorDataUpdateCoordinator]
+    ) -> None:
+        """Close the API client of a config entry that is unloaded or failed setup."""
+        account = account_key(entry.data[CONF_USERNAME])
+        coordinator = self._coordinators.get(account)
+        if coordinator is None or coordinator.config_entry.entry_id != entry.entry_id:
+            return
+        del self._coordinators[account]
+        await coordinator.close()
+
+    @property
+    def health(self) -> dict[str, Any]:
+        clients = [
+            {
+                "entry_id": coordinator.config_entry.entry_id,
+                "available": coordinator.last_update_success,
+                "websocket_connected": coordinator.api.websocket_connected,
+                "circuit_breaker": coordinator.api.circuit_breaker_statistics["state"],
+            }
+            for coordinator in self._coordinators.values()
+        ]
+        return {
+            "accounts": len(clients),
+            "available": sum(c["available"] for c in clients),
+            "websockets_connected": sum(c["websocket_connected"] for c in clients),
+            "stagger": self._stagger.statistics,
+            "clients": clients,
+        }
+
+
+@callback
+def async_backfill_unique_id(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Set the account as unique ID of entries created before it was used.
+
+    The ID is left unset on entries for an account already set up by another entry,
+    which fail setup as duplicates.
+    """
+    if entry.unique_id is not None:
+        return
+    unique_id = account_key(entry.data[CONF_USERNAME])
+    if any(e.unique_id == unique_id for e in hass.config_entries.async_entries(DOMAIN)):
+        return
+    hass.config_entries.async_update_entry(entry, unique_id=unique_id)
+
+
+def hub_protocol(entry: ConfigEntry) -> str:
+    return entry.options.get(CONF_HUB_PROTOCOL, SignalRJsonProtocol.name)
+
+
 async def async_setup_entry(
     hass: HomeAssistant, entry: ConfigEntry[BrewCreatorDataUpdateCoordinator]
 ) -> bool:
     """Set up devices from BrewCreator such as Ferminator and Tilt"""
-    api = BrewCreatorAPI(
-        entry.data[CONF_USERNAME],
-        entry.data[CONF_PASSWORD],
-        BrewCreatorTokenStore(hass),
-        async_get_clientsession(hass),
-    )
-    coordinator = BrewCreatorDataUpdateCoordinator(hass, api, entry)
-    await coordinator.async_config_entry_first_refresh()
+    await BrewCreatorTokenStore.async_migrate_legacy(hass)
+    async_backfill_unique_id(hass, entry)
+    manager = BrewCreatorConnectionManager.get(hass)
+    coordinator = manager.create_coordinator(entry)
+    try:
+        # Create entities from the equipment of the previous session right away
+        # and replace it with live equipment in the background
+        restored = await coordinator.async_restore_snapshot()
+        if not restored:
+            await coordinator.async_config_entry_first_refresh()
+    except Exception:
+        await manager.async_release(entry)
+        raise
     entry.runtime_data = coordinator
-    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    entry.async_on_unload(
+        entry.add_update_listener(
+            partial(_async_update_options, connected_protocol=hub_protocol(entry))
+        )
+    )
+    try:
+        await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    except Exception:
+        await manager.async_release(entry)
+        raise
+    coordinator.async_resume_updates()
+    if restored:
+        entry.async_create_background_task(
+            hass, coordinator.async_refresh_restored(), "brewcreator first refresh"
+        )
     return True
 
 
+async def _async_update_options(
+    hass: HomeAssistant,
+    entry: ConfigEntry[BrewCreatorDataUpdateCoordinator],
+    *,
+    connected_protocol: str,
+) -> None:
+    """Reconnect with the hub protocol selected in the options.
+
+    The options also hold the batch info, which is written to the Ferminator and
+    needs no reload.
+    """
+    if hub_protocol(entry) != connected_protocol:
+        await hass.config_entries.async_reload(entry.entry_id)
+
+
 async def async_unload_entry(
     hass: HomeAssistant, entry: ConfigEntry[BrewCreatorDataUpdateCoordinator]
 ) -> bool:
     """Unload a config entry."""
-    coordinator = entry.runtime_data
-    await coordinator.close()
+    await BrewCreatorConnectionManager.get(hass).async_release(entry)
     return await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+
+
+async def async_remove_entry(
+    hass: HomeAssistant, entry: ConfigEntry[BrewCreatorDataUpdateCoordinator]
+) -> None:
+    """Remove the equipment snapshot and tokens of a removed config entry.
+
+    Tokens are kept while other entries use the same account.
+    """
+    await BrewCreatorSnapshotStore(hass, entry.entry_id).remove()
+    token_store = BrewCreatorTokenStore.for_account(hass, entry.data[CONF_USERNAME])
+    if not any(
+        BrewCreatorTokenStore.for_account(hass, e.data[CONF_USERNAME]) is token_store
+        for e in hass.config_entries.async_entries(DOMAIN)
+        if e.entry_id != entry.entry_id
+    ):
+        await token_store.remove()
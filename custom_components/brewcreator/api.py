@@ -1,20 +1,27 @@
-from abc import ABC
+from abc import ABC, abstractmethod
 import asyncio
 from asyncio import Task
 import base64
-from collections.abc import Awaitable, Callable
+import collections
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterable, Mapping
 import contextlib
+import contextvars
 from datetime import datetime, timedelta, timezone
 from enum import Enum
+import functools
 import hashlib
+import json
 import logging
+import random
 import re
 import secrets
+import time
 from typing import Any, Protocol
 import zoneinfo
 
 import aiohttp
 from aiohttp.client_exceptions import ClientConnectionResetError
+import msgpack
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -53,52 +60,106 @@ class FermentationType(Enum):
     BOTTOM = "Bottom"
 
 
+# The Tilt reports its last activity time in Danish local time, see Tilt
+_COPENHAGEN_TZ = zoneinfo.ZoneInfo("Europe/Copenhagen")
+
+
+@functools.cache
+def _enum_members(enum_type: type[Enum]) -> dict[any, Enum]:
+    return {member.value: member for member in enum_type}
+
+
+# Unknown enum values already logged, as (enum type, value)
+_unknown_enum_values: set[tuple[type[Enum], any]] = set()
+
+
+def _parse_enum(enum_type: type[Enum], value: any) -> Enum | None:
+    """Return the enum member of a value, or None for unknown values.
+
+    Each unknown value is logged once, as it is parsed on every update.
+    """
+    if value is None:
+        return None
+    member = _enum_members(enum_type).get(value)
+    if member is None and (enum_type, value) not in _unknown_enum_values:
+        _unknown_enum_values.add((enum_type, value))
+        _LOGGER.warning("Unknown %s '%s'", enum_type.__name__, value)
+    return member
+
+
+def _parse_datetime(value: str | None) -> datetime | None:
+    if value is None:
+        return None
+    return datetime.fromisoformat(value)
+
+
 class BatchInfo:
+    """Batch details of equipment, decoded once from the equipment JSON."""
+
+    __slots__ = (
+        "_beer_style",
+        "_brew_date",
+        "_brew_name",
+        "_ebc",
+        "_fermentation_type",
+        "_fg",
+        "_ibu",
+        "_og",
+        "_owner",
+        "_volume",
+    )
+
     def __init__(self, json: dict[str, any]) -> None:
-        self._json = json
+        self._brew_name: str = json.get("brewName")
+        self._brew_date = _parse_datetime(json.get("brewDate"))
+        self._owner: str = json.get("owner")
+        self._ebc: float = json.get("ebc")
+        self._ibu: float = json.get("ibu")
+        self._volume: float = json.get("volume")
+        self._fermentation_type = _parse_enum(FermentationType, json.get("fermented"))
+        self._og: float = json.get("og")
+        self._fg: float = json.get("fg")
+        self._beer_style: str = json.get("beerStyle")
 
     @property
     def brew_name(self) -> str:
-        return self._json.get("brewName")
+        return self._brew_name
 
     @property
     def brew_date(self) -> datetime | None:
-        str_date = self._json.get("brewDate")
-        if str_date is None:
-            return None
-        return datetime.fromisoformat(str_date)
+        return self._brew_date
 
     @property
     def owner(self) -> str:
-        return self._json.get("owner")
+        return self._owner
 
     @property
     def ebc(self) -> float:
-        return self._json.get("ebc")
+        return self._ebc
 
     @property
     def ibu(self) -> float:
-        return self._json.get("ibu")
+        return self._ibu
 
     @property
     def volume(self) -> float:
-        return self._json.get("volume")
+        return self._volume
 
     @property
-    def fermentation_type(self) -> FermentationType:
-        return FermentationType(self._json.get("fermented"))
+    def fermentation_type(self) -> FermentationType | None:
+        return self._fermentation_type
 
     @property
     def og(self) -> float:
-        return self._json.get("og")
+        return self._og
 
     @property
     def fg(self) -> float:
-        return self._json.get("fg")
+        return self._fg
 
     @property
     def beer_style(self) -> str:
-        return self._json.get("beerStyle")
+        return self._beer_style
 
 
 class BrewCreatorError(Exception):
@@ -113,54 +174,92 @@ class BrewCreatorAuthError(BrewCreatorError):
     pass
 
 
+class BrewCreatorCircuitOpenError(BrewCreatorError):
+    pass
+
+
+class BrewCreatorTimeoutError(BrewCreatorError):
+    pass
+
+
 class BrewCreatorEquipment(ABC):
+    """Equipment decoded once from its JSON.
+
+    Equipment is never modified after it has been created, except for linking
+    Ferminators to the connected equipment of the snapshot they belong to. Updates
+    create new equipment from the updated JSON, which stays available through json.
+    """
+
+    __slots__ = (
+        "_actual_temperature",
+        "_api",
+        "_batch_info",
+        "_equipment_type",
+        "_id",
+        "_is_logging_data",
+        "_json",
+        "_last_activity_time",
+        "_name",
+        "_serial_number",
+    )
+
     def __init__(self, api: "BrewCreatorAPI", json: dict[str, any]) -> None:
         self._api = api
         self._json = json
+        self._id: str = json["id"]
+        self._serial_number: str = json["iotHubBrewEquipmentId"]
+        self._equipment_type = (
+            _parse_enum(EquipmentType, json["iotHubBrewEquipmentGroupId"])
+            or EquipmentType.UNKNOWN
+        )
+        self._actual_temperature: float | None = json.get("actualTemperature")
+        self._name: str = json.get("name")
+        self._last_activity_time = self._parse_last_activity_time(
+            json.get("lastActivityTime")
+        )
+        self._is_logging_data: bool = json.get("isLoggingData")
+        self._batch_info = BatchInfo(json) if json.get("brewName") else None
 
     @property
     def id(self) -> str:
-        return self._json["id"]
+        return self._id
 
     @property
     def serial_number(self) -> str:
-        return self._json["iotHubBrewEquipmentId"]
+        return self._serial_number
 
     @property
     def equipment_type(self) -> EquipmentType:
-        value = self._json["iotHubBrewEquipmentGroupId"]
-        try:
-            return EquipmentType(value)
-        except ValueError:
-            _LOGGER.warning("Unknown equipment type '%s' with ID '%s'", value, self.id)
-            return EquipmentType.UNKNOWN
+        return self._equipment_type
 
     @property
     def actual_temperature(self) -> float | None:
-        return self._json["actualTemperature"]
+        return self._actual_temperature
 
     @property
     def name(self) -> str:
-        return self._json["name"]
+        return self._name
 
     @property
     def last_activity_time(self) -> datetime:
-        return datetime.fromisoformat(self._json["lastActivityTime"])
+        return self._last_activity_time
 
     @property
     def is_logging_data(self) -> bool:
-        return self._json.get("isLoggingData")
+        return self._is_logging_data
 
     @property
     def batch_info(self) -> BatchInfo | None:
-        if self._json["brewName"]:
-            return BatchInfo(self._json)
-        return None
+        return self._batch_info
 
     @property
     def json(self) -> dict[str, any]:
         return self._json
 
+    @staticmethod
+    def _parse_last_activity_time(value: str | None) -> datetime | None:
+        return _parse_datetime(value)
+
     async def set_batch_info(
         self,
         brew_name: str | None = None,
@@ -173,6 +272,7 @@ class BrewCreatorEquipment(ABC):
         fermentation_type: FermentationType | None = None,
         beer_style: str | None = None,
         is_logging_data: bool | None = None,
+        timeout: float | None = None,
     ) -> bool:
         options = {}
         if brew_name is not None:
@@ -195,113 +295,152 @@ class BrewCreatorEquipment(ABC):
             options["beerStyle"] = beer_style
         if is_logging_data is not None:
             options["isLoggingData"] = is_logging_data
-        return await self._update_equipment(options)
+        return await self._update_equipment(options, timeout)
 
-    async def _update_equipment(self, json_payload: dict[str, any]) -> bool:
-        return await self._api._update_equipment_state(self.id, json_payload)
+    async def _update_equipment(
+        self, json_payload: dict[str, any], timeout: float | None = None
+    ) -> bool:
+        return await self._api._update_equipment_state(self.id, json_payload, timeout)
 
 
 class Tilt(BrewCreatorEquipment):
+    __slots__ = ("_abv", "_color", "_specific_gravity")
+
     def __init__(self, api: "BrewCreatorAPI", json: dict[str, any]) -> None:
         super().__init__(api, json)
+        self._specific_gravity: float | None = json.get("sg")
+        self._color = _parse_enum(TiltColor, json.get("color"))
+        self._abv: float = json.get("abv")
 
     @property
     def specific_gravity(self) -> float | None:
-        return self._json["sg"]
+        return self._specific_gravity
 
     @property
-    def color(self) -> TiltColor:
-        return TiltColor(self._json["color"])
+    def color(self) -> TiltColor | None:
+        return self._color
 
     @property
     def abv(self) -> float:
-        return self._json["abv"]
+        return self._abv
 
-    @property
-    def last_activity_time(self) -> datetime:
+    @staticmethod
+    def _parse_last_activity_time(value: str | None) -> datetime | None:
         # The last activity time reported from the Tilt is not UTC. It's been observed as CEST during daylight saving time,
         # while ISO-8601 string claims it's UTC. Assume it's Danish local time and convert to UTC.
         # This has only been observed for Tilt devices (not Ferminator).
-        copenhagen_time = datetime.fromisoformat(self._json["lastActivityTime"])
-        copenhagen_tz = zoneinfo.ZoneInfo("Europe/Copenhagen")
-        aware_time = copenhagen_time.replace(tzinfo=copenhagen_tz)
+        copenhagen_time = _parse_datetime(value)
+        if copenhagen_time is None:
+            return None
+        aware_time = copenhagen_time.replace(tzinfo=_COPENHAGEN_TZ)
         return aware_time.astimezone(timezone.utc)
 
 
 class Ferminator(BrewCreatorEquipment):
+    __slots__ = (
+        "_connected_equipment",
+        "_connected_equipment_ids",
+        "_fan_speed",
+        "_hw_version",
+        "_is_connected",
+        "_mode",
+        "_status",
+        "_sw_version",
+        "_target_temperature",
+        "_temperature_source",
+    )
+
     def __init__(self, api: "BrewCreatorAPI", json: dict[str, any]) -> None:
         super().__init__(api, json)
-        self._connected_equipment_list: list[BrewCreatorEquipment] = []
+        self._fan_speed: int | None = json.get("fanSpeed")
+        self._target_temperature: float | None = json.get("setTemperature")
+        self._mode = _parse_enum(FerminatorMode, json.get("lProcess"))
+        self._status = _parse_enum(FerminatorStatus, json.get("lStatus"))
+        device_twin_state = json.get("deviceTwinState") or {}
+        self._sw_version: str = device_twin_state.get("reportedSwVersion")
+        self._hw_version: str = device_twin_state.get("reportedHwVersion")
+        self._is_connected = device_twin_state.get("connectionState") == "Connected"
+        self._connected_equipment_ids: tuple[str, ...] = tuple(
+            json.get("connectedEquipments") or ()
+        )
+        self._connected_equipment: list[BrewCreatorEquipment] = []
+        self._temperature_source: Tilt | None = None
 
     @property
     def actual_temperature(self) -> float | None:
-        tilt = self.__connected_tilt
-        if tilt is not None:
-            return tilt.actual_temperature
-        return self._json["actualTemperature"]
+        if self._temperature_source is not None:
+            return self._temperature_source.actual_temperature
+        return self._actual_temperature
 
     @property
     def actual_temperature_builtin_probe(self):
-        return self._json["actualTemperature"]
+        return self._actual_temperature
 
     @property
     def fan_speed(self) -> int | None:
-        return self._json["fanSpeed"]
+        return self._fan_speed
 
     @property
     def target_temperature(self) -> float | None:
-        return self._json["setTemperature"]
+        return self._target_temperature
 
     @property
     def mode(self) -> FerminatorMode | None:
-        l_process = self._json["lProcess"]
-        if l_process is None:
-            return None
-        return FerminatorMode(l_process)
+        return self._mode
 
     @property
     def status(self) -> FerminatorStatus | None:
-        l_status = self._json["lStatus"]
-        if l_status is None:
-            return None
-        return FerminatorStatus(l_status)
+        return self._status
 
     @property
     def sw_version(self) -> str:
-        return self._json["deviceTwinState"]["reportedSwVersion"]
+        return self._sw_version
 
     @property
     def hw_version(self) -> str:
-        return self._json["deviceTwinState"]["reportedHwVersion"]
+        return self._hw_version
 
     @property
     def is_connected(self) -> bool:
-        return self._json["deviceTwinState"]["connectionState"] == "Connected"
+        return self._is_connected
 
     @property
     def connected_equipment(self) -> list[BrewCreatorEquipment]:
-        return self._connected_equipment_list
+        return self._connected_equipment
 
-    async def set_fan_speed(self, fan_speed: int) -> bool:
-        return await self._update_equipment({"fanSpeed": fan_speed})
+    @property
+    def temperature_source(self) -> Tilt | None:
+        """Return the connected Tilt providing the actual temperature, if any."""
+        return self._temperature_source
 
-    async def set_target_temperature(self, temperature: float) -> bool:
-        return await self._update_equipment({"setTemperature": temperature})
+    async def set_fan_speed(self, fan_speed: int, timeout: float | None = None) -> bool:
+        return await self._update_equipment({"fanSpeed": fan_speed}, timeout)
 
-    async def set_regulating_temperature(self, is_regulating: bool) -> bool:
-        return await self._update_equipment({"isRegulatingTemperature": is_regulating})
+    async def set_target_temperature(
+        self, temperature: float, timeout: float | None = None
+    ) -> bool:
+        return await self._update_equipment({"setTemperature": temperature}, timeout)
 
-    def _update_connected_equipment(self, equipment: list[BrewCreatorEquipment]):
-        self._connected_equipment_list = [
-            e for e in equipment if e.id in self._json["connectedEquipments"]
-        ]
+    async def set_regulating_temperature(
+        self, is_regulating: bool, timeout: float | None = None
+    ) -> bool:
+        return await self._update_equipment(
+            {"isRegulatingTemperature": is_regulating}, timeout
+        )
 
-    @property
-    def __connected_tilt(self) -> Tilt | None:
-        return next(
+    def _link_connected_equipment(self, index: dict[str, BrewCreatorEquipment]) -> None:
+        """Link to the connected equipment in the equipment snapshot index.
+
+        The first connected Tilt reporting both gravity and temperature becomes the
+        temperature source.
+        """
+        self._connected_equipment = [
+            index[i] for i in self._connected_equipment_ids if i in index
+        ]
+        self._temperature_source = next(
             (
                 e
-                for e in self.connected_equipment
+                for e in self._connected_equipment
                 if isinstance(e, Tilt)
                 and e.specific_gravity is not None
                 and e.actual_temperature is not None
@@ -310,6 +449,1091 @@ class Ferminator(BrewCreatorEquipment):
         )
 
 
+def _link_connected_equipment(equipment: dict[str, BrewCreatorEquipment]) -> None:
+    """Link every Ferminator in an equipment snapshot to its connected equipment."""
+    for e in equipment.values():
+        if isinstance(e, Ferminator):
+            e._link_connected_equipment(equipment)
+
+
+class EquipmentChanges:
+    """Equipment added, removed and modified by one or more updates.
+
+    Modified equipment maps to the names of the changed JSON fields. A Ferminator
+    linked to changed connected equipment is reported with a changed
+    connectedEquipments field. Equipment that is both removed and added has been
+    replaced by new equipment with the same ID.
+    """
+
+    __slots__ = ("added", "modified", "removed")
+
+    def __init__(self) -> None:
+        self.added: set[str] = set()
+        self.removed: set[str] = set()
+        self.modified: dict[str, set[str]] = {}
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.modified)
+
+    def __repr__(self) -> str:
+        return (
+            f"EquipmentChanges(added={self.added}, removed={self.removed}, "
+            f"modified={self.modified})"
+        )
+
+    def modify(self, equipment_id: str, fields: Iterable[str]) -> None:
+        if equipment_id not in self.added:
+            self.modified.setdefault(equipment_id, set()).update(fields)
+
+    def add(self, equipment_id: str) -> None:
+        self.modified.pop(equipment_id, None)
+        self.added.add(equipment_id)
+
+    def remove(self, equipment_id: str) -> None:
+        self.modified.pop(equipment_id, None)
+        if equipment_id in self.added:
+            self.added.discard(equipment_id)
+        else:
+            self.removed.add(equipment_id)
+
+    def update(self, other: "EquipmentChanges") -> None:
+        """Merge changes made after the changes in this change set."""
+        for equipment_id in other.removed:
+            self.remove(equipment_id)
+        for equipment_id in other.added:
+            self.add(equipment_id)
+        for equipment_id, fields in other.modified.items():
+            self.modify(equipment_id, fields)
+
+
+_MISSING = object()
+
+
+def _changed_fields(current: dict[str, any], updated: dict[str, any]) -> set[str]:
+    return {
+        key
+        for key in current.keys() | updated.keys()
+        if current.get(key, _MISSING) != updated.get(key, _MISSING)
+    }
+
+
+class EquipmentRegistry:
+    """Equipment snapshot that is updated in place.
+
+    Equipment whose JSON is unchanged by an update keeps its identity. Changed
+    equipment is replaced by a new record, and only Ferminators connected to
+    replaced or removed equipment are linked again.
+    """
+
+    def __init__(
+        self, create: Callable[[dict[str, any]], BrewCreatorEquipment | None]
+    ) -> None:
+        self._create = create
+        self._equipment: dict[str, BrewCreatorEquipment] = {}
+        # Equipment ID -> IDs of the Ferminators listing it as connected equipment
+        self._connected_to: dict[str, set[str]] = {}
+
+    @property
+    def equipment(self) -> dict[str, BrewCreatorEquipment]:
+        return self._equipment
+
+    def update(
+        self, equipment_json: Iterable[dict[str, any]], complete: bool = False
+    ) -> EquipmentChanges:
+        """Apply updated equipment JSON and return what changed.
+
+        With complete set, equipment missing from the JSON is removed.
+        """
+        changes = EquipmentChanges()
+        seen: set[str] = set()
+        for data in equipment_json:
+            equipment_id = data["id"]
+            seen.add(equipment_id)
+            current = self._equipment.get(equipment_id)
+            if current is not None and current.json == data:
+                continue
+            equipment = self._create(data)
+            if equipment is None:
+                continue
+            if current is None:
+                changes.add(equipment_id)
+            else:
+                self._unindex(current)
+                changes.modify(equipment_id, _changed_fields(current.json, data))
+            self._equipment[equipment_id] = equipment
+            self._index(equipment)
+        if complete:
+            for equipment_id in self._equipment.keys() - seen:
+                self._unindex(self._equipment.pop(equipment_id))
+                changes.remove(equipment_id)
+        self._link(changes)
+        return changes
+
+    def _link(self, changes: EquipmentChanges) -> None:
+        replaced = changes.added | changes.removed | changes.modified.keys()
+        ferminators = {
+            i for i in replaced if isinstance(self._equipment.get(i), Ferminator)
+        }
+        for equipment_id in replaced:
+            for ferminator_id in self._connected_to.get(equipment_id, ()):
+                if ferminator_id not in ferminators:
+                    ferminators.add(ferminator_id)
+                    changes.modify(ferminator_id, ("connectedEquipments",))
+        for ferminator_id in ferminators:
+            self._equipment[ferminator_id]._link_connected_equipment(self._equipment)
+
+    def _index(self, equipment: BrewCreatorEquipment) -> None:
+        if isinstance(equipment, Ferminator):
+            for connected_id in equipment._connected_equipment_ids:
+                self._connected_to.setdefault(connected_id, set()).add(equipment.id)
+
+    def _unindex(self, equipment: BrewCreatorEquipment) -> None:
+        if isinstance(equipment, Ferminator):
+            for connected_id in equipment._connected_equipment_ids:
+                ferminators = self._connected_to.get(connected_id)
+                if ferminators is not None:
+                    ferminators.discard(equipment.id)
+                    if not ferminators:
+                        del self._connected_to[connected_id]
+
+
+def _overlay_json(current: dict[str, any], fields: dict[str, any]) -> dict[str, any]:
+    """Merge written fields into equipment JSON, along with the fields they imply.
+
+    Whether a Ferminator regulates its temperature shows in its process, which the
+    server only updates once regulation has started or stopped.
+    """
+    regulating = fields.get("isRegulatingTemperature")
+    if regulating is False:
+        fields = {**fields, "lProcess": FerminatorMode.READY.value}
+    elif regulating is True and current.get("lProcess") == FerminatorMode.READY.value:
+        fields = {**fields, "lProcess": FerminatorMode.IDLE.value}
+    return _merge_json(current, fields)
+
+
+def _merge_json(current: dict[str, any], patch: dict[str, any]) -> dict[str, any]:
+    merged = dict(current)
+    for key, value in patch.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _merge_json(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+class SignalRMessageType(Enum):
+    INVOCATION = 1
+    STREAM_ITEM = 2
+    COMPLETION = 3
+    STREAM_INVOCATION = 4
+    CANCEL_INVOCATION = 5
+    PING = 6
+    CLOSE = 7
+
+
+class SignalRMessage:
+    def __init__(
+        self,
+        message_type: SignalRMessageType,
+        target: str | None = None,
+        arguments: list[any] | None = None,
+        invocation_id: str | None = None,
+        result: Any | None = None,
+        error: str | None = None,
+    ) -> None:
+        self.message_type = message_type
+        self.target = target
+        self.arguments = arguments if arguments is not None else []
+        self.invocation_id = invocation_id
+        self.result = result
+        self.error = error
+
+    def __repr__(self) -> str:
+        return (
+            f"SignalRMessage(type={self.message_type.name}, target={self.target}, "
+            f"arguments={self.arguments}, invocation_id={self.invocation_id}, "
+            f"error={self.error})"
+        )
+
+
+class SignalRProtocol(ABC):
+    """Base class for SignalR hub protocols.
+
+    The handshake is always exchanged as JSON text terminated by the record separator
+    character, regardless of the hub protocol negotiated.
+    """
+
+    RECORD_SEPARATOR = "\x1e"
+
+    name: str
+    is_binary: bool
+
+    def handshake_request(self) -> str:
+        return (
+            json.dumps({"protocol": self.name, "version": 1}, separators=(",", ":"))
+            + self.RECORD_SEPARATOR
+        )
+
+    def parse_handshake_response(self, data: any) -> tuple[bool, str | bytes]:
+        """Parse the handshake response.
+
+        Returns whether the handshake was accepted, and any data following the
+        handshake response in the same frame.
+        """
+        if isinstance(data, bytes):
+            separator = self.RECORD_SEPARATOR.encode()
+        elif isinstance(data, str):
+            separator = self.RECORD_SEPARATOR
+        else:
+            return False, b""
+        handshake, _, remainder = data.partition(separator)
+        try:
+            response = json.loads(handshake)
+        except ValueError:
+            return False, remainder
+        return isinstance(response, dict) and "error" not in response, remainder
+
+    @abstractmethod
+    def parse_messages(self, data: str | bytes) -> list[SignalRMessage]: ...
+
+    @abstractmethod
+    def encode_ping(self) -> str | bytes: ...
+
+    @abstractmethod
+    def encode_invocation(self, target: str, arguments: list[any]) -> str | bytes: ...
+
+
+class SignalRJsonProtocol(SignalRProtocol):
+    """Decoder for the SignalR JSON hub protocol.
+
+    A single WebSocket frame may contain several records, each terminated by the
+    record separator character.
+    """
+
+    name = "json"
+    is_binary = False
+
+    def parse_messages(self, data: str) -> list[SignalRMessage]:
+        messages = []
+        for record in data.split(self.RECORD_SEPARATOR):
+            if not record:
+                continue
+            try:
+                message = self._to_message(json.loads(record))
+            except (KeyError, ValueError, TypeError, AttributeError):
+                _LOGGER.warning("Received malformed SignalR record: %s", record)
+                continue
+            messages.append(message)
+        return messages
+
+    def encode_ping(self) -> str:
+        return self._encode({"type": SignalRMessageType.PING.value})
+
+    def encode_invocation(self, target: str, arguments: list[any]) -> str:
+        return self._encode(
+            {
+                "arguments": arguments,
+                "target": target,
+                "type": SignalRMessageType.INVOCATION.value,
+            }
+        )
+
+    def _encode(self, record: dict[str, any]) -> str:
+        return json.dumps(record, separators=(",", ":")) + self.RECORD_SEPARATOR
+
+    @staticmethod
+    def _to_message(record: dict[str, any]) -> SignalRMessage:
+        return SignalRMessage(
+            SignalRMessageType(record["type"]),
+            target=record.get("target"),
+            arguments=record.get("arguments"),
+            invocation_id=record.get("invocationId"),
+            result=record.get("result"),
+            error=record.get("error"),
+        )
+
+
+class SignalRMessagePackProtocol(SignalRProtocol):
+    """Decoder for the binary SignalR MessagePack hub protocol.
+
+    Each message is a MessagePack array prefixed by its length encoded as a
+    variable-length integer. A single WebSocket frame may contain several messages.
+    Timestamps are converted to ISO 8601 strings so that decoded messages are
+    identical to those produced by the JSON protocol.
+    """
+
+    name = "messagepack"
+    is_binary = True
+
+    def parse_messages(self, data: bytes) -> list[SignalRMessage]:
+        if not isinstance(data, bytes):
+            _LOGGER.warning("Received non-binary SignalR frame: %s", data)
+            return []
+        messages = []
+        offset = 0
+        while offset < len(data):
+            try:
+                length, offset = self._read_length(data, offset)
+            except ValueError:
+                _LOGGER.warning("Received malformed SignalR frame: %s", data)
+                break
+            record = data[offset : offset + length]
+            offset += length
+            if len(record) < length:
+                _LOGGER.warning("Received truncated SignalR message: %s", record)
+                break
+            try:
+                message = self._to_message(
+                    msgpack.unpackb(record, raw=False, timestamp=3)
+                )
+            except (IndexError, ValueError, TypeError, msgpack.UnpackException):
+                _LOGGER.warning("Received malformed SignalR message: %s", record)
+                continue
+            messages.append(message)
+        return messages
+
+    def encode_ping(self) -> bytes:
+        return self._encode([SignalRMessageType.PING.value])
+
+    def encode_invocation(self, target: str, arguments: list[any]) -> bytes:
+        return self._encode(
+            [SignalRMessageType.INVOCATION.value, {}, None, target, arguments]
+        )
+
+    @staticmethod
+    def _encode(message: list[any]) -> bytes:
+        payload = msgpack.packb(message)
+        length = len(payload)
+        prefix = bytearray()
+        while True:
+            if length < 0x80:
+                prefix.append(length)
+                return bytes(prefix) + payload
+            prefix.append((length & 0x7F) | 0x80)
+            length >>= 7
+
+    @staticmethod
+    def _read_length(data: bytes, offset: int) -> tuple[int, int]:
+        length = 0
+        for shift in range(0, 35, 7):
+            if offset >= len(data):
+                break
+            byte = data[offset]
+            offset += 1
+            length |= (byte & 0x7F) << shift
+            if byte & 0x80 == 0:
+                return length, offset
+        raise ValueError("Invalid message length prefix")
+
+    @classmethod
+    def _to_message(cls, message: list[any]) -> SignalRMessage:
+        message_type = SignalRMessageType(message[0])
+        if message_type in (
+            SignalRMessageType.INVOCATION,
+            SignalRMessageType.STREAM_INVOCATION,
+        ):
+            return SignalRMessage(
+                message_type,
+                target=message[3],
+                arguments=cls._to_json_compatible(message[4]),
+                invocation_id=message[2],
+            )
+        if message_type == SignalRMessageType.STREAM_ITEM:
+            return SignalRMessage(
+                message_type,
+                invocation_id=message[2],
+                result=cls._to_json_compatible(message[3]),
+            )
+        if message_type == SignalRMessageType.COMPLETION:
+            # Result kind 1 is an error, 2 is a void result and 3 is a non-void result
+            result_kind = message[3]
+            return SignalRMessage(
+                message_type,
+                invocation_id=message[2],
+                result=cls._to_json_compatible(message[4])
+                if result_kind == 3
+                else None,
+                error=message[4] if result_kind == 1 else None,
+            )
+        if message_type == SignalRMessageType.CANCEL_INVOCATION:
+            return SignalRMessage(message_type, invocation_id=message[2])
+        if message_type == SignalRMessageType.CLOSE:
+            return SignalRMessage(
+                message_type, error=message[1] if len(message) > 1 else None
+            )
+        return SignalRMessage(message_type)
+
+    @classmethod
+    def _to_json_compatible(cls, value: any) -> any:
+        if isinstance(value, dict):
+            return {k: cls._to_json_compatible(v) for k, v in value.items()}
+        if isinstance(value, list):
+            return [cls._to_json_compatible(v) for v in value]
+        if isinstance(value, datetime):
+            return value.isoformat()
+        return value
+
+
+class PendingWrites:
+    """Written equipment fields awaiting confirmation from the server.
+
+    Each field expires at a deadline unless the server reports the written value
+    before then.
+    """
+
+    def __init__(self, timeout: float) -> None:
+        self._timeout = timeout
+        self._writes: dict[str, dict[str, tuple[any, float]]] = {}
+
+    def __bool__(self) -> bool:
+        return bool(self._writes)
+
+    def add(self, equipment_id: str, fields: dict[str, any]) -> None:
+        deadline = time.monotonic() + self._timeout
+        writes = self._writes.setdefault(equipment_id, {})
+        for key, value in fields.items():
+            writes[key] = (value, deadline)
+
+    def remove(self, equipment_id: str, fields: dict[str, any]) -> None:
+        """Remove the fields unless they have been overwritten by a later write."""
+        writes = self._writes.get(equipment_id, {})
+        for key, value in fields.items():
+            if key in writes and writes[key][0] == value:
+                del writes[key]
+        if not writes:
+            self._writes.pop(equipment_id, None)
+
+    def fields(self) -> dict[str, dict[str, any]]:
+        return {
+            equipment_id: {key: value for key, (value, _) in writes.items()}
+            for equipment_id, writes in self._writes.items()
+        }
+
+    def confirm(
+        self, equipment_json: dict[str, dict[str, any]]
+    ) -> dict[str, dict[str, any]]:
+        """Clear and return fields where the server reports the written value."""
+        return self._clear(
+            lambda equipment_id, key, value, _: (
+                equipment_id in equipment_json
+                and equipment_json[equipment_id].get(key) == value
+            )
+        )
+
+    def due(self, now: float) -> set[str]:
+        """Return the IDs of equipment with fields past their deadline."""
+        return {
+            equipment_id
+            for equipment_id, writes in self._writes.items()
+            if any(deadline <= now for _, deadline in writes.values())
+        }
+
+    def expire(self, now: float) -> dict[str, dict[str, any]]:
+        """Clear and return fields that were not confirmed before their deadline."""
+        return self._clear(lambda _, __, ___, deadline: deadline <= now)
+
+    def next_deadline(self) -> float | None:
+        return min(
+            (d for writes in self._writes.values() for _, d in writes.values()),
+            default=None,
+        )
+
+    def _clear(
+        self, predicate: Callable[[str, str, any, float], bool]
+    ) -> dict[str, dict[str, any]]:
+        cleared: dict[str, dict[str, any]] = {}
+        for equipment_id, writes in list(self._writes.items()):
+            for key, (value, deadline) in list(writes.items()):
+                if predicate(equipment_id, key, value, deadline):
+                    cleared.setdefault(equipment_id, {})[key] = value
+                    del writes[key]
+            if not writes:
+                del self._writes[equipment_id]
+        return cleared
+
+
+class RetryPolicy:
+    """Capped exponential backoff with full jitter.
+
+    The delay before retry number n is drawn uniformly between zero and
+    min(max_delay, base_delay * 2 ** (n - 1)). With an immediate first retry, the
+    first retry happens without delay and the backoff starts from the second.
+    A policy may be shared between operations, and records the retries and delays
+    of all of them.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int | None,
+        base_delay: float,
+        max_delay: float,
+        immediate_first_retry: bool = False,
+    ) -> None:
+        self.max_attempts = max_attempts
+        self._base_delay = base_delay
+        self._max_delay = max_delay
+        self._immediate_first_retry = immediate_first_retry
+        self._retries = 0
+        self._exhausted = 0
+        self._total_delay = 0.0
+        self._last_delay: float | None = None
+
+    @property
+    def statistics(self) -> dict[str, int | float | None]:
+        return {
+            "retries": self._retries,
+            "exhausted": self._exhausted,
+            "total_delay_seconds": self._total_delay,
+            "last_delay_seconds": self._last_delay,
+        }
+
+    def next_delay(self, failed_attempts: int) -> float | None:
+        """Return the delay before the next attempt, or None if no attempts are left."""
+        if self.max_attempts is not None and failed_attempts >= self.max_attempts:
+            self._exhausted += 1
+            return None
+        retry = failed_attempts - 1 if self._immediate_first_retry else failed_attempts
+        if retry == 0:
+            delay = 0.0
+        else:
+            delay = random.uniform(
+                0, min(self._max_delay, self._base_delay * 2 ** (retry - 1))
+            )
+        self._retries += 1
+        self._total_delay += delay
+        self._last_delay = delay
+        return delay
+
+
+class TokenBucketRateLimiter:
+    """Token bucket allowing bursts up to its capacity and a sustained rate after.
+
+    Waiting callers are served in order.
+    """
+
+    def __init__(self, rate: float, capacity: int) -> None:
+        self._rate = rate
+        self._capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+        self._acquired = 0
+        self._delayed = 0
+        self._total_wait = 0.0
+
+    @property
+    def statistics(self) -> dict[str, int | float]:
+        return {
+            "acquired": self._acquired,
+            "delayed": self._delayed,
+            "total_wait_seconds": self._total_wait,
+        }
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            self._refill()
+            if self._tokens < 1:
+                wait = (1 - self._tokens) / self._rate
+                self._delayed += 1
+                self._total_wait += wait
+                _LOGGER.debug("Rate limit reached, delaying request %.2f seconds", wait)
+                await asyncio.sleep(wait)
+                self._refill()
+            self._tokens -= 1
+            self._acquired += 1
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(
+            self._capacity, self._tokens + (now - self._updated) * self._rate
+        )
+        self._updated = now
+
+
+class ConnectionStagger:
+    """Spaces out logins and WebSocket connects that may be shared by several clients.
+
+    Each attempt is given the next free slot, at least the spacing after the
+    previous one. Attempts that have to wait are delayed by a random jitter on top,
+    so clients recovering at the same time do not connect in lockstep.
+    """
+
+    def __init__(self, spacing: float, jitter: float) -> None:
+        self._spacing = spacing
+        self._jitter = jitter
+        self._next_slot = 0.0
+        self._attempts = 0
+        self._delayed = 0
+        self._total_wait = 0.0
+
+    @property
+    def statistics(self) -> dict[str, int | float]:
+        return {
+            "attempts": self._attempts,
+            "delayed": self._delayed,
+            "total_wait_seconds": self._total_wait,
+        }
+
+    async def wait(self) -> None:
+        self._attempts += 1
+        now = time.monotonic()
+        slot = max(now, self._next_slot)
+        self._next_slot = slot + self._spacing
+        if slot == now:
+            return
+        delay = slot - now + random.uniform(0, self._jitter)
+        self._delayed += 1
+        self._total_wait += delay
+        _LOGGER.debug("Staggering connection attempt by %.2f seconds", delay)
+        await asyncio.sleep(delay)
+
+
+class CircuitBreakerState(Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Fails requests fast after consecutive failures.
+
+    The circuit opens after the failure threshold is reached. Once the reset timeout
+    has passed, a single trial request is let through. The circuit closes if the
+    trial succeeds, and opens again if it fails.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float) -> None:
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = reset_timeout
+        self._state = CircuitBreakerState.CLOSED
+        self._consecutive_failures = 0
+        self._opened_time: float | None = None
+        self._trial_start_time: float | None = None
+        self._times_opened = 0
+        self._rejected = 0
+
+    @property
+    def state(self) -> CircuitBreakerState:
+        return self._state
+
+    @property
+    def statistics(self) -> dict[str, str | int | float | None]:
+        return {
+            "state": self._state.value,
+            "consecutive_failures": self._consecutive_failures,
+            "times_opened": self._times_opened,
+            "rejected": self._rejected,
+            "open_seconds": time.monotonic() - self._opened_time
+            if self._opened_time is not None
+            else None,
+        }
+
+    def before_request(self) -> None:
+        now = time.monotonic()
+        if self._state == CircuitBreakerState.OPEN:
+            if now - self._opened_time < self._reset_timeout:
+                self._reject()
+            self._state = CircuitBreakerState.HALF_OPEN
+            self._trial_start_time = None
+        if self._state == CircuitBreakerState.HALF_OPEN:
+            # A trial that never reported back does not block new trials forever
+            if (
+                self._trial_start_time is not None
+                and now - self._trial_start_time < self._reset_timeout
+            ):
+                self._reject()
+            self._trial_start_time = now
+
+    def record_success(self) -> None:
+        if self._state != CircuitBreakerState.CLOSED:
+            _LOGGER.info("Circuit breaker closed")
+        self._state = CircuitBreakerState.CLOSED
+        self._consecutive_failures = 0
+        self._opened_time = None
+        self._trial_start_time = None
+
+    def record_failure(self) -> None:
+        self._consecutive_failures += 1
+        if self._state == CircuitBreakerState.HALF_OPEN or (
+            self._state == CircuitBreakerState.CLOSED
+            and self._consecutive_failures >= self._failure_threshold
+        ):
+            _LOGGER.warning(
+                "Circuit breaker opened after %d consecutive failures",
+                self._consecutive_failures,
+            )
+            self._state = CircuitBreakerState.OPEN
+            self._opened_time = time.monotonic()
+            self._trial_start_time = None
+            self._times_opened += 1
+
+    def _reject(self) -> None:
+        self._rejected += 1
+        raise BrewCreatorCircuitOpenError(
+            "Circuit breaker is open, BrewCreator API is considered unavailable"
+        )
+
+
+class WriteCoalescer:
+    """Merges writes to the same equipment into a single request.
+
+    Writes arriving within the coalescing window are merged with the last write of
+    a field taking precedence. Requests for the same equipment are sent one at a
+    time and in order, and every caller receives the result of the request that
+    carried its write. Writes of callers that give up before their request is sent
+    are not sent.
+    """
+
+    def __init__(
+        self,
+        write: Callable[[str, dict[str, any]], Awaitable[bool]],
+        window: float,
+    ) -> None:
+        self._write = write
+        self._window = window
+        self._batches: dict[str, list[tuple[dict[str, any], asyncio.Future]]] = {}
+        # Batches whose request is being sent
+        self._in_flight: dict[str, list[tuple[dict[str, any], asyncio.Future]]] = {}
+        self._tasks: dict[str, Task[None]] = {}
+        self._writes = 0
+        self._withdrawn_writes = 0
+        self._requests = 0
+
+    @property
+    def statistics(self) -> dict[str, int]:
+        return {
+            "writes": self._writes,
+            "withdrawn_writes": self._withdrawn_writes,
+            "requests": self._requests,
+        }
+
+    async def write(self, equipment_id: str, payload: dict[str, any]) -> bool:
+        self._writes += 1
+        future = asyncio.get_running_loop().create_future()
+        entry = (payload, future)
+        self._batches.setdefault(equipment_id, []).append(entry)
+        if equipment_id not in self._tasks:
+            self._tasks[equipment_id] = _create_background_task(
+                self._flush(equipment_id)
+            )
+        try:
+            return await future
+        except asyncio.CancelledError:
+            self._withdraw(equipment_id, entry)
+            raise
+
+    def _withdraw(
+        self, equipment_id: str, entry: tuple[dict[str, any], asyncio.Future]
+    ) -> None:
+        """Remove a write from its batch if the batch has not been sent yet."""
+        batch = self._batches.get(equipment_id)
+        if batch is None or entry not in batch:
+            return
+        batch.remove(entry)
+        if not batch:
+            del self._batches[equipment_id]
+        self._withdrawn_writes += 1
+
+    async def cancel(self) -> None:
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+        self._tasks.clear()
+        for batch in [*self._batches.values(), *self._in_flight.values()]:
+            for _, future in batch:
+                future.cancel()
+        self._batches.clear()
+        self._in_flight.clear()
+
+    async def _flush(self, equipment_id: str) -> None:
+        try:
+            while self._batches.get(equipment_id):
+                await asyncio.sleep(self._window)
+                batch = self._batches.pop(equipment_id, None)
+                if not batch:
+                    break
+                payload = {}
+                for p, _ in batch:
+                    payload.update(p)
+                if len(batch) > 1:
+                    _LOGGER.debug(
+                        "Merged %d writes to %s: %s", len(batch), equipment_id, payload
+                    )
+                self._requests += 1
+                self._in_flight[equipment_id] = batch
+                try:
+                    result = await self._write(equipment_id, payload)
+                except Exception as e:  # noqa: BLE001
+                    for _, future in batch:
+                        if not future.done():
+                            future.set_exception(e)
+                else:
+                    for _, future in batch:
+                        if not future.done():
+                            future.set_result(result)
+                self._in_flight.pop(equipment_id, None)
+        finally:
+            self._tasks.pop(equipment_id, None)
+
+
+class CoalescingRefreshScheduler:
+    """Runs a refresh at most once at a time.
+
+    Refresh requests arriving while a refresh is in flight are merged into a single
+    trailing refresh, and consecutive refreshes are spaced by at least the minimum
+    interval.
+    """
+
+    def __init__(
+        self, refresh: Callable[[], Awaitable[None]], min_interval: float = 0
+    ) -> None:
+        self._refresh = refresh
+        self._min_interval = min_interval
+        self._task: Task[None] | None = None
+        self._pending = False
+        self._last_refresh_start: float | None = None
+        self._requests = 0
+        self._merged_requests = 0
+        self._refreshes = 0
+
+    @property
+    def statistics(self) -> dict[str, int]:
+        return {
+            "requests": self._requests,
+            "merged_requests": self._merged_requests,
+            "refreshes": self._refreshes,
+        }
+
+    def request_refresh(self) -> None:
+        self._requests += 1
+        if self._task is not None and not self._task.done():
+            if self._pending:
+                self._merged_requests += 1
+            self._pending = True
+            return
+        self._pending = True
+        self._task = _create_background_task(self._run())
+
+    async def cancel(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        self._pending = False
+
+    async def _run(self) -> None:
+        while self._pending:
+            if self._last_refresh_start is not None:
+                delay = self._last_refresh_start + self._min_interval - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            self._pending = False
+            self._last_refresh_start = time.monotonic()
+            self._refreshes += 1
+            try:
+                await self._refresh()
+            except Exception:
+                _LOGGER.exception("Failed to refresh equipment")
+        if self._merged_requests:
+            _LOGGER.debug(
+                "Merged %d of %d refresh requests",
+                self._merged_requests,
+                self._requests,
+            )
+
+
+class BoundedMessageQueue:
+    """Bounded FIFO queue of received messages that drops the oldest message when full.
+
+    The drop callback is called for every dropped message, including messages left
+    unprocessed when the queue is cleared. Tracks queue depth and
+    the lag between a message being received and being taken for processing.
+    """
+
+    def __init__(
+        self, max_size: int, on_drop: Callable[[], None] | None = None
+    ) -> None:
+        self._max_size = max_size
+        self._on_drop = on_drop
+        self._messages: collections.deque[tuple[str | bytes, float]] = (
+            collections.deque()
+        )
+        self._not_empty = asyncio.Event()
+        self._max_depth = 0
+        self._received = 0
+        self._dropped = 0
+        self._last_lag: float | None = None
+        self._max_lag: float | None = None
+
+    @property
+    def statistics(self) -> dict[str, int | float | None]:
+        return {
+            "depth": len(self._messages),
+            "max_depth": self._max_depth,
+            "received": self._received,
+            "dropped": self._dropped,
+            "last_lag_seconds": self._last_lag,
+            "max_lag_seconds": self._max_lag,
+        }
+
+    def put(self, message: str | bytes) -> None:
+        self._received += 1
+        if len(self._messages) >= self._max_size:
+            dropped, _ = self._messages.popleft()
+            self._dropped += 1
+            _LOGGER.warning("Message queue is full, dropping message: %s", dropped)
+            if self._on_drop is not None:
+                self._on_drop()
+        self._messages.append((message, time.monotonic()))
+        self._max_depth = max(self._max_depth, len(self._messages))
+        self._not_empty.set()
+
+    async def get(self) -> str | bytes:
+        while not self._messages:
+            self._not_empty.clear()
+            await self._not_empty.wait()
+        message, received_time = self._messages.popleft()
+        self._last_lag = time.monotonic() - received_time
+        self._max_lag = max(self._max_lag or 0, self._last_lag)
+        return message
+
+    def clear(self) -> None:
+        dropped = len(self._messages)
+        self._messages.clear()
+        self._dropped += dropped
+        if self._on_drop is not None:
+            for _ in range(dropped):
+                self._on_drop()
+
+
+class ConditionalRequestCache:
+    """Validators and decoded bodies of earlier GET responses by request path.
+
+    Requests carry the ETag and Last-Modified validators of the earlier response,
+    allowing the server to answer 304 Not Modified. For servers without validators a
+    hash of the response body detects an unchanged response. Either way, an
+    unchanged response returns the earlier decoded body, the very same object,
+    without decoding it again.
+    """
+
+    def __init__(self) -> None:
+        # Path -> (ETag, Last-Modified, body digest, decoded body)
+        self._entries: dict[str, tuple[str | None, str | None, bytes, Any]] = {}
+        self._not_modified = 0
+        self._unchanged = 0
+        self._changed = 0
+
+    @property
+    def statistics(self) -> dict[str, int]:
+        return {
+            "not_modified": self._not_modified,
+            "unchanged": self._unchanged,
+            "changed": self._changed,
+        }
+
+    def get(self, path: str) -> Any:
+        entry = self._entries.get(path)
+        return entry[3] if entry is not None else None
+
+    def request_headers(self, path: str) -> dict[str, str]:
+        entry = self._entries.get(path)
+        if entry is None:
+            return {}
+        etag, last_modified, _, _ = entry
+        headers = {}
+        if etag is not None:
+            headers["If-None-Match"] = etag
+        if last_modified is not None:
+            headers["If-Modified-Since"] = last_modified
+        return headers
+
+    def not_modified(self, path: str) -> Any:
+        entry = self._entries.get(path)
+        if entry is None:
+            raise BrewCreatorError(f"Unexpected 304 Not Modified for {path}")
+        self._not_modified += 1
+        return entry[3]
+
+    def update(self, path: str, headers: Mapping[str, str], body: bytes) -> Any:
+        digest = hashlib.blake2b(body, digest_size=16).digest()
+        entry = self._entries.get(path)
+        if entry is not None and entry[2] == digest:
+            self._unchanged += 1
+            decoded = entry[3]
+        else:
+            self._changed += 1
+            decoded = json.loads(body) if body else None
+        self._entries[path] = (
+            headers.get("ETag"),
+            headers.get("Last-Modified"),
+            digest,
+            decoded,
+        )
+        return decoded
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+# Loop time by which the API operation running in the current context must complete
+_REQUEST_DEADLINE: contextvars.ContextVar[float | None] = contextvars.ContextVar(
+    "brewcreator_request_deadline", default=None
+)
+
+
+@contextlib.asynccontextmanager
+async def _request_deadline(
+    timeout: float | None, operation: str
+) -> AsyncIterator[None]:
+    """Bound an API operation, including token acquisition and retries, by a timeout.
+
+    Nested deadlines never extend the deadline of an enclosing operation.
+    """
+    if timeout is None:
+        yield
+        return
+    deadline = asyncio.get_running_loop().time() + timeout
+    enclosing_deadline = _REQUEST_DEADLINE.get()
+    if enclosing_deadline is not None:
+        deadline = min(deadline, enclosing_deadline)
+    token = _REQUEST_DEADLINE.set(deadline)
+    try:
+        async with asyncio.timeout_at(deadline):
+            yield
+    except TimeoutError as e:
+        raise BrewCreatorTimeoutError(
+            f"{operation} did not complete within {timeout} seconds"
+        ) from e
+    finally:
+        _REQUEST_DEADLINE.reset(token)
+
+
+def _supports_binary_transfer(negotiate_response: dict[str, any]) -> bool:
+    """Return whether a negotiate response offers binary frames over WebSockets.
+
+    A response without transports listed is assumed to support them.
+    """
+    transports = negotiate_response.get("availableTransports")
+    if transports is None:
+        return True
+    return any(
+        transport.get("transport") == "WebSockets"
+        and "Binary" in transport.get("transferFormats", [])
+        for transport in transports
+    )
+
+
+def _create_background_task(coro: Awaitable[Any]) -> Task[Any]:
+    """Create a task that is not bound by the deadline of the calling operation."""
+    context = contextvars.copy_context()
+    context.run(_REQUEST_DEADLINE.set, None)
+    return asyncio.create_task(coro, context=context)
+
+
 class TokenStorage(Protocol):
     async def load_tokens(self) -> tuple[str | None, str | None, datetime | None]: ...
 
@@ -322,12 +1546,43 @@ class TokenStorage(Protocol):
 
 
 class BrewCreatorAPI:
+    API_URL = "https://api.brewcreator.com"
+    IDENTITY_URL = "https://identity.brewcreator.com"
+    EQUIPMENT_PAGE_SIZE = 100
+    # Upper bound on the equipment pages listed, in case paging is not honored
+    MAX_EQUIPMENT_PAGES = 50
+    # A WebSocket connection lasting this long resets the reconnect backoff
+    WEBSOCKET_HEALTHY_CONNECTION_SECONDS = 60
+    # Renew the access token this many seconds before it expires, but no earlier
+    # than halfway through its lifetime
+    TOKEN_RENEWAL_MARGIN = 300
+    # Consider the access token expired this many seconds before it expires, but no
+    # earlier than halfway through its lifetime
+    TOKEN_EXPIRY_MARGIN = 120
+    # Minimum time between token renewals ahead of expiry
+    TOKEN_MIN_RENEWAL_INTERVAL = 30
+
     def __init__(
         self,
         username: str,
         password: str,
         token_storage: TokenStorage,
         session: aiohttp.ClientSession = None,
+        min_refresh_interval: float = 0,
+        websocket_queue_size: int = 100,
+        hub_protocol: str = SignalRJsonProtocol.name,
+        optimistic_write_timeout: float = 30,
+        write_coalescing_window: float = 0.1,
+        request_retry_policy: RetryPolicy | None = None,
+        websocket_retry_policy: RetryPolicy | None = None,
+        read_rate_limiter: TokenBucketRateLimiter | None = None,
+        write_rate_limiter: TokenBucketRateLimiter | None = None,
+        circuit_breaker: CircuitBreaker | None = None,
+        connection_stagger: ConnectionStagger | None = None,
+        read_timeout: float | None = 60,
+        write_timeout: float | None = 30,
+        api_url: str = API_URL,
+        identity_url: str = IDENTITY_URL,
     ) -> None:
         self.__username = username
         self.__password = password
@@ -336,40 +1591,370 @@ class BrewCreatorAPI:
         self.__update_callback: (
             Callable[[dict[str, BrewCreatorEquipment]], Awaitable[None]] | None
         ) = None
+        self.__api_url = api_url.rstrip("/")
+        self.__identity_url = identity_url.rstrip("/")
+        self.__read_timeout = read_timeout
+        self.__write_timeout = write_timeout
         self.__websocket_task: Task[Any] | None = None
+        self.__websocket_connected_time: float | None = None
+        self.__websocket_connected = False
+        self.__request_retry_policy = request_retry_policy or RetryPolicy(
+            max_attempts=5, base_delay=1, max_delay=30
+        )
+        self.__websocket_retry_policy = websocket_retry_policy or RetryPolicy(
+            max_attempts=None, base_delay=2, max_delay=300, immediate_first_retry=True
+        )
+        self.__read_rate_limiter = read_rate_limiter or TokenBucketRateLimiter(
+            rate=2, capacity=10
+        )
+        self.__write_rate_limiter = write_rate_limiter or TokenBucketRateLimiter(
+            rate=1, capacity=5
+        )
+        self.__circuit_breaker = circuit_breaker or CircuitBreaker(
+            failure_threshold=5, reset_timeout=60
+        )
+        self.__connection_stagger = connection_stagger
         self.__websocket_ping_task: Task[Any] | None = None
         self.__token_storage = token_storage
         self.__access_token: str | None = None
         self.__refresh_token: str | None = None
         self.__expire_time: datetime | None = None
         self.__initial_token_load_completed: bool = False
+        self.__expire_deadline: float | None = None
+        # Lifetime of the access token when it was set, in seconds
+        self.__token_lifetime: float | None = None
+        self.__token_task: Task[None] | None = None
+        self.__token_renewal_task: Task[None] | None = None
+        self.__closed = False
+        self.__registry = EquipmentRegistry(self.__get_equipment_from_json)
+        self.__changes = EquipmentChanges()
+        # Incremented whenever the registry changes
+        self.__registry_version = 0
+        # Registry version right after the last equipment listing was applied
+        self.__listed_registry_version: int | None = None
+        self.__response_cache = ConditionalRequestCache()
+        self.__min_refresh_interval = min_refresh_interval
+        self.__refresh_scheduler = CoalescingRefreshScheduler(
+            self.__refresh_all_equipment, min_refresh_interval
+        )
+        self.__equipment_refresh_schedulers: dict[str, CoalescingRefreshScheduler] = {}
+        self.__pending_writes = PendingWrites(optimistic_write_timeout)
+        self.__pending_writes_task: Task[None] | None = None
+        self.__write_coalescer = WriteCoalescer(
+            self.__put_equipment_state, write_coalescing_window
+        )
+        self.__websocket_queue = BoundedMessageQueue(
+            websocket_queue_size, self.__on_websocket_message_dropped
+        )
+        # Cleared while pushed updates are buffered during startup
+        self.__updates_resumed = asyncio.Event()
+        self.__updates_resumed.set()
+        self.__startup_time: float | None = None
+        # Whether all equipment must be fetched once updates are resumed
+        self.__resync_on_resume = False
+        # Successful WebSocket handshakes since the WebSocket was started
+        self.__websocket_connects = 0
+        # Startup phase -> duration in seconds
+        self.__startup_timings: dict[str, float] = {}
+        if hub_protocol == SignalRMessagePackProtocol.name:
+            self.__signalr_protocol: SignalRProtocol = SignalRMessagePackProtocol()
+        elif hub_protocol == SignalRJsonProtocol.name:
+            self.__signalr_protocol = SignalRJsonProtocol()
+        else:
+            raise BrewCreatorError(f"Unsupported SignalR hub protocol '{hub_protocol}'")
+
+    @property
+    def refresh_statistics(self) -> dict[str, int]:
+        return self.__refresh_scheduler.statistics
+
+    @property
+    def websocket_statistics(self) -> dict[str, int | float | None]:
+        return self.__websocket_queue.statistics
+
+    @property
+    def write_statistics(self) -> dict[str, int]:
+        return self.__write_coalescer.statistics
+
+    @property
+    def rate_limiter_statistics(self) -> dict[str, dict[str, int | float]]:
+        return {
+            "read": self.__read_rate_limiter.statistics,
+            "write": self.__write_rate_limiter.statistics,
+        }
+
+    @property
+    def circuit_breaker_statistics(self) -> dict[str, str | int | float | None]:
+        return self.__circuit_breaker.statistics
+
+    @property
+    def conditional_request_statistics(self) -> dict[str, int]:
+        return self.__response_cache.statistics
+
+    @property
+    def websocket_connected(self) -> bool:
+        return self.__websocket_connected
+
+    @property
+    def hub_protocol(self) -> str:
+        """Name of the SignalR hub protocol used, after any fallback to JSON."""
+        return self.__signalr_protocol.name
+
+    @property
+    def startup_timings(self) -> dict[str, float]:
+        return dict(self.__startup_timings)
+
+    @property
+    def retry_statistics(self) -> dict[str, dict[str, int | float | None]]:
+        return {
+            "requests": self.__request_retry_policy.statistics,
+            "websocket": self.__websocket_retry_policy.statistics,
+        }
 
     async def close(self):
+        self.__closed = True
         await self.stop_websocket()
+        await self.__write_coalescer.cancel()
+        for task in (self.__token_renewal_task, self.__token_task):
+            if task is not None:
+                task.cancel()
+                with contextlib.suppress(asyncio.CancelledError, BrewCreatorError):
+                    await task
+        self.__token_renewal_task = None
+        self.__token_task = None
+        if self.__pending_writes_task is not None:
+            self.__pending_writes_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self.__pending_writes_task
+            self.__pending_writes_task = None
         if self.__own_session:
             await self.__session.close()
 
-    async def verify_username_and_password(self):
-        result = await self.__exchange_username_and_password_for_tokens()
-        if self.__is_access_token_missing_or_expired():
-            await self.__set_tokens(result)
-
-    async def list_equipment(self) -> dict[str, BrewCreatorEquipment]:
-        data = await self.equipment_json()
-        equipment_list = [
-            self.__get_equipment_from_json(e) for e in data["data"] if e is not None
-        ]
-        for e in filter(lambda x: isinstance(x, Ferminator), equipment_list):
-            e._update_connected_equipment(equipment_list)
-        return {e.id: e for e in equipment_list}
-
-    async def equipment_json(self) -> Any:
+    async def verify_username_and_password(self, timeout: float | None = None):
+        async with _request_deadline(
+            self.__read_timeout if timeout is None else timeout, "Login"
+        ):
+            result = await self.__exchange_username_and_password_for_tokens()
+            if self.__is_access_token_missing_or_expired():
+                await self.__set_tokens(result)
+
+    async def list_equipment(
+        self, timeout: float | None = None
+    ) -> dict[str, BrewCreatorEquipment]:
+        async with _request_deadline(
+            self.__read_timeout if timeout is None else timeout, "Listing equipment"
+        ):
+            unchanged = True
+            equipment_json = []
+            async for page, page_unchanged in self.__iter_equipment_pages(
+                conditional=True
+            ):
+                unchanged = unchanged and page_unchanged
+                equipment_json.extend(data for data in page if data is not None)
+        if unchanged and self.__listed_registry_version == self.__registry_version:
+            _LOGGER.debug("Equipment is unchanged since it was last listed")
+            return self.__current_equipment()
+        # Connected equipment may be on any page, so update once all pages are fetched
+        self.__update_registry(equipment_json, complete=True)
+        self.__listed_registry_version = self.__registry_version
+        return self.__current_equipment()
+
+    async def refresh_equipment(
+        self, equipment_id: str, timeout: float | None = None
+    ) -> dict[str, BrewCreatorEquipment]:
+        """Fetch a single equipment and merge it into the current equipment snapshot."""
+        async with _request_deadline(
+            self.__read_timeout if timeout is None else timeout,
+            f"Fetching equipment {equipment_id}",
+        ):
+            data = await self.__do_authenticated_request(
+                "GET", f"/api/v1.0/equipments/{equipment_id}", conditional=True
+            )
+        _LOGGER.debug("Equipment JSON for %s: %s", equipment_id, data)
+        current = self.__registry.equipment.get(equipment_id)
+        # The registry holds the decoded response itself if nothing has changed
+        if current is None or current.json is not data["data"]:
+            self.__update_registry([data["data"]])
+        return self.__current_equipment()
+
+    def restore_equipment(
+        self, equipment_json: Iterable[dict[str, any]]
+    ) -> dict[str, BrewCreatorEquipment]:
+        """Seed the equipment with a snapshot saved by an earlier session.
+
+        The snapshot is replaced by the next equipment listing.
+        """
+        self.__update_registry(equipment_json, complete=True)
+        return self.__current_equipment()
+
+    def equipment_snapshot_json(self) -> list[dict[str, any]]:
+        """Return the JSON of the equipment as last received from the server."""
+        return [e.json for e in self.__registry.equipment.values()]
+
+    def take_changes(self) -> EquipmentChanges:
+        """Return the equipment changes since the previous call.
+
+        Changes include updates from the server as well as pending writes being
+        shown, rolled back or expired.
+        """
+        changes, self.__changes = self.__changes, EquipmentChanges()
+        return changes
+
+    async def equipment_json(self, timeout: float | None = None) -> Any:
+        async with _request_deadline(
+            self.__read_timeout if timeout is None else timeout, "Listing equipment"
+        ):
+            return {"data": [e async for e in self.iter_equipment_json()]}
+
+    async def iter_equipment_json(self) -> AsyncIterator[dict[str, any]]:
+        """Yield the JSON of all equipment, page by page.
+
+        The next page is fetched while the equipment of the current page is consumed.
+        Page requests are bound by the deadline of the enclosing operation, if any.
+        """
+        # Only list_equipment makes conditional requests. The cached pages tell it
+        # whether the equipment changed since it was last applied to the registry.
+        async for page, _ in self.__iter_equipment_pages(conditional=False):
+            for e in page:
+                yield e
+
+    async def __iter_equipment_pages(
+        self, conditional: bool
+    ) -> AsyncIterator[tuple[list[dict[str, any]], bool]]:
+        """Yield the equipment JSON of each page and whether the page is unchanged.
+
+        Listing stops at a page only holding equipment of earlier pages, as returned
+        by a server ignoring the page number.
+        """
+        page_number = 1
+        seen_ids: set[str] = set()
+        next_page: Task[Any] | None = asyncio.create_task(
+            self.__equipment_page_json(page_number, conditional)
+        )
+        try:
+            while next_page is not None:
+                page, unchanged = await next_page
+                next_page = None
+                data = page.get("data") or []
+                ids = {e["id"] for e in data if e is not None}
+                if page_number > 1 and ids and ids <= seen_ids:
+                    _LOGGER.warning(
+                        "Equipment page %d repeats earlier equipment, stopping listing",
+                        page_number,
+                    )
+                    return
+                seen_ids |= ids
+                if self.__has_next_equipment_page(page, page_number, len(data)):
+                    page_number += 1
+                    next_page = asyncio.create_task(
+                        self.__equipment_page_json(page_number, conditional)
+                    )
+                yield data, unchanged
+        finally:
+            if next_page is not None:
+                next_page.cancel()
+                with contextlib.suppress(asyncio.CancelledError, BrewCreatorError):
+                    await next_page
+
+    async def __equipment_page_json(
+        self, page_number: int, conditional: bool
+    ) -> tuple[Any, bool]:
+        """Return the JSON of an equipment page and whether it is unchanged.
+
+        Pages fetched without a conditional request are never reported unchanged.
+        """
+        path = self.__equipment_page_path(page_number)
+        previous = self.__response_cache.get(path) if conditional else None
         data = await self.__do_authenticated_request(
-            "GET",
-            "/api/v1.0/equipments?PageSize=100&PageNumber=1&Logic=And&Filters=&Sorts=",
+            "GET", path, conditional=conditional
         )
-        _LOGGER.debug("Equipment JSON: %s", data)
-        return data
+        _LOGGER.debug("Equipment JSON (page %d): %s", page_number, data)
+        return data, previous is not None and data is previous
+
+    def __equipment_page_path(self, page_number: int) -> str:
+        return (
+            f"/api/v1.0/equipments?PageSize={self.EQUIPMENT_PAGE_SIZE}"
+            f"&PageNumber={page_number}&Logic=And&Filters=&Sorts="
+        )
+
+    def __has_next_equipment_page(
+        self, page: dict[str, any], page_number: int, page_length: int
+    ) -> bool:
+        if page_number >= self.MAX_EQUIPMENT_PAGES:
+            _LOGGER.warning(
+                "Listing at most %d equipment pages", self.MAX_EQUIPMENT_PAGES
+            )
+            return False
+        if page.get("totalPages") is not None:
+            return page_number < page["totalPages"]
+        if page.get("totalRecords") is not None:
+            return page_number * self.EQUIPMENT_PAGE_SIZE < page["totalRecords"]
+        return page_length >= self.EQUIPMENT_PAGE_SIZE
+
+    async def start(
+        self,
+        update_callback: Callable[[dict[str, BrewCreatorEquipment]], Awaitable[None]],
+        timeout: float | None = None,
+        hold_updates: bool = False,
+    ) -> dict[str, BrewCreatorEquipment]:
+        """Acquire tokens once, then list equipment while the WebSocket connects.
+
+        With hold_updates set, pushed updates are buffered until resume_updates()
+        is called. The duration of each phase is recorded in startup_timings. Calling
+        start again, for example after a failed listing, keeps the running WebSocket.
+        """
+        self.__startup_time = time.monotonic()
+        self.__startup_timings.clear()
+        if hold_updates:
+            self.__updates_resumed.clear()
+            self.__resync_on_resume = False
+        async with _request_deadline(
+            self.__read_timeout if timeout is None else timeout, "Acquiring tokens"
+        ):
+            await self.__update_access_token_if_invalid()
+        self.__record_startup_phase("tokens", self.__startup_time)
+        if self.__websocket_task is None or self.__websocket_task.done():
+            await self.start_websocket(update_callback)
+        started = time.monotonic()
+        equipment = await self.list_equipment(timeout)
+        self.__record_startup_phase("equipment", started)
+        return equipment
+
+    def resume_updates(self) -> None:
+        """Process the updates pushed since start() was called with hold_updates."""
+        if self.__updates_resumed.is_set():
+            return
+        if self.__startup_time is not None:
+            self.__record_startup_phase("updates_held", self.__startup_time)
+        statistics = self.__websocket_queue.statistics
+        _LOGGER.debug("Resuming updates, %d buffered", statistics["depth"])
+        self.__updates_resumed.set()
+        if self.__resync_on_resume:
+            # Updates were lost while buffering, so they cannot be applied as deltas
+            self.__resync_on_resume = False
+            self.__refresh_scheduler.request_refresh()
+
+    def __request_resync(self) -> None:
+        """Fetch all equipment after device twin deltas may have been lost.
+
+        While updates are held, the fetch is deferred to resume_updates().
+        """
+        if self.__updates_resumed.is_set():
+            self.__refresh_scheduler.request_refresh()
+        else:
+            self.__resync_on_resume = True
+
+    def __on_websocket_message_dropped(self) -> None:
+        # A dropped device twin delta is lost for good
+        self.__request_resync()
+
+    def __record_startup_phase(self, phase: str, started: float) -> None:
+        if self.__startup_time is not None and phase not in self.__startup_timings:
+            self.__startup_timings[phase] = time.monotonic() - started
+            _LOGGER.debug(
+                "Startup phase %s took %.3f seconds",
+                phase,
+                self.__startup_timings[phase],
+            )
 
     async def start_websocket(
         self,
@@ -381,7 +1966,8 @@ class BrewCreatorAPI:
             or self.__websocket_task.done()
             or self.__websocket_task.cancelled()
         ):
-            self.__websocket_task = asyncio.create_task(self.__websocket_loop())
+            self.__websocket_connects = 0
+            self.__websocket_task = _create_background_task(self.__websocket_loop())
         else:
             raise BrewCreatorError("WebSocket already running")
 
@@ -391,32 +1977,77 @@ class BrewCreatorAPI:
             with contextlib.suppress(asyncio.CancelledError):
                 await self.__websocket_task
             self.__websocket_task = None
+        await self.__refresh_scheduler.cancel()
+        for scheduler in self.__equipment_refresh_schedulers.values():
+            await scheduler.cancel()
+        self.__equipment_refresh_schedulers.clear()
 
     async def _update_equipment_state(
+        self,
+        equipment_id: str,
+        json_payload: dict[str, any],
+        timeout: float | None = None,
+    ) -> bool:
+        # Show the written values immediately until confirmed by the server
+        self.__pending_writes.add(equipment_id, json_payload)
+        self.__changes.modify(equipment_id, json_payload)
+        await self.__publish_current_equipment()
+        succeeded = False
+        try:
+            async with _request_deadline(
+                self.__write_timeout if timeout is None else timeout,
+                f"Updating equipment {equipment_id}",
+            ):
+                succeeded = await self.__write_coalescer.write(
+                    equipment_id, json_payload
+                )
+        finally:
+            if not succeeded:
+                self.__pending_writes.remove(equipment_id, json_payload)
+                self.__changes.modify(equipment_id, json_payload)
+                await self.__publish_current_equipment()
+        if self.__pending_writes_task is None or self.__pending_writes_task.done():
+            self.__pending_writes_task = _create_background_task(
+                self.__expire_pending_writes()
+            )
+        return succeeded
+
+    async def __put_equipment_state(
         self, equipment_id: str, json_payload: dict[str, any]
     ) -> bool:
-        json = await self.__do_authenticated_request(
-            "PUT", f"/api/v1.0/equipments/{equipment_id}", json_payload
-        )
+        async with _request_deadline(
+            self.__write_timeout, f"Updating equipment {equipment_id}"
+        ):
+            json = await self.__do_authenticated_request(
+                "PUT", f"/api/v1.0/equipments/{equipment_id}", json_payload
+            )
         return json["succeeded"]
 
     def __get_equipment_from_json(
         self, equipment: dict[str, any]
     ) -> BrewCreatorEquipment | None:
-        equipment_type = EquipmentType(equipment["iotHubBrewEquipmentGroupId"])
+        """Decode equipment JSON, returning None for unsupported equipment types.
+
+        Unknown equipment types are logged once by the enum parsing.
+        """
+        equipment_type = _parse_enum(
+            EquipmentType, equipment["iotHubBrewEquipmentGroupId"]
+        )
         if equipment_type == EquipmentType.FERMINATOR:
             return Ferminator(self, equipment)
         if equipment_type == EquipmentType.TILT:
             return Tilt(self, equipment)
-        _LOGGER.warning(
-            "Unknown equipment type '%s' with ID '%s'",
-            equipment_type,
+        _LOGGER.debug(
+            "Skipping equipment '%s' of type '%s'",
             equipment["id"],
+            equipment["iotHubBrewEquipmentGroupId"],
         )
         return None
 
     async def __websocket_loop(self) -> None:
+        failures = 0
         while True:
+            self.__websocket_connected_time = None
             try:
                 await self.__websocket_connect_and_listen()
             except asyncio.CancelledError:
@@ -424,16 +2055,56 @@ class BrewCreatorAPI:
                     "WebSocket listener stopped. Shutting down websocket task."
                 )
                 return
+            except BrewCreatorCircuitOpenError as e:
+                _LOGGER.info("Unable to connect WebSocket: %s", e)
             except Exception:
                 _LOGGER.exception("Unexpected error in WebSocket listener")
-                await asyncio.sleep(60)
+            if (
+                self.__websocket_connected_time is not None
+                and time.monotonic() - self.__websocket_connected_time
+                >= self.WEBSOCKET_HEALTHY_CONNECTION_SECONDS
+            ):
+                # Start over with an immediate reconnect after a healthy connection
+                failures = 0
+            failures += 1
+            delay = self.__websocket_retry_policy.next_delay(failures)
+            if delay is None:
+                _LOGGER.error(
+                    "Giving up connecting WebSocket after %d attempts, "
+                    "equipment is no longer updated by pushes",
+                    failures,
+                )
+                return
+            _LOGGER.info(
+                "Reconnecting WebSocket in %.1f seconds (attempt %d)", delay, failures
+            )
+            await asyncio.sleep(delay)
 
-    async def __websocket_connect_and_listen(self):
-        response = await self.__do_authenticated_request(
-            "POST", "/telemetry/negotiate?negotiateVersion=1"
+    def __fall_back_to_json_protocol(self, reason: str) -> None:
+        _LOGGER.warning(
+            "Falling back from the %s to the JSON hub protocol as %s",
+            self.__signalr_protocol.name,
+            reason,
         )
+        self.__signalr_protocol = SignalRJsonProtocol()
+
+    async def __websocket_connect_and_listen(self):
+        if self.__connection_stagger is not None:
+            await self.__connection_stagger.wait()
+        started = time.monotonic()
+        async with _request_deadline(self.__read_timeout, "WebSocket negotiation"):
+            response = await self.__do_authenticated_request(
+                "POST", "/telemetry/negotiate?negotiateVersion=1"
+            )
+        self.__record_startup_phase("websocket_negotiate", started)
+        started = time.monotonic()
+        if self.__signalr_protocol.is_binary and not _supports_binary_transfer(
+            response
+        ):
+            self.__fall_back_to_json_protocol("the server does not offer binary frames")
         connection_token = response["connectionToken"]
-        wss_host = "wss://api.brewcreator.com"
+        # The SignalR endpoint is served from the API host over ws:// or wss://
+        wss_host = "ws" + self.__api_url.removeprefix("http")
         url = f"{wss_host}/telemetry?id={connection_token}&access_token={self.__access_token}"
         async with self.__session.ws_connect(
             url,
@@ -442,19 +2113,45 @@ class BrewCreatorAPI:
             heartbeat=10,
             timeout=30,
             receive_timeout=None,
+            # Offer permessage-deflate for the binary protocol, the server may decline
+            compress=15 if self.__signalr_protocol.is_binary else 0,
         ) as ws:
-            await ws.send_str('{"protocol":"json","version":1}')
-            handshake_response = await ws.receive()
-            if handshake_response.data != "{}":
+            await ws.send_str(self.__signalr_protocol.handshake_request())
+            handshake_response = await ws.receive(timeout=30)
+            accepted, remainder = self.__signalr_protocol.parse_handshake_response(
+                handshake_response.data
+            )
+            if not accepted and self.__signalr_protocol.is_binary:
+                self.__fall_back_to_json_protocol(
+                    f"the handshake was rejected: '{handshake_response.data}'"
+                )
+                return
+            if not accepted:
                 _LOGGER.warning(
                     "Unexpected handshake response: '%s'. Connection will likely be closed by server",
                     handshake_response.data,
                 )
             else:
-                await ws.send_str(
-                    '{"arguments":["devicetwin"],"target":"SubscribeToUser","type":1}'
+                await self.__websocket_send(
+                    ws,
+                    self.__signalr_protocol.encode_invocation(
+                        "SubscribeToUser", ["devicetwin"]
+                    ),
+                )
+                self.__websocket_connected_time = time.monotonic()
+                self.__websocket_connected = True
+                self.__websocket_connects += 1
+                if self.__websocket_connects > 1:
+                    # Pushes sent while disconnected are missed
+                    self.__request_resync()
+                self.__record_startup_phase("websocket_handshake", started)
+                _LOGGER.info(
+                    "Successfully connected to %s using %s protocol",
+                    wss_host,
+                    self.__signalr_protocol.name,
                 )
-                _LOGGER.info("Successfully connected to %s", wss_host)
+                if remainder:
+                    self.__websocket_queue.put(remainder)
             # Send text message every 10th second to keep connection alive in a separate task
             if self.__websocket_ping_task is not None:
                 self.__websocket_ping_task.cancel()
@@ -464,38 +2161,252 @@ class BrewCreatorAPI:
             self.__websocket_ping_task = asyncio.create_task(
                 self.__websocket_signalr_ping(ws)
             )
-            async for msg in ws:  # type: aiohttp.WSMessage
-                if msg.type == aiohttp.WSMsgType.TEXT:
-                    if msg.data == '{"type":6}':
-                        _LOGGER.debug("Received WebSocket SignalR ping")
-                    elif msg.data.startswith('{"type":1'):
-                        _LOGGER.debug(
-                            "Received a message that will trigger a state update: %s",
-                            msg.data,
+            processor_task = asyncio.create_task(self.__websocket_process_messages())
+            try:
+                async for msg in ws:  # type: aiohttp.WSMessage
+                    if msg.type in (aiohttp.WSMsgType.TEXT, aiohttp.WSMsgType.BINARY):
+                        self.__websocket_queue.put(msg.data)
+                    elif msg.type == aiohttp.WSMsgType.CLOSED:
+                        _LOGGER.info("WebSocket connection closed")
+                        return
+                    elif msg.type == aiohttp.WSMsgType.ERROR:
+                        _LOGGER.error(
+                            "WebSocket failed with error: %s",
+                            ws.exception(),
                         )
-                        await self.__update_callback(await self.list_equipment())
+                        return
                     else:
-                        _LOGGER.debug("Received unexpected message: %s", msg.data)
-                elif msg.type == aiohttp.WSMsgType.CLOSED:
-                    _LOGGER.info("WebSocket connection closed")
-                    await asyncio.sleep(60)
-                    return
-                elif msg.type == aiohttp.WSMsgType.ERROR:
-                    _LOGGER.error(
-                        "WebSocket failed with error: %s",
-                        ws.exception(),
-                    )
-                    await asyncio.sleep(60)
-                    return
-                else:
-                    _LOGGER.error("Unexpected WebSocket message type: %s", msg.type)
+                        _LOGGER.error("Unexpected WebSocket message type: %s", msg.type)
+            finally:
+                self.__websocket_connected = False
+                processor_task.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await processor_task
+                # Unprocessed messages are dropped, requesting a resync
+                self.__websocket_queue.clear()
+
+    async def __websocket_process_messages(self) -> None:
+        while True:
+            await self.__updates_resumed.wait()
+            data = await self.__websocket_queue.get()
+            try:
+                await self.__process_websocket_message(data)
+            except Exception:
+                _LOGGER.exception("Failed to process WebSocket message: %s", data)
+
+    async def __process_websocket_message(self, data: str | bytes) -> None:
+        invocations: list[SignalRMessage] = []
+        for message in self.__signalr_protocol.parse_messages(data):
+            if message.message_type == SignalRMessageType.INVOCATION:
+                invocations.append(message)
+            elif message.message_type == SignalRMessageType.PING:
+                _LOGGER.debug("Received WebSocket SignalR ping")
+            elif message.message_type == SignalRMessageType.COMPLETION:
+                self.__on_signalr_completion(message)
+            elif message.message_type == SignalRMessageType.CLOSE:
+                self.__on_signalr_close(message)
+            else:
+                _LOGGER.debug("Received unexpected message: %s", message)
+        if invocations:
+            await self.__on_signalr_invocations(invocations)
+
+    async def __on_signalr_invocations(self, invocations: list[SignalRMessage]):
+        _LOGGER.debug(
+            "Received %d message(s) that will trigger a state update: %s",
+            len(invocations),
+            invocations,
+        )
+        arguments = [a for m in invocations for a in m.arguments]
+        patches = self.__parse_device_twin_arguments(arguments)
+        if patches is None:
+            _LOGGER.debug("Unable to apply message as delta, fetching all equipment")
+            self.__refresh_scheduler.request_refresh()
+            return
+        for equipment_id in [i for i, fields in patches.items() if not fields]:
+            _LOGGER.debug("No known fields in message, fetching %s", equipment_id)
+            self.__request_equipment_refresh(equipment_id)
+        patches = {i: fields for i, fields in patches.items() if fields}
+        if not patches:
+            return
+        equipment = self.__apply_device_twin_patches(patches)
+        if self.__changes:
+            await self.__update_callback(equipment)
+
+    def __on_signalr_completion(self, message: SignalRMessage) -> None:
+        if message.error is not None:
+            _LOGGER.warning(
+                "SignalR invocation %s failed: %s", message.invocation_id, message.error
+            )
+        else:
+            _LOGGER.debug("SignalR invocation %s completed", message.invocation_id)
+
+    def __on_signalr_close(self, message: SignalRMessage) -> None:
+        if message.error is not None:
+            _LOGGER.warning(
+                "Server is closing the WebSocket connection: %s", message.error
+            )
+        else:
+            _LOGGER.info("Server is closing the WebSocket connection")
+
+    async def __refresh_all_equipment(self) -> None:
+        equipment = await self.list_equipment()
+        if self.__changes:
+            await self.__update_callback(equipment)
+
+    def __request_equipment_refresh(self, equipment_id: str) -> None:
+        scheduler = self.__equipment_refresh_schedulers.get(equipment_id)
+        if scheduler is None:
+
+            async def refresh() -> None:
+                equipment = await self.refresh_equipment(equipment_id)
+                if self.__changes:
+                    await self.__update_callback(equipment)
+
+            scheduler = CoalescingRefreshScheduler(refresh, self.__min_refresh_interval)
+            self.__equipment_refresh_schedulers[equipment_id] = scheduler
+        scheduler.request_refresh()
+
+    def __parse_device_twin_arguments(
+        self, arguments: list[any]
+    ) -> dict[str, dict[str, any]] | None:
+        """Resolve device twin invocation arguments to per-equipment field patches.
+
+        Returns None if any argument cannot be resolved to known equipment. An empty
+        patch means the equipment is known but the argument has no known fields.
+        """
+        if not self.__registry.equipment or not arguments:
+            return None
+        patches: dict[str, dict[str, any]] = {}
+        for argument in arguments:
+            patch = self.__parse_device_twin_argument(argument)
+            if patch is None:
+                return None
+            equipment_id, fields = patch
+            patches.setdefault(equipment_id, {}).update(fields)
+        return patches
+
+    def __apply_device_twin_patches(
+        self, patches: dict[str, dict[str, any]]
+    ) -> dict[str, BrewCreatorEquipment]:
+        """Patch the JSON of the equipment in the current snapshot.
+
+        Returns the updated equipment mapping.
+        """
+        equipment = self.__registry.equipment
+        self.__update_registry(
+            _merge_json(equipment[equipment_id].json, fields)
+            for equipment_id, fields in patches.items()
+        )
+        _LOGGER.debug("Applied device twin update to %s", list(patches))
+        return self.__current_equipment()
+
+    def __update_registry(
+        self, equipment_json: Iterable[dict[str, any]], complete: bool = False
+    ) -> None:
+        changes = self.__registry.update(equipment_json, complete)
+        if changes:
+            _LOGGER.debug("Equipment changed: %s", changes)
+            self.__registry_version += 1
+            self.__changes.update(changes)
+
+    def __current_equipment(self) -> dict[str, BrewCreatorEquipment]:
+        """Return the equipment snapshot with pending writes applied on top.
+
+        Pending writes confirmed by the snapshot are cleared.
+        """
+        snapshot = self.__registry.equipment
+        if not self.__pending_writes:
+            return snapshot
+        for equipment_id, fields in self.__pending_writes.confirm(
+            {i: e.json for i, e in snapshot.items()}
+        ).items():
+            _LOGGER.debug("Write to %s confirmed: %s", equipment_id, fields)
+        if not self.__pending_writes:
+            return snapshot
+        equipment = dict(snapshot)
+        for equipment_id, fields in self.__pending_writes.fields().items():
+            if equipment_id not in equipment:
+                continue
+            overlay = self.__get_equipment_from_json(
+                _overlay_json(equipment[equipment_id].json, fields)
+            )
+            if overlay is None:
+                continue
+            # Link against the snapshot, equipment in the snapshot is never relinked
+            # to overlays
+            if isinstance(overlay, Ferminator):
+                overlay._link_connected_equipment(snapshot)
+            equipment[equipment_id] = overlay
+        return equipment
+
+    async def __publish_current_equipment(self) -> None:
+        if self.__update_callback is not None and self.__registry.equipment:
+            await self.__update_callback(self.__current_equipment())
+
+    async def __expire_pending_writes(self) -> None:
+        """Check writes that were not pushed back by the server before their deadline.
+
+        The equipment is fetched first, which confirms the fields the server reports
+        as written. Only fields the server contradicts, or that cannot be checked,
+        are rolled back.
+        """
+        while (deadline := self.__pending_writes.next_deadline()) is not None:
+            await asyncio.sleep(max(deadline - time.monotonic(), 0))
+            due = self.__pending_writes.due(time.monotonic())
+            for equipment_id in due:
+                try:
+                    await self.refresh_equipment(equipment_id)
+                except (BrewCreatorError, aiohttp.ClientError, TimeoutError) as e:
+                    _LOGGER.info("Unable to check write to %s: %s", equipment_id, e)
+            expired = self.__pending_writes.expire(time.monotonic())
+            for equipment_id, fields in expired.items():
+                _LOGGER.warning(
+                    "Write to %s was not confirmed by the server, rolling back: %s",
+                    equipment_id,
+                    fields,
+                )
+                self.__changes.modify(equipment_id, fields)
+            if due or expired:
+                await self.__publish_current_equipment()
+
+    def __parse_device_twin_argument(
+        self, argument: any
+    ) -> tuple[str, dict[str, any]] | None:
+        if isinstance(argument, str):
+            try:
+                argument = json.loads(argument)
+            except ValueError:
+                return None
+        if not isinstance(argument, dict):
+            return None
+        equipment = self.__registry.equipment.get(argument.get("id"))
+        if equipment is None:
+            serial_number = argument.get("iotHubBrewEquipmentId") or argument.get(
+                "deviceId"
+            )
+            equipment = next(
+                (
+                    e
+                    for e in self.__registry.equipment.values()
+                    if serial_number is not None and e.serial_number == serial_number
+                ),
+                None,
+            )
+        if equipment is None:
+            return None
+        fields = {
+            k: v
+            for k, v in argument.items()
+            if k in equipment.json and k not in ("id", "iotHubBrewEquipmentId")
+        }
+        return equipment.id, fields
 
     async def __websocket_signalr_ping(self, ws: aiohttp.ClientWebSocketResponse):
         while True:
             await asyncio.sleep(10)
             try:
                 _LOGGER.debug("Sending WebSocket SignalR ping message")
-                await ws.send_str('{"type":6}')
+                await self.__websocket_send(ws, self.__signalr_protocol.encode_ping())
             except (
                 asyncio.CancelledError,
                 ClientConnectionResetError,
@@ -506,56 +2417,148 @@ class BrewCreatorAPI:
                 _LOGGER.exception("Failed to send WebSocket SignalR ping")
                 return
 
+    @staticmethod
+    async def __websocket_send(
+        ws: aiohttp.ClientWebSocketResponse, data: str | bytes
+    ) -> None:
+        if isinstance(data, bytes):
+            await ws.send_bytes(data)
+        else:
+            await ws.send_str(data)
+
     async def __do_authenticated_request(
-        self, method: str, path: str, json: dict[str, any] | None = None
+        self,
+        method: str,
+        path: str,
+        json: dict[str, any] | None = None,
+        retry_policy: RetryPolicy | None = None,
+        conditional: bool = False,
     ) -> dict[str, any] | None:
-        max_attempts = 5
-        sleep_seconds_between_attempts = 1
-        for attempt in range(max_attempts):
+        """Perform an API request and return the decoded response.
+
+        Conditional GET requests return the earlier decoded response, the same
+        object, when the response is unchanged.
+        """
+        retry_policy = retry_policy or self.__request_retry_policy
+        rate_limiter = (
+            self.__write_rate_limiter
+            if method in ("PUT", "PATCH", "DELETE")
+            else self.__read_rate_limiter
+        )
+        attempt = 0
+        while True:
+            attempt += 1
+            self.__circuit_breaker.before_request()
             try:
                 await self.__update_access_token_if_invalid()
+                await rate_limiter.acquire()
                 _LOGGER.debug("Performing request %s %s", method, path)
+                headers = {
+                    "Authorization": f"Bearer {self.__access_token}",
+                    "Accept": "application/json",
+                }
+                if conditional:
+                    headers.update(self.__response_cache.request_headers(path))
                 async with self.__session.request(
                     method,
-                    f"https://api.brewcreator.com{path}",
-                    headers={
-                        "Authorization": f"Bearer {self.__access_token}",
-                        "Accept": "application/json",
-                    },
+                    f"{self.__api_url}{path}",
+                    headers=headers,
                     json=json,
+                    timeout=self.__client_timeout(),
                 ) as response:
+                    if response.status >= 500:
+                        self.__circuit_breaker.record_failure()
+                    else:
+                        self.__circuit_breaker.record_success()
                     if response.status == 401:
                         raise BrewCreatorAuthError(  # noqa: TRY301
                             f"Failed to {method} {path}: {response.status}"
                         )
                     if response.status == 500:
                         _LOGGER.info(
-                            "Failed to %s %s: %s", method, path, response.status
+                            "Failed to %s %s: %s. Attempt %d of %d",
+                            method,
+                            path,
+                            response.status,
+                            attempt,
+                            retry_policy.max_attempts,
                         )
-                        continue
-                    if response.status != 200:
+                    elif response.status == 304 and conditional:
+                        return self.__response_cache.not_modified(path)
+                    elif response.status != 200:
                         raise BrewCreatorError(
                             f"Failed to {method} {path}: {response.status}"
                         )
-                    return await response.json() if response.content else None
+                    elif conditional:
+                        return self.__response_cache.update(
+                            path, response.headers, await response.read()
+                        )
+                    else:
+                        return await response.json() if response.content else None
+            except (aiohttp.ClientError, TimeoutError):
+                self.__circuit_breaker.record_failure()
+                raise
             except BrewCreatorAuthError as e:
                 _LOGGER.info(
-                    "Failed to authenticate. Attempt %d of %d. Retrying in %d seconds: %s",
-                    attempt + 1,
-                    max_attempts,
-                    sleep_seconds_between_attempts,
+                    "Failed to authenticate. Attempt %d of %d: %s",
+                    attempt,
+                    retry_policy.max_attempts,
                     e,
                 )
                 self.__access_token = None
                 self.__refresh_token = None
                 self.__expire_time = None
+                self.__update_expire_deadline()
                 await self.__token_storage.save_tokens(None, None, None)
-            await asyncio.sleep(sleep_seconds_between_attempts)
-        raise BrewCreatorError(
-            "Failed to perform request after %d attempts", max_attempts
-        )
+            delay = retry_policy.next_delay(attempt)
+            if delay is None:
+                raise BrewCreatorError(
+                    f"Failed to {method} {path} after {attempt} attempts"
+                )
+            deadline = _REQUEST_DEADLINE.get()
+            if (
+                deadline is not None
+                and asyncio.get_running_loop().time() + delay >= deadline
+            ):
+                raise BrewCreatorTimeoutError(
+                    f"Failed to {method} {path} after {attempt} attempts, "
+                    "no time left for another attempt"
+                )
+            _LOGGER.debug("Retrying %s %s in %.1f seconds", method, path, delay)
+            await asyncio.sleep(delay)
+
+    def __client_timeout(self, total: float | None = None) -> aiohttp.ClientTimeout:
+        """Return a request timeout that ends no later than the current deadline."""
+        deadline = _REQUEST_DEADLINE.get()
+        if deadline is not None:
+            remaining = max(deadline - asyncio.get_running_loop().time(), 0)
+            total = remaining if total is None else min(total, remaining)
+        if total is None:
+            return self.__session.timeout
+        return aiohttp.ClientTimeout(total=total)
 
     async def __update_access_token_if_invalid(self):
+        if (
+            self.__initial_token_load_completed
+            and not self.__is_access_token_missing_or_expired()
+        ):
+            _LOGGER.debug(
+                "Access token is assumed valid as it has expiry %s",
+                self.__expire_time,
+            )
+            return
+        await self.__acquire_tokens(renew=False)
+
+    async def __acquire_tokens(self, renew: bool) -> None:
+        """Acquire tokens, sharing a single in-flight acquisition between all callers."""
+        if self.__token_task is None or self.__token_task.done():
+            self.__token_task = _create_background_task(
+                self.__acquire_tokens_once(renew)
+            )
+        # Shield the shared acquisition from cancellation of any single caller
+        await asyncio.shield(self.__token_task)
+
+    async def __acquire_tokens_once(self, renew: bool) -> None:
         if not self.__initial_token_load_completed:
             (
                 self.__access_token,
@@ -563,15 +2566,15 @@ class BrewCreatorAPI:
                 self.__expire_time,
             ) = await self.__token_storage.load_tokens()
             self.__initial_token_load_completed = True
+            self.__update_expire_deadline()
             _LOGGER.debug(
                 "Loaded access token from storage with expiry %s", self.__expire_time
             )
-        if not self.__is_access_token_missing_or_expired():
-            _LOGGER.debug(
-                "Access token is assumed valid as it has expiry %s",
-                self.__expire_time,
-            )
+        if not renew and not self.__is_access_token_missing_or_expired():
             return
+        if self.__connection_stagger is not None:
+            await self.__connection_stagger.wait()
+        await self.__read_rate_limiter.acquire()
         if self.__refresh_token is not None:
             await self.__set_tokens(await self.__exchange_refresh_token_for_tokens())
             return
@@ -579,14 +2582,73 @@ class BrewCreatorAPI:
             await self.__exchange_username_and_password_for_tokens()
         )
 
+    async def __renew_tokens_before_expiry(self) -> None:
+        """Renew the tokens ahead of expiry, backing off after failed renewals.
+
+        Setting the renewed tokens replaces this task with one for the new tokens.
+        """
+        margin = min(self.TOKEN_RENEWAL_MARGIN, self.__token_lifetime / 2)
+        delay = max(
+            self.__expire_deadline - margin - time.monotonic(),
+            self.TOKEN_MIN_RENEWAL_INTERVAL,
+        )
+        failures = 0
+        while True:
+            await asyncio.sleep(delay)
+            _LOGGER.debug(
+                "Renewing access token ahead of expiry %s", self.__expire_time
+            )
+            try:
+                await self.__acquire_tokens(renew=True)
+                return
+            except (BrewCreatorError, aiohttp.ClientError, TimeoutError) as e:
+                if isinstance(e, BrewCreatorAuthError):
+                    # The refresh token is rejected, log in with the password next
+                    self.__refresh_token = None
+                failures += 1
+                delay = self.__request_retry_policy.next_delay(failures)
+                if delay is None:
+                    _LOGGER.warning(
+                        "Failed to renew access token ahead of expiry, tokens are "
+                        "acquired again when needed: %s",
+                        e,
+                    )
+                    return
+                delay = max(delay, self.TOKEN_MIN_RENEWAL_INTERVAL)
+                _LOGGER.info(
+                    "Failed to renew access token ahead of expiry, retrying in "
+                    "%.1f seconds: %s",
+                    delay,
+                    e,
+                )
+
+    def __update_expire_deadline(self) -> None:
+        if self.__expire_time is None:
+            self.__expire_deadline = None
+            self.__token_lifetime = None
+        else:
+            self.__token_lifetime = max(
+                (self.__expire_time - datetime.now()).total_seconds(), 0
+            )
+            self.__expire_deadline = time.monotonic() + self.__token_lifetime
+        if self.__token_renewal_task is not None:
+            self.__token_renewal_task.cancel()
+            self.__token_renewal_task = None
+        # Tokens acquired while closing must not restart renewal
+        if self.__expire_deadline is not None and not self.__closed:
+            self.__token_renewal_task = _create_background_task(
+                self.__renew_tokens_before_expiry()
+            )
+
     def __is_access_token_missing_or_expired(self) -> bool:
         if self.__access_token is None:
             _LOGGER.debug("Access token is missing")
             return True
-        if self.__expire_time is None:
+        if self.__expire_deadline is None:
             _LOGGER.debug("Expire time is missing")
             return True
-        if datetime.now() > self.__expire_time - timedelta(minutes=2):
+        margin = min(self.TOKEN_EXPIRY_MARGIN, self.__token_lifetime / 2)
+        if time.monotonic() > self.__expire_deadline - margin:
             _LOGGER.debug("Access token is expired (expiry=%s)", self.__expire_time)
             return True
         return False
@@ -594,12 +2656,13 @@ class BrewCreatorAPI:
     async def __exchange_refresh_token_for_tokens(self) -> tuple[str, str, datetime]:
         _LOGGER.debug("Exchanging refresh token for new tokens")
         async with self.__session.post(
-            "https://identity.brewcreator.com/connect/token",
+            f"{self.__identity_url}/connect/token",
             data={
                 "grant_type": "refresh_token",
                 "client_id": "brew-creator",
                 "refresh_token": self.__refresh_token,
             },
+            timeout=self.__client_timeout(),
         ) as response:
             if response.status != 200:
                 raise BrewCreatorAuthError(
@@ -623,7 +2686,8 @@ class BrewCreatorAPI:
 
     async def __get_csrf_token(self) -> str:
         async with self.__session.get(
-            "https://identity.brewcreator.com/Account/Login", timeout=60
+            f"{self.__identity_url}/Account/Login",
+            timeout=self.__client_timeout(60),
         ) as response:
             if response.status != 200:
                 raise BrewCreatorError(f"Failed to get CSRF token: {response.status}")
@@ -646,7 +2710,7 @@ class BrewCreatorAPI:
         code_challenge = base64.urlsafe_b64encode(sha256.digest()).decode().rstrip("=")
         async with self.__session.post(
             (
-                f"https://identity.brewcreator.com/account/login?returnurl=%2Fconnect%2Fauthorize%3Fclient_id%3Dbrew-creator%26redirect_uri%"
+                f"{self.__identity_url}/account/login?returnurl=%2Fconnect%2Fauthorize%3Fclient_id%3Dbrew-creator%26redirect_uri%"
                 f"3Dhttps%253A%252F%252Fbrewcreator.com%26response_type%3Dcode%26scope%3Dopenid%2520profile%2520email%2520phone%2520roles%2520brewer-access"
                 f"%2520offline_access%26nonce%3D{nonce}%26state%3D{state}%26code_challenge%3D{code_challenge}%26code_challenge_method%3DS256%26ui_locales%3Den-US"
             ),
@@ -655,6 +2719,7 @@ class BrewCreatorAPI:
                 "Password": password,
                 "__RequestVerificationToken": csrf_token,
             },
+            timeout=self.__client_timeout(),
         ) as response:
             if response.status != 200:
                 raise BrewCreatorAuthError(f"Failed to authenticate: {response.status}")
@@ -674,7 +2739,7 @@ class BrewCreatorAPI:
     ) -> tuple[str, str, datetime]:
         _LOGGER.debug("Exchanging code for tokens")
         async with self.__session.post(
-            "https://identity.brewcreator.com/connect/token",
+            f"{self.__identity_url}/connect/token",
             data={
                 "grant_type": "authorization_code",
                 "client_id": "brew-creator",
@@ -682,7 +2747,7 @@ class BrewCreatorAPI:
                 "code": code,
                 "redirect_uri": "https://brewcreator.com",
             },
-            timeout=20,
+            timeout=self.__client_timeout(20),
         ) as response:
             if response.status != 200:
                 raise BrewCreatorAuthError(
@@ -698,6 +2763,7 @@ class BrewCreatorAPI:
     async def __set_tokens(self, tokens: tuple[str, str, datetime]) -> None:
         _LOGGER.debug("Storing new access token with expiry %s", tokens[2])
         self.__access_token, self.__refresh_token, self.__expire_time = tokens
+        self.__update_expire_deadline()
         await self.__token_storage.save_tokens(
             self.__access_token, self.__refresh_token, self.__expire_time
         )
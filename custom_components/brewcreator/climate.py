@@ -39,6 +39,17 @@ async def async_setup_entry(
 
 
 class FerminatorConnectClimate(FerminatorEntity, ClimateEntity):
+    _equipment_fields = frozenset(
+        {
+            "actualTemperature",
+            "connectedEquipments",
+            "setTemperature",
+            "lProcess",
+            "fanSpeed",
+            "isRegulatingTemperature",
+        }
+    )
+
     def __init__(self, coordinator: BrewCreatorDataUpdateCoordinator, id: str) -> None:
         super().__init__(coordinator, id, "Temperature Control", "")
         self._attr_supported_features = (
@@ -70,8 +81,8 @@ class FerminatorConnectClimate(FerminatorEntity, ClimateEntity):
         )
 
     @property
-    def hvac_action(self) -> HVACAction:
-        return MODE_TO_HVAC_ACTION[self.__ferminator().mode]
+    def hvac_action(self) -> HVACAction | None:
+        return MODE_TO_HVAC_ACTION.get(self.__ferminator().mode)
 
     @property
     def fan_mode(self) -> str | None:
@@ -79,7 +90,7 @@ class FerminatorConnectClimate(FerminatorEntity, ClimateEntity):
 
     @property
     def available(self) -> bool:
-        return self.__ferminator().is_connected
+        return not self._equipment_removed and self.__ferminator().is_connected
 
     async def async_turn_on(self) -> None:
         await self.async_set_hvac_mode(HVACMode.HEAT_COOL)
@@ -101,7 +112,7 @@ class FerminatorConnectClimate(FerminatorEntity, ClimateEntity):
         await self.__ferminator().set_regulating_temperature(is_regulating)
 
     def __ferminator(self) -> Ferminator:
-        return self.coordinator.data[self._brewcreator_id]
+        return self._brewcreator_device
 
     @callback
     def _handle_coordinator_update(self) -> None:
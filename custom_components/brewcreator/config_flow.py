@@ -18,11 +18,14 @@ from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
 
+from . import hub_protocol
 from .api import (
     BrewCreatorAPI,
     BrewCreatorInvalidCredentialsError,
     FermentationType,
     Ferminator,
+    SignalRJsonProtocol,
+    SignalRMessagePackProtocol,
 )
 from .const import (
     CONF_BATCH_INFO_BEER_STYLE,
@@ -35,10 +38,11 @@ from .const import (
     CONF_BATCH_INFO_OWNER,
     CONF_BATCH_INFO_STARTED,
     CONF_BATCH_INFO_VOLUME,
+    CONF_HUB_PROTOCOL,
     DOMAIN,
 )
 from .coordinator import BrewCreatorDataUpdateCoordinator
-from .token_store import BrewCreatorTokenStore
+from .token_store import BrewCreatorTokenStore, account_key
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -55,14 +59,18 @@ async def validate_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str,
 
     Data has the keys from STEP_USER_DATA_SCHEMA with values provided by the user.
     """
+    # The tokens from the login are shared with the config entry of the account,
+    # so setting up the entry requires no login of its own
     api = BrewCreatorAPI(
         data[CONF_USERNAME],
         data[CONF_PASSWORD],
-        BrewCreatorTokenStore(hass),
+        BrewCreatorTokenStore.for_account(hass, data[CONF_USERNAME]),
         async_get_clientsession(hass),
     )
-
-    await api.verify_username_and_password()
+    try:
+        await api.verify_username_and_password()
+    finally:
+        await api.close()
 
     return {"title": "BrewCreator"}
 
@@ -78,6 +86,8 @@ class BrewCreatorConfigFlow(ConfigFlow, domain=DOMAIN):
         """Handle the initial step."""
         errors: dict[str, str] = {}
         if user_input is not None:
+            await self.async_set_unique_id(account_key(user_input[CONF_USERNAME]))
+            self._abort_if_unique_id_configured()
             try:
                 info = await validate_input(self.hass, user_input)
             except aiohttp.ClientConnectionError:
@@ -105,9 +115,34 @@ class BrewCreatorConfigFlow(ConfigFlow, domain=DOMAIN):
 class BrewCreatorOptionsFlow(OptionsFlow):
     def __init__(self, config_entry: ConfigEntry[BrewCreatorDataUpdateCoordinator]):
         self.coordinator: BrewCreatorDataUpdateCoordinator = config_entry.runtime_data
+        self.hub_protocol: str = hub_protocol(config_entry)
 
     async def async_step_init(
         self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        return self.async_show_menu(
+            step_id="init", menu_options=["batch_info", "connection"]
+        )
+
+    async def async_step_connection(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        if user_input is not None:
+            return self.async_create_entry(
+                title="Connection",
+                data={**self.config_entry.options, **user_input},
+            )
+        schema = vol.Schema(
+            {
+                vol.Required(CONF_HUB_PROTOCOL, default=self.hub_protocol): vol.In(
+                    [SignalRJsonProtocol.name, SignalRMessagePackProtocol.name]
+                ),
+            }
+        )
+        return self.async_show_form(step_id="connection", data_schema=schema)
+
+    async def async_step_batch_info(
+        self, user_input: dict[str, Any] | None = None
     ) -> ConfigFlowResult:
         ferminator = next(
             (e for e in self.coordinator.data.values() if isinstance(e, Ferminator)),
@@ -130,8 +165,10 @@ class BrewCreatorOptionsFlow(OptionsFlow):
                 beer_style=user_input[CONF_BATCH_INFO_BEER_STYLE],
                 is_logging_data=user_input[CONF_BATCH_INFO_STARTED],
             )
-            await self.coordinator.async_request_refresh()
-            return self.async_create_entry(title="Batch Info", data=user_input)
+            return self.async_create_entry(
+                title="Batch Info",
+                data={**self.config_entry.options, **user_input},
+            )
         batch_info = ferminator.batch_info
         is_started = ferminator.is_logging_data
 
@@ -190,6 +227,7 @@ class BrewCreatorOptionsFlow(OptionsFlow):
                     CONF_BATCH_INFO_FERMENTATION_TYPE,
                     default=batch_info.fermentation_type.value
                     if batch_info is not None
+                    and batch_info.fermentation_type is not None
                     else FermentationType.TOP.value,
                 ): vol.In([ft.value for ft in FermentationType]),
                 vol.Required(
@@ -205,4 +243,4 @@ class BrewCreatorOptionsFlow(OptionsFlow):
             }
         )
 
-        return self.async_show_form(step_id="init", data_schema=schema)
+        return self.async_show_form(step_id="batch_info", data_schema=schema)
@@ -1,5 +1,25 @@
+from datetime import timedelta
+
 DOMAIN = "brewcreator"
 
+# Full equipment sync reconciling any device twin updates missed by the websocket
+FULL_SYNC_INTERVAL = timedelta(minutes=15)
+# Minimum spacing between full equipment fetches triggered by websocket messages
+MIN_REFRESH_INTERVAL = timedelta(seconds=5)
+# Deadlines for complete API operations, covering token acquisition and retries
+REFRESH_TIMEOUT = timedelta(seconds=60)
+WRITE_TIMEOUT = timedelta(seconds=30)
+# Spacing and jitter between logins and WebSocket connects across all accounts
+CONNECTION_STAGGER = timedelta(seconds=2)
+CONNECTION_JITTER = timedelta(seconds=1)
+# Delay before saving renewed tokens, merging consecutive renewals
+TOKEN_SAVE_DELAY = timedelta(seconds=10)
+# Delay before saving the equipment snapshot used for warm starts, merging updates
+SNAPSHOT_SAVE_DELAY = timedelta(minutes=1)
+# First delay before retrying a failed refresh after a warm start, doubled after
+# every failure until reaching the full sync interval
+WARM_START_RETRY_DELAY = timedelta(seconds=5)
+
 CONF_BATCH_INFO_BEER_STYLE = "batch_info_beer_style"
 CONF_BATCH_INFO_BREW_NAME = "batch_info_brew_name"
 CONF_BATCH_INFO_EBC = "batch_info_ebc"
@@ -10,3 +30,4 @@ CONF_BATCH_INFO_OG = "batch_info_og"
 CONF_BATCH_INFO_OWNER = "batch_info_owner"
 CONF_BATCH_INFO_STARTED = "batch_info_started"
 CONF_BATCH_INFO_VOLUME = "batch_info_volume"
+CONF_HUB_PROTOCOL = "hub_protocol"
@@ -1,19 +1,48 @@
+import asyncio
 import logging
+from collections.abc import Callable
+from datetime import datetime, timedelta
+from typing import Any, NamedTuple
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+from homeassistant.util import dt as dt_util
 
 from .api import BrewCreatorAPI, BrewCreatorEquipment
-from .const import DOMAIN
+from .const import (
+    DOMAIN,
+    FULL_SYNC_INTERVAL,
+    REFRESH_TIMEOUT,
+    WARM_START_RETRY_DELAY,
+)
+from .snapshot_store import BrewCreatorSnapshotStore
 
 _LOGGER = logging.getLogger(__name__)
 
 
+class EquipmentListenerContext(NamedTuple):
+    """Equipment and JSON fields the state of a listening entity depends on.
+
+    Time dependent listeners are also notified after every full equipment sync,
+    as their state can change without any of their fields changing.
+    """
+
+    equipment_id: str
+    fields: frozenset[str]
+    time_dependent: bool = False
+
+
 class BrewCreatorDataUpdateCoordinator(
     DataUpdateCoordinator[dict[str, BrewCreatorEquipment]]
 ):
-    """Coordinator for updating data from BrewCreator API."""
+    """Coordinator for updating data from BrewCreator API.
+
+    Listeners registered with an EquipmentListenerContext are only notified when
+    one of their fields changes, or when their equipment is added or removed.
+    All listeners are notified when the coordinator becomes available or
+    unavailable, and when a restored snapshot is replaced by live equipment.
+    """
 
     def __init__(
         self,
@@ -21,22 +50,94 @@ class BrewCreatorDataUpdateCoordinator(
         api: BrewCreatorAPI,
         entry: ConfigEntry["BrewCreatorDataUpdateCoordinator"],
     ) -> None:
+        # Updates modify the same equipment dictionary in place, so the data is
+        # always equal to the previous data and notifications cannot be skipped
+        # by comparing them. Listeners are instead routed by the changed fields.
         super().__init__(
             hass,
             _LOGGER,
             name=DOMAIN,
             always_update=True,
-            update_interval=None,
+            update_interval=FULL_SYNC_INTERVAL,
             update_method=None,
             config_entry=entry,
         )
         self._api: BrewCreatorAPI = api
+        self._snapshot_store = BrewCreatorSnapshotStore(hass, entry.entry_id)
+        # Save time of the restored snapshot until replaced by a full sync
+        self._snapshot_time: datetime | None = None
+        # Equipment ID -> JSON field -> listeners
+        self._listener_index: dict[str, dict[str, set[CALLBACK_TYPE]]] = {}
+        self._time_dependent_listeners: set[CALLBACK_TYPE] = set()
+        self._unrouted_listeners: set[CALLBACK_TYPE] = set()
+        self._notified_update_success: bool | None = None
+        self._full_sync_completed = False
+        self._started = False
+        self._entities_registered = False
+        self._routing_statistics = {
+            "updates": 0,
+            "broadcasts": 0,
+            "listeners_notified": 0,
+            "listeners_skipped": 0,
+        }
+
+    async def async_restore_snapshot(self) -> bool:
+        """Show the equipment saved by an earlier session until it is refreshed.
+
+        Returns whether a snapshot was restored.
+        """
+        snapshot = await self._snapshot_store.load_snapshot()
+        if snapshot is None:
+            return False
+        equipment_json, saved_at = snapshot
+        try:
+            equipment = self._api.restore_equipment(equipment_json)
+        except (KeyError, TypeError, ValueError):
+            _LOGGER.warning("Ignoring invalid equipment snapshot", exc_info=True)
+            return False
+        if not equipment:
+            return False
+        _LOGGER.info("Restored %d equipment saved at %s", len(equipment), saved_at)
+        self._snapshot_time = saved_at
+        self.data = equipment
+        return True
 
-    async def _async_setup(self):
-        await self._api.start_websocket(self._on_equipment_update)
+    async def async_refresh_restored(self) -> None:
+        """Replace restored equipment by live equipment.
+
+        Setup does not fail while the API is down after a warm start, so failed
+        refreshes are retried with a backoff, like Home Assistant retries a failed
+        setup, instead of waiting for the next full sync.
+        """
+        delay = WARM_START_RETRY_DELAY
+        await self.async_refresh()
+        while not self.last_update_success:
+            _LOGGER.debug("Retrying first refresh in %s", delay)
+            await asyncio.sleep(delay.total_seconds())
+            delay = min(delay * 2, FULL_SYNC_INTERVAL)
+            await self.async_refresh()
+
+    @callback
+    def async_resume_updates(self) -> None:
+        """Apply the updates pushed before the entities were registered."""
+        self._entities_registered = True
+        self._api.resume_updates()
 
     async def _async_update_data(self) -> dict[str, BrewCreatorEquipment]:
-        return await self._api.list_equipment()
+        timeout = REFRESH_TIMEOUT.total_seconds()
+        if self._started:
+            equipment = await self._api.list_equipment(timeout)
+        else:
+            # The WebSocket connects while the equipment is listed. Updates pushed
+            # before the entities exist are held back until they are registered.
+            equipment = await self._api.start(
+                self._on_equipment_update,
+                timeout,
+                hold_updates=not self._entities_registered,
+            )
+            self._started = True
+        self._full_sync_completed = True
+        return equipment
 
     async def _on_equipment_update(
         self, equipment_list: dict[str, BrewCreatorEquipment]
@@ -44,9 +145,116 @@ class BrewCreatorDataUpdateCoordinator(
         _LOGGER.debug("Received equipment update: %s", equipment_list)
         self.async_set_updated_data(equipment_list)
 
+    @callback
+    def async_add_listener(
+        self, update_callback: CALLBACK_TYPE, context: Any = None
+    ) -> Callable[[], None]:
+        remove_listener = super().async_add_listener(update_callback, context)
+        if not isinstance(context, EquipmentListenerContext):
+            self._unrouted_listeners.add(update_callback)
+
+            @callback
+            def remove_unrouted_listener() -> None:
+                self._unrouted_listeners.discard(update_callback)
+                remove_listener()
+
+            return remove_unrouted_listener
+
+        fields = self._listener_index.setdefault(context.equipment_id, {})
+        for field in context.fields:
+            fields.setdefault(field, set()).add(update_callback)
+        if context.time_dependent:
+            self._time_dependent_listeners.add(update_callback)
+
+        @callback
+        def remove_routed_listener() -> None:
+            for field in context.fields:
+                listeners = fields.get(field)
+                if listeners is not None:
+                    listeners.discard(update_callback)
+                    if not listeners:
+                        del fields[field]
+            if not fields and self._listener_index.get(context.equipment_id) is fields:
+                del self._listener_index[context.equipment_id]
+            self._time_dependent_listeners.discard(update_callback)
+            remove_listener()
+
+        return remove_routed_listener
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Notify the listeners affected by the equipment changes since last time."""
+        changes = self._api.take_changes()
+        full_sync_completed, self._full_sync_completed = (
+            self._full_sync_completed,
+            False,
+        )
+        self._routing_statistics["updates"] += 1
+        snapshot_replaced = (
+            full_sync_completed
+            and self.last_update_success
+            and self._snapshot_time is not None
+        )
+        if snapshot_replaced:
+            _LOGGER.debug("Replaced equipment snapshot from %s", self._snapshot_time)
+            self._snapshot_time = None
+        # Equipment patched on top of a restored snapshot is not saved
+        if (
+            self.last_update_success
+            and self._snapshot_time is None
+            and (changes or snapshot_replaced)
+        ):
+            self._snapshot_store.save_snapshot(
+                self._api.equipment_snapshot_json, dt_util.utcnow()
+            )
+        if (
+            self._notified_update_success != self.last_update_success
+            or snapshot_replaced
+        ):
+            self._notified_update_success = self.last_update_success
+            self._routing_statistics["broadcasts"] += 1
+            self._routing_statistics["listeners_notified"] += len(self._listeners)
+            super().async_update_listeners()
+            return
+
+        listeners = set(self._unrouted_listeners)
+        if full_sync_completed:
+            listeners |= self._time_dependent_listeners
+        for equipment_id in changes.added | changes.removed:
+            for field_listeners in self._listener_index.get(equipment_id, {}).values():
+                listeners |= field_listeners
+        for equipment_id, changed_fields in changes.modified.items():
+            fields = self._listener_index.get(equipment_id)
+            if fields is None:
+                continue
+            for field in changed_fields & fields.keys():
+                listeners |= fields[field]
+
+        self._routing_statistics["listeners_notified"] += len(listeners)
+        self._routing_statistics["listeners_skipped"] += len(self._listeners) - len(
+            listeners
+        )
+        for update_callback in listeners:
+            update_callback()
+
     @property
     def api(self) -> BrewCreatorAPI:
         return self._api
 
+    @property
+    def snapshot_time(self) -> datetime | None:
+        """Save time of the restored equipment, None once replaced by live equipment."""
+        return self._snapshot_time
+
+    @property
+    def snapshot_age(self) -> timedelta | None:
+        if self._snapshot_time is None:
+            return None
+        return dt_util.utcnow() - self._snapshot_time
+
+    @property
+    def routing_statistics(self) -> dict[str, int]:
+        return dict(self._routing_statistics)
+
     async def close(self) -> None:
         await self._api.close()
@@ -3,11 +3,33 @@ from typing import Any
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 
+from . import BrewCreatorConnectionManager
 from .coordinator import BrewCreatorDataUpdateCoordinator
 
 
 async def async_get_config_entry_diagnostics(
     hass: HomeAssistant, entry: ConfigEntry[BrewCreatorDataUpdateCoordinator]) -> dict[str, Any]:
+    coordinator = entry.runtime_data
+    api = coordinator.api
     return {
-        "equipments": await entry.runtime_data.api.equipment_json()
+        "equipments": await api.equipment_json(),
+        "startup_timings": api.startup_timings,
+        "refresh_statistics": api.refresh_statistics,
+        "conditional_request_statistics": api.conditional_request_statistics,
+        "hub_protocol": api.hub_protocol,
+        "websocket_statistics": api.websocket_statistics,
+        "write_statistics": api.write_statistics,
+        "retry_statistics": api.retry_statistics,
+        "rate_limiter_statistics": api.rate_limiter_statistics,
+        "circuit_breaker": api.circuit_breaker_statistics,
+        "routing_statistics": coordinator.routing_statistics,
+        "connection_health": BrewCreatorConnectionManager.get(hass).health,
+        "snapshot": {
+            "snapshot_time": coordinator.snapshot_time,
+            "snapshot_age_seconds": (
+                age.total_seconds()
+                if (age := coordinator.snapshot_age) is not None
+                else None
+            ),
+        },
     }
@@ -1,6 +1,6 @@
 from abc import ABC
 import logging
-from typing import Protocol
+from typing import Any, Protocol
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.helpers.entity import DeviceInfo
@@ -9,7 +9,7 @@ from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .api import BrewCreatorEquipment, Ferminator, Tilt
 from .const import DOMAIN
-from .coordinator import BrewCreatorDataUpdateCoordinator
+from .coordinator import BrewCreatorDataUpdateCoordinator, EquipmentListenerContext
 from datetime import datetime, timedelta, timezone
 
 _LOGGER = logging.getLogger(__name__)
@@ -34,12 +34,19 @@ def tilt_device_info(tilt: Tilt) -> DeviceInfo:
         identifiers={(DOMAIN, tilt.serial_number)},
         manufacturer="Tilt",
         serial_number=tilt.serial_number,
-        model=tilt.color.name,
+        model=tilt.color.name if tilt.color is not None else None,
         name=tilt.name,
     )
 
 
 class BrewCreatorEntity(CoordinatorEntity, ABC):
+    # Equipment JSON fields the state depends on. The entity is only updated
+    # when one of these fields or the availability fields change.
+    _equipment_fields: frozenset[str] = frozenset()
+    _availability_fields: frozenset[str] = frozenset()
+    # Whether the state changes with time, without any of the fields changing
+    _time_dependent: bool = False
+
     def __init__(
         self,
         coordinator: BrewCreatorDataUpdateCoordinator,
@@ -47,8 +54,17 @@ class BrewCreatorEntity(CoordinatorEntity, ABC):
         name: str,
         unique_id_suffix: str,
     ):
-        super().__init__(coordinator)
+        super().__init__(
+            coordinator,
+            EquipmentListenerContext(
+                id,
+                self._equipment_fields | self._availability_fields,
+                self._time_dependent,
+            ),
+        )
         self._brewcreator_id = id
+        # Equipment removed from the account keeps its last state while unavailable
+        self._last_brewcreator_device: BrewCreatorEquipment = coordinator.data[id]
         self._attr_has_entity_name = True
         self._attr_name = name
         self._attr_unique_id = f"{DOMAIN}_{id}_{unique_id_suffix}"
@@ -59,12 +75,35 @@ class BrewCreatorEntity(CoordinatorEntity, ABC):
             name,
         )
 
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Show when the state was saved while it is restored from a snapshot."""
+        snapshot_time = self.coordinator.snapshot_time
+        if snapshot_time is None:
+            return None
+        return {"snapshot_time": snapshot_time.isoformat()}
+
+    @property
+    def _equipment_removed(self) -> bool:
+        """Whether the equipment is no longer on the account.
+
+        Entities created from a restored snapshot may refer to equipment that the
+        first refresh no longer lists.
+        """
+        return self._brewcreator_id not in self.coordinator.data
+
     @property
     def _brewcreator_device(self) -> BrewCreatorEquipment:
-        return self.coordinator.data[self._brewcreator_id]
+        equipment = self.coordinator.data.get(self._brewcreator_id)
+        if equipment is not None:
+            self._last_brewcreator_device = equipment
+        return self._last_brewcreator_device
 
 
 class TiltEntity(BrewCreatorEntity, ABC):
+    _availability_fields = frozenset({"sg", "actualTemperature", "lastActivityTime"})
+    _time_dependent = True
+
     def __init__(
         self,
         coordinator: BrewCreatorDataUpdateCoordinator,
@@ -79,6 +118,8 @@ class TiltEntity(BrewCreatorEntity, ABC):
     def available(self) -> bool:
         """Return whether the tilt is available based on data and activity time."""
 
+        if self._equipment_removed:
+            return False
         tilt = self._tilt()
         has_data = (
             tilt.specific_gravity is not None or tilt.actual_temperature is not None
@@ -92,6 +133,8 @@ class TiltEntity(BrewCreatorEntity, ABC):
 
 
 class FerminatorEntity(BrewCreatorEntity, ABC):
+    _availability_fields = frozenset({"deviceTwinState"})
+
     def __init__(
         self,
         coordinator: BrewCreatorDataUpdateCoordinator,
@@ -104,7 +147,7 @@ class FerminatorEntity(BrewCreatorEntity, ABC):
 
     @property
     def available(self) -> bool:
-        return self._ferminator().is_connected
+        return not self._equipment_removed and self._ferminator().is_connected
 
     def _ferminator(self) -> Ferminator:
         return self._brewcreator_device
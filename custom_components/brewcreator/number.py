@@ -37,6 +37,8 @@ class FerminatorNumberEntity(FerminatorEntity, NumberEntity):
 
 
 class FerminatorOriginalGravityEntity(FerminatorNumberEntity):
+    _equipment_fields = frozenset({"brewName", "og"})
+
     def __init__(self, coordinator: BrewCreatorDataUpdateCoordinator, id: str) -> None:
         super().__init__(coordinator, id, "Original Gravity", "original_gravity")
         self._attr_native_min_value = 0.98
@@ -48,10 +50,11 @@ class FerminatorOriginalGravityEntity(FerminatorNumberEntity):
 
     async def async_set_native_value(self, value: float) -> None:
         await self._ferminator().set_batch_info(og=value)
-        await self.coordinator.async_request_refresh()
 
 
 class FerminatorFinalGravityEntity(FerminatorNumberEntity):
+    _equipment_fields = frozenset({"brewName", "fg"})
+
     def __init__(self, coordinator: BrewCreatorDataUpdateCoordinator, id: str) -> None:
         super().__init__(coordinator, id, "Final Gravity", "final_gravity")
         self._attr_native_min_value = 0.0
@@ -63,4 +66,3 @@ class FerminatorFinalGravityEntity(FerminatorNumberEntity):
 
     async def async_set_native_value(self, value: float) -> None:
         await self._ferminator().set_batch_info(fg=value)
-        await self.coordinator.async_request_refresh()
@@ -67,6 +67,8 @@ class TiltSensorEntity(TiltEntity, SensorEntity, ABC):
 
 
 class TiltTemperatureEntity(TiltSensorEntity):
+    _equipment_fields = frozenset({"actualTemperature"})
+
     def __init__(
         self,
         coordinator: BrewCreatorDataUpdateCoordinator,
@@ -84,6 +86,8 @@ class TiltTemperatureEntity(TiltSensorEntity):
 
 
 class TiltLastActivityEntity(TiltSensorEntity):
+    _equipment_fields = frozenset({"lastActivityTime"})
+
     def __init__(
         self,
         coordinator: BrewCreatorDataUpdateCoordinator,
@@ -101,10 +105,12 @@ class TiltLastActivityEntity(TiltSensorEntity):
 
     @property
     def available(self) -> bool:
-        return self.native_value is not None
+        return not self._equipment_removed and self.native_value is not None
 
 
 class TiltSpecificGravityEntity(TiltSensorEntity):
+    _equipment_fields = frozenset({"sg"})
+
     def __init__(
         self,
         coordinator: BrewCreatorDataUpdateCoordinator,
@@ -120,6 +126,8 @@ class TiltSpecificGravityEntity(TiltSensorEntity):
 
 
 class TiltAbvEntity(TiltSensorEntity):
+    _equipment_fields = frozenset({"abv"})
+
     def __init__(
         self,
         coordinator: BrewCreatorDataUpdateCoordinator,
@@ -147,6 +155,8 @@ class FerminatorSensorEntity(FerminatorEntity, SensorEntity, ABC):
 
 
 class FerminatorLastActivityEntity(FerminatorSensorEntity):
+    _equipment_fields = frozenset({"lastActivityTime"})
+
     def __init__(
         self,
         coordinator: BrewCreatorDataUpdateCoordinator,
@@ -164,10 +174,12 @@ class FerminatorLastActivityEntity(FerminatorSensorEntity):
 
     @property
     def available(self) -> bool:
-        return self.native_value is not None
+        return not self._equipment_removed and self.native_value is not None
 
 
 class FerminatorBrewDateEntity(FerminatorSensorEntity):
+    _equipment_fields = frozenset({"brewName", "brewDate"})
+
     def __init__(
         self,
         coordinator: BrewCreatorDataUpdateCoordinator,
@@ -184,6 +196,8 @@ class FerminatorBrewDateEntity(FerminatorSensorEntity):
 
 
 class FerminatorOwnerEntity(FerminatorSensorEntity):
+    _equipment_fields = frozenset({"brewName", "owner"})
+
     def __init__(
         self,
         coordinator: BrewCreatorDataUpdateCoordinator,
@@ -200,6 +214,8 @@ class FerminatorOwnerEntity(FerminatorSensorEntity):
 
 
 class FerminatorEbcEntity(FerminatorSensorEntity):
+    _equipment_fields = frozenset({"brewName", "ebc"})
+
     def __init__(
         self,
         coordinator: BrewCreatorDataUpdateCoordinator,
@@ -216,6 +232,8 @@ class FerminatorEbcEntity(FerminatorSensorEntity):
 
 
 class FerminatorIbuEntity(FerminatorSensorEntity):
+    _equipment_fields = frozenset({"brewName", "ibu"})
+
     def __init__(
         self,
         coordinator: BrewCreatorDataUpdateCoordinator,
@@ -232,6 +250,8 @@ class FerminatorIbuEntity(FerminatorSensorEntity):
 
 
 class FerminatorBatchVolumeEntity(FerminatorSensorEntity):
+    _equipment_fields = frozenset({"brewName", "volume"})
+
     def __init__(
         self,
         coordinator: BrewCreatorDataUpdateCoordinator,
@@ -249,6 +269,8 @@ class FerminatorBatchVolumeEntity(FerminatorSensorEntity):
 
 
 class FerminatorFermentationTypeEntity(FerminatorSensorEntity):
+    _equipment_fields = frozenset({"brewName", "fermented"})
+
     def __init__(
         self,
         coordinator: BrewCreatorDataUpdateCoordinator,
@@ -262,10 +284,14 @@ class FerminatorFermentationTypeEntity(FerminatorSensorEntity):
     @property
     def native_value(self) -> str | None:
         batch_info = self._ferminator().batch_info
-        return batch_info.fermentation_type.value if batch_info is not None else None
+        if batch_info is None or batch_info.fermentation_type is None:
+            return None
+        return batch_info.fermentation_type.value
 
 
 class FerminatorBeerStyleEntity(FerminatorSensorEntity):
+    _equipment_fields = frozenset({"brewName", "beerStyle"})
+
     def __init__(
         self,
         coordinator: BrewCreatorDataUpdateCoordinator,
@@ -0,0 +1,37 @@
+from collections.abc import Callable
+from datetime import datetime
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN, SNAPSHOT_SAVE_DELAY
+
+
+class BrewCreatorSnapshotStore:
+    """Persists the equipment JSON of a config entry for warm starts.
+
+    Saves are delayed and merged. Pending saves are written when Home Assistant
+    stops.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str):
+        self._store = Store(hass, 1, f"{DOMAIN}_snapshot_{entry_id}")
+
+    async def load_snapshot(self) -> tuple[list[dict[str, Any]], datetime] | None:
+        data = await self._store.async_load()
+        if data is None:
+            return None
+        return data["equipment"], datetime.fromisoformat(data["saved_at"])
+
+    @callback
+    def save_snapshot(
+        self, equipment_json: Callable[[], list[dict[str, Any]]], saved_at: datetime
+    ) -> None:
+        self._store.async_delay_save(
+            lambda: {"equipment": equipment_json(), "saved_at": saved_at.isoformat()},
+            SNAPSHOT_SAVE_DELAY.total_seconds(),
+        )
+
+    async def remove(self) -> None:
+        await self._store.async_remove()
@@ -20,6 +20,8 @@ async def async_setup_entry(
 
 
 class FerminatorBatchSwitchEntity(FerminatorEntity, SwitchEntity):
+    _equipment_fields = frozenset({"isLoggingData"})
+
     def __init__(self, coordinator: BrewCreatorDataUpdateCoordinator, id: str):
         super().__init__(coordinator, id, "Batch Started", "batch")
         self._attr_device_class = SwitchDeviceClass.SWITCH
@@ -30,8 +32,6 @@ class FerminatorBatchSwitchEntity(FerminatorEntity, SwitchEntity):
 
     async def async_turn_on(self, **kwargs) -> None:
         await self._ferminator().set_batch_info(is_logging_data=True)
-        await self.coordinator.async_request_refresh()
 
     async def async_turn_off(self, **kwargs) -> None:
         await self._ferminator().set_batch_info(is_logging_data=False)
-        await self.coordinator.async_request_refresh()
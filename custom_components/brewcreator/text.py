@@ -20,6 +20,8 @@ async def async_setup_entry(
 
 
 class FerminatorBatchNameEntity(FerminatorEntity, TextEntity):
+    _equipment_fields = frozenset({"brewName"})
+
     def __init__(self, coordinator: BrewCreatorDataUpdateCoordinator, id: str) -> None:
         super().__init__(coordinator, id, "Batch Name", "batch_name")
 
@@ -30,4 +32,3 @@ class FerminatorBatchNameEntity(FerminatorEntity, TextEntity):
 
     async def async_set_value(self, value: str) -> None:
         await self._ferminator().set_batch_info(brew_name=value)
-        await self.coordinator.async_request_refresh()
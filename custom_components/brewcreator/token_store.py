@@ -1,25 +1,58 @@
 import asyncio
+import hashlib
 from datetime import datetime
+from typing import Any
 
+from homeassistant.const import CONF_USERNAME
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.storage import Store
 
+from .const import DOMAIN, TOKEN_SAVE_DELAY
+
+
+def account_key(username: str) -> str:
+    """Return the key identifying the account of a username."""
+    return username.strip().lower()
+
 
 class BrewCreatorTokenStore:
-    def __init__(self, hass: HomeAssistant):
-        self._store = Store(hass, 1, "brewcreator_tokens")
+    """Tokens of a single BrewCreator account.
+
+    One store is shared by the config flows and config entries of an account, so
+    tokens from a config flow login are used by the created entry. Tokens are kept
+    in memory and saved with a delay, merging the saves of consecutive renewals.
+    Pending saves are written when Home Assistant stops.
+    """
+
+    def __init__(self, hass: HomeAssistant, username: str):
+        account = hashlib.sha256(account_key(username).encode()).hexdigest()[:16]
+        self._store = Store(hass, 1, f"{DOMAIN}_tokens_{account}")
         self._lock = asyncio.Lock()
+        self._tokens: tuple[str | None, str | None, datetime | None] | None = None
+
+    @classmethod
+    def for_account(cls, hass: HomeAssistant, username: str) -> "BrewCreatorTokenStore":
+        stores: dict[str, BrewCreatorTokenStore] = hass.data.setdefault(
+            DOMAIN, {}
+        ).setdefault("token_stores", {})
+        key = account_key(username)
+        if key not in stores:
+            stores[key] = cls(hass, username)
+        return stores[key]
 
     async def load_tokens(self) -> tuple[str | None, str | None, datetime | None]:
         async with self._lock:
-            data = await self._store.async_load()
-            if data is None:
-                return None, None, None
-            return (
-                data["access_token"],
-                data["refresh_token"],
-                datetime.fromisoformat(data["expire_time"]),
-            )
+            if self._tokens is None:
+                data = await self._store.async_load()
+                if data is None or data["expire_time"] is None:
+                    self._tokens = (None, None, None)
+                else:
+                    self._tokens = (
+                        data["access_token"],
+                        data["refresh_token"],
+                        datetime.fromisoformat(data["expire_time"]),
+                    )
+            return self._tokens
 
     async def save_tokens(
         self,
@@ -28,11 +61,44 @@ class BrewCreatorTokenStore:
         expire_time: datetime | None,
     ):
         async with self._lock:
-            data = {
-                "access_token": access_token,
-                "refresh_token": refresh_token,
-                "expire_time": expire_time.isoformat()
-                if expire_time is not None
-                else None,
-            }
-            await self._store.async_save(data)
+            self._tokens = (access_token, refresh_token, expire_time)
+            self._store.async_delay_save(self._data, TOKEN_SAVE_DELAY.total_seconds())
+
+    async def remove(self) -> None:
+        async with self._lock:
+            self._tokens = None
+            await self._store.async_remove()
+
+    @classmethod
+    async def async_migrate_legacy(cls, hass: HomeAssistant) -> None:
+        """Move tokens from the store shared by all accounts in earlier versions.
+
+        The tokens are handed to the account of the only config entry. With several
+        entries, the account the tokens belong to is unknown and they are dropped.
+        """
+        domain_data = hass.data.setdefault(DOMAIN, {})
+        if domain_data.get("legacy_tokens_migrated"):
+            return
+        domain_data["legacy_tokens_migrated"] = True
+        legacy_store = Store(hass, 1, f"{DOMAIN}_tokens")
+        data = await legacy_store.async_load()
+        if data is None:
+            return
+        entries = hass.config_entries.async_entries(DOMAIN)
+        if len(entries) == 1 and data.get("expire_time") is not None:
+            store = cls.for_account(hass, entries[0].data[CONF_USERNAME])
+            if await store.load_tokens() == (None, None, None):
+                await store.save_tokens(
+                    data["access_token"],
+                    data["refresh_token"],
+                    datetime.fromisoformat(data["expire_time"]),
+                )
+        await legacy_store.async_remove()
+
+    def _data(self) -> dict[str, Any]:
+        access_token, refresh_token, expire_time = self._tokens or (None, None, None)
+        return {
+            "access_token": access_token,
+            "refresh_token": refresh_token,
+            "expire_time": expire_time.isoformat() if expire_time is not None else None,
+        }
@@ -0,0 +1,423 @@
+"""Local stand-in for the BrewCreator identity, REST and SignalR endpoints.
+
+Serves the login page, the PKCE authorization code and refresh token flows, the
+paged equipment API, SignalR negotiation and a SignalR WebSocket from a single
+aiohttp server, so BrewCreatorAPI can be exercised without network access:
+
+    async with FakeBrewCreator() as server:
+        api = BrewCreatorAPI(
+            server.username,
+            server.password,
+            token_storage,
+            api_url=server.url,
+            identity_url=server.url,
+        )
+"""
+
+import base64
+import hashlib
+import json
+import secrets
+from datetime import datetime
+from typing import Any, Self
+
+from aiohttp import WSMsgType, web
+from aiohttp.test_utils import TestServer
+
+from custom_components.brewcreator.api import (
+    SignalRJsonProtocol,
+    SignalRMessagePackProtocol,
+    SignalRMessageType,
+    SignalRProtocol,
+    _merge_json,
+)
+
+LOGIN_PAGE = """<html><body><form method="post">
+<input name="Email" type="text"><input name="Password" type="password">
+<input name="__RequestVerificationToken" type="hidden" value="{csrf_token}">
+</form></body></html>"""
+
+
+def ferminator_json(
+    equipment_id: str, connected_equipment: list[str] | None = None, **fields: Any
+) -> dict[str, Any]:
+    equipment = {
+        "id": equipment_id,
+        "iotHubBrewEquipmentId": f"FERM-{equipment_id}",
+        "iotHubBrewEquipmentGroupId": "Ferminator",
+        "name": f"Ferminator {equipment_id}",
+        "actualTemperature": 18.5,
+        "setTemperature": 18.0,
+        "fanSpeed": 2,
+        "isRegulatingTemperature": True,
+        "isLoggingData": True,
+        "lastActivityTime": "2024-05-01T12:00:00",
+        "lProcess": "Cooling",
+        "lStatus": "Start",
+        "brewName": "Pale Ale",
+        "brewDate": "2024-04-28T00:00:00",
+        "beerStyle": "American Pale Ale",
+        "owner": "Brewer",
+        "fermented": "Top",
+        "ebc": 12,
+        "ibu": 35,
+        "og": 1.052,
+        "fg": 1.010,
+        "volume": 20,
+        "connectedEquipments": connected_equipment or [],
+        "deviceTwinState": {
+            "reportedSwVersion": "1.2.3",
+            "reportedHwVersion": "2",
+            "connectionState": "Connected",
+        },
+    }
+    equipment.update(fields)
+    return equipment
+
+
+def tilt_json(equipment_id: str, **fields: Any) -> dict[str, Any]:
+    equipment = {
+        "id": equipment_id,
+        "iotHubBrewEquipmentId": f"TILT-{equipment_id}",
+        "iotHubBrewEquipmentGroupId": "Tilt",
+        "name": f"Tilt {equipment_id}",
+        "actualTemperature": 18.8,
+        "sg": 1.031,
+        "abv": 2.8,
+        "color": "TiltRed",
+        "isLoggingData": True,
+        "lastActivityTime": "2024-05-01T12:00:00",
+        "brewName": "Pale Ale",
+        "brewDate": "2024-04-28T00:00:00",
+        "beerStyle": "American Pale Ale",
+        "owner": "Brewer",
+        "fermented": "Top",
+        "ebc": 12,
+        "ibu": 35,
+        "og": 1.052,
+        "fg": 1.010,
+        "volume": 20,
+    }
+    equipment.update(fields)
+    return equipment
+
+
+class MemoryTokenStorage:
+    def __init__(self):
+        self.tokens: tuple[str | None, str | None, datetime | None] = (None, None, None)
+
+    async def load_tokens(self) -> tuple[str, str, datetime]:
+        return self.tokens
+
+    async def save_tokens(
+        self, access_token: str, refresh_token: str, expire_time: datetime
+    ):
+        self.tokens = (access_token, refresh_token, expire_time)
+
+
+class FakeBrewCreator:
+    """In-process BrewCreator cloud backed by an aiohttp test server."""
+
+    def __init__(
+        self,
+        equipment: list[dict[str, Any]] | None = None,
+        username: str = "brewer@example.com",
+        password: str = "secret",
+        access_token_lifetime: int = 3600,
+        etags: bool = False,
+        hub_protocols: tuple[str, ...] = (
+            SignalRJsonProtocol.name,
+            SignalRMessagePackProtocol.name,
+        ),
+        transfer_formats: tuple[str, ...] = ("Text", "Binary"),
+        ignore_page_number: bool = False,
+    ) -> None:
+        self.username = username
+        self.password = password
+        self.access_token_lifetime = access_token_lifetime
+        # Whether equipment responses carry an ETag and honor If-None-Match
+        self.etags = etags
+        # Hub protocols accepted in the handshake
+        self.hub_protocols = hub_protocols
+        # Transfer formats of the WebSocket transport listed by negotiate
+        self.transfer_formats = transfer_formats
+        # Whether listing always returns the first page, without page totals
+        self.ignore_page_number = ignore_page_number
+        self.equipment: dict[str, dict[str, Any]] = {
+            e["id"]: e
+            for e in (
+                equipment
+                if equipment is not None
+                else [ferminator_json("f1", ["t1"]), tilt_json("t1")]
+            )
+        }
+        self.access_tokens: set[str] = set()
+        self.refresh_tokens: set[str] = set()
+        self.requests: list[tuple[str, str]] = []
+        self.puts: list[tuple[str, dict[str, Any]]] = []
+        self._csrf_tokens: set[str] = set()
+        # Authorization code -> PKCE code challenge
+        self._codes: dict[str, str] = {}
+        self._connection_tokens: set[str] = set()
+        self._websockets: list[tuple[web.WebSocketResponse, SignalRProtocol]] = []
+        self._server = TestServer(self._create_app())
+
+    async def __aenter__(self) -> Self:
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.close()
+
+    async def start(self) -> None:
+        await self._server.start_server()
+
+    async def close(self) -> None:
+        for ws, _ in list(self._websockets):
+            await ws.close()
+        await self._server.close()
+
+    @property
+    def url(self) -> str:
+        return str(self._server.make_url("")).rstrip("/")
+
+    @property
+    def websocket_count(self) -> int:
+        return len(self._websockets)
+
+    def revoke_tokens(self) -> None:
+        """Invalidate all issued access and refresh tokens."""
+        self.access_tokens.clear()
+        self.refresh_tokens.clear()
+
+    async def push_device_twin(self, *updates: dict[str, Any]) -> None:
+        """Apply device twin updates and push them to all subscribed clients."""
+        for update in updates:
+            equipment = self.equipment.get(update.get("id"))
+            if equipment is not None:
+                self.equipment[equipment["id"]] = _merge_json(equipment, update)
+        for ws, protocol in list(self._websockets):
+            await self._send(
+                ws, protocol.encode_invocation("devicetwin", list(updates))
+            )
+
+    async def close_websockets(self, error: str | None = None) -> None:
+        """Send a SignalR close message and close all WebSocket connections."""
+        for ws, protocol in list(self._websockets):
+            await self._send(ws, self._encode_close(protocol, error))
+            await ws.close()
+
+    def _create_app(self) -> web.Application:
+        app = web.Application(middlewares=[self._record_request])
+        app.router.add_get("/Account/Login", self._login_page)
+        app.router.add_post("/account/login", self._login)
+        app.router.add_get("/connect/authorize", self._authorize)
+        app.router.add_get("/signin-callback", self._signin_callback)
+        app.router.add_post("/connect/token", self._token)
+        app.router.add_get("/api/v1.0/equipments", self._list_equipment)
+        app.router.add_get("/api/v1.0/equipments/{id}", self._get_equipment)
+        app.router.add_put("/api/v1.0/equipments/{id}", self._put_equipment)
+        app.router.add_post("/telemetry/negotiate", self._negotiate)
+        app.router.add_get("/telemetry", self._telemetry)
+        return app
+
+    @web.middleware
+    async def _record_request(
+        self, request: web.Request, handler
+    ) -> web.StreamResponse:
+        self.requests.append((request.method, request.path))
+        return await handler(request)
+
+    async def _login_page(self, request: web.Request) -> web.Response:
+        csrf_token = secrets.token_urlsafe(16)
+        self._csrf_tokens.add(csrf_token)
+        return web.Response(
+            text=LOGIN_PAGE.format(csrf_token=csrf_token), content_type="text/html"
+        )
+
+    async def _login(self, request: web.Request) -> web.Response:
+        form = await request.post()
+        if form.get("__RequestVerificationToken") not in self._csrf_tokens:
+            raise web.HTTPBadRequest(text="Invalid anti-forgery token")
+        if form.get("Email") != self.username or form.get("Password") != self.password:
+            # The login page is rendered again, without redirect, on bad credentials
+            return await self._login_page(request)
+        raise web.HTTPFound(request.query["returnurl"])
+
+    async def _authorize(self, request: web.Request) -> web.Response:
+        if request.query.get("code_challenge_method") != "S256":
+            raise web.HTTPBadRequest(text="Unsupported code challenge method")
+        code = secrets.token_urlsafe(16)
+        self._codes[code] = request.query["code_challenge"]
+        # Stands in for the redirect to the registered redirect URI
+        raise web.HTTPFound(
+            f"/signin-callback?code={code}&state={request.query['state']}"
+        )
+
+    async def _signin_callback(self, request: web.Request) -> web.Response:
+        return web.Response(text="Signed in", content_type="text/html")
+
+    async def _token(self, request: web.Request) -> web.Response:
+        form = await request.post()
+        if form.get("grant_type") == "authorization_code":
+            challenge = self._codes.pop(form.get("code"), None)
+            digest = hashlib.sha256(form.get("code_verifier", "").encode()).digest()
+            if (
+                challenge is None
+                or base64.urlsafe_b64encode(digest).decode().rstrip("=") != challenge
+            ):
+                return web.json_response({"error": "invalid_grant"}, status=400)
+        elif form.get("grant_type") == "refresh_token":
+            if form.get("refresh_token") not in self.refresh_tokens:
+                return web.json_response({"error": "invalid_grant"}, status=400)
+            self.refresh_tokens.discard(form["refresh_token"])
+        else:
+            return web.json_response({"error": "unsupported_grant_type"}, status=400)
+        access_token = secrets.token_urlsafe(32)
+        refresh_token = secrets.token_urlsafe(32)
+        self.access_tokens.add(access_token)
+        self.refresh_tokens.add(refresh_token)
+        return web.json_response(
+            {
+                "access_token": access_token,
+                "refresh_token": refresh_token,
+                "expires_in": self.access_token_lifetime,
+                "token_type": "Bearer",
+            }
+        )
+
+    def _authorize_request(self, request: web.Request) -> None:
+        scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+        if scheme != "Bearer" or token not in self.access_tokens:
+            raise web.HTTPUnauthorized()
+
+    async def _list_equipment(self, request: web.Request) -> web.Response:
+        self._authorize_request(request)
+        page_size = int(request.query.get("PageSize", 10))
+        page_number = int(request.query.get("PageNumber", 1))
+        equipment = list(self.equipment.values())
+        if self.ignore_page_number:
+            return self._equipment_response(
+                request, {"data": equipment[:page_size], "pageSize": page_size}
+            )
+        start = (page_number - 1) * page_size
+        return self._equipment_response(
+            request,
+            {
+                "data": equipment[start : start + page_size],
+                "pageNumber": page_number,
+                "pageSize": page_size,
+                "totalPages": max(1, -(-len(equipment) // page_size)),
+                "totalRecords": len(equipment),
+            },
+        )
+
+    async def _get_equipment(self, request: web.Request) -> web.Response:
+        self._authorize_request(request)
+        equipment = self.equipment.get(request.match_info["id"])
+        if equipment is None:
+            raise web.HTTPNotFound()
+        return self._equipment_response(request, {"data": equipment, "succeeded": True})
+
+    def _equipment_response(
+        self, request: web.Request, data: dict[str, Any]
+    ) -> web.Response:
+        body = json.dumps(data).encode()
+        if not self.etags:
+            return web.Response(body=body, content_type="application/json")
+        etag = f'"{hashlib.sha256(body).hexdigest()[:16]}"'
+        if request.headers.get("If-None-Match") == etag:
+            return web.Response(status=304, headers={"ETag": etag})
+        return web.Response(
+            body=body, content_type="application/json", headers={"ETag": etag}
+        )
+
+    async def _put_equipment(self, request: web.Request) -> web.Response:
+        self._authorize_request(request)
+        equipment_id = request.match_info["id"]
+        if equipment_id not in self.equipment:
+            raise web.HTTPNotFound()
+        payload = await request.json()
+        self.puts.append((equipment_id, payload))
+        self.equipment[equipment_id] = _merge_json(
+            self.equipment[equipment_id], payload
+        )
+        return web.json_response(
+            {"data": self.equipment[equipment_id], "succeeded": True}
+        )
+
+    async def _negotiate(self, request: web.Request) -> web.Response:
+        self._authorize_request(request)
+        connection_token = secrets.token_urlsafe(16)
+        self._connection_tokens.add(connection_token)
+        return web.json_response(
+            {
+                "negotiateVersion": 1,
+                "connectionId": secrets.token_urlsafe(16),
+                "connectionToken": connection_token,
+                "availableTransports": [
+                    {
+                        "transport": "WebSockets",
+                        "transferFormats": list(self.transfer_formats),
+                    }
+                ],
+            }
+        )
+
+    async def _telemetry(self, request: web.Request) -> web.WebSocketResponse:
+        if (
+            request.query.get("id") not in self._connection_tokens
+            or request.query.get("access_token") not in self.access_tokens
+        ):
+            raise web.HTTPUnauthorized()
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        protocol = await self._handshake(ws)
+        if protocol is None:
+            await ws.close()
+            return ws
+        self._websockets.append((ws, protocol))
+        try:
+            async for msg in ws:
+                if msg.type not in (WSMsgType.TEXT, WSMsgType.BINARY):
+                    break
+                for message in protocol.parse_messages(msg.data):
+                    if message.message_type == SignalRMessageType.CLOSE:
+                        return ws
+        finally:
+            self._websockets.remove((ws, protocol))
+        return ws
+
+    async def _handshake(self, ws: web.WebSocketResponse) -> SignalRProtocol | None:
+        msg = await ws.receive()
+        if msg.type != WSMsgType.TEXT:
+            return None
+        handshake, _, _ = msg.data.partition(SignalRProtocol.RECORD_SEPARATOR)
+        name = json.loads(handshake).get("protocol")
+        protocols = {
+            SignalRJsonProtocol.name: SignalRJsonProtocol,
+            SignalRMessagePackProtocol.name: SignalRMessagePackProtocol,
+        }
+        if name not in protocols or name not in self.hub_protocols:
+            await ws.send_str(
+                '{"error":"Unsupported protocol"}' + SignalRProtocol.RECORD_SEPARATOR
+            )
+            return None
+        await ws.send_str("{}" + SignalRProtocol.RECORD_SEPARATOR)
+        return protocols[name]()
+
+    @staticmethod
+    def _encode_close(protocol: SignalRProtocol, error: str | None) -> str | bytes:
+        if isinstance(protocol, SignalRMessagePackProtocol):
+            return protocol._encode([SignalRMessageType.CLOSE.value, error, False])
+        record = {"type": SignalRMessageType.CLOSE.value}
+        if error is not None:
+            record["error"] = error
+        return protocol._encode(record)
+
+    @staticmethod
+    async def _send(ws: web.WebSocketResponse, data: str | bytes) -> None:
+        if isinstance(data, bytes):
+            await ws.send_bytes(data)
+        else:
+            await ws.send_str(data)
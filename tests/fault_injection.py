@@ -0,0 +1,396 @@
+"""Fault-injection harness measuring how BrewCreatorAPI recovers from failures.
+
+A FaultInjectingProxy sits between the API client and a FakeBrewCreator backend
+and can add latency, fail requests with a given status, close or stall WebSocket
+connections and inject malformed frames. Each scenario reports the time from
+injecting the fault until the client works again, and the longest window in which
+the client's view of the equipment lagged behind the backend.
+
+Run all scenarios, including the slow half-open socket one, with:
+
+    python -m tests.fault_injection
+"""
+
+import argparse
+import asyncio
+import contextlib
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any, Self
+
+import aiohttp
+from aiohttp import WSMsgType, web
+from aiohttp.test_utils import TestServer
+
+from custom_components.brewcreator.api import BrewCreatorAPI, BrewCreatorEquipment
+from tests.fake_brewcreator import (
+    FakeBrewCreator,
+    MemoryTokenStorage,
+    ferminator_json,
+    tilt_json,
+)
+
+_HOP_BY_HOP_HEADERS = {
+    "connection",
+    "content-encoding",
+    "content-length",
+    "host",
+    "keep-alive",
+    "transfer-encoding",
+    "upgrade",
+}
+
+
+class FaultInjectingProxy:
+    """HTTP and WebSocket proxy that injects faults between client and backend."""
+
+    def __init__(self, upstream_url: str) -> None:
+        self.upstream_url = upstream_url
+        # Delay added before forwarding each HTTP request
+        self.latency: float = 0
+        self._failures: list[tuple[int, str]] = []
+        self._websockets: list[web.WebSocketResponse] = []
+        self._stalled: set[web.WebSocketResponse] = set()
+        self._session: aiohttp.ClientSession | None = None
+        app = web.Application()
+        app.router.add_route("*", "/{tail:.*}", self._handle)
+        self._server = TestServer(app)
+
+    async def __aenter__(self) -> Self:
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.close()
+
+    async def start(self) -> None:
+        self._session = aiohttp.ClientSession(cookie_jar=aiohttp.DummyCookieJar())
+        await self._server.start_server()
+
+    async def close(self) -> None:
+        await self.close_websockets()
+        await self._server.close()
+        await self._session.close()
+
+    @property
+    def url(self) -> str:
+        return str(self._server.make_url("")).rstrip("/")
+
+    @property
+    def websocket_count(self) -> int:
+        return len(self._websockets)
+
+    def fail_requests(self, status: int, count: int = 1, path: str = "/") -> None:
+        """Answer the next count HTTP requests below path with the given status."""
+        self._failures.extend([(status, path)] * count)
+
+    def stall_websockets(self) -> None:
+        """Make the open WebSocket connections half-open.
+
+        Frames and pings are silently dropped in both directions, while new
+        connections are forwarded as usual.
+        """
+        self._stalled.update(self._websockets)
+
+    async def close_websockets(self) -> None:
+        for ws in list(self._websockets):
+            await ws.close()
+
+    async def send_to_clients(self, data: str | bytes) -> None:
+        """Send a raw frame to all clients, bypassing the backend."""
+        for ws in list(self._websockets):
+            if isinstance(data, bytes):
+                await ws.send_bytes(data)
+            else:
+                await ws.send_str(data)
+
+    async def _handle(self, request: web.Request) -> web.StreamResponse:
+        if request.headers.get("Upgrade", "").lower() == "websocket":
+            return await self._proxy_websocket(request)
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        for i, (status, path) in enumerate(self._failures):
+            if request.path.startswith(path):
+                del self._failures[i]
+                return web.Response(status=status)
+        async with self._session.request(
+            request.method,
+            f"{self.upstream_url}{request.path_qs}",
+            headers={
+                k: v
+                for k, v in request.headers.items()
+                if k.lower() not in _HOP_BY_HOP_HEADERS
+            },
+            data=await request.read(),
+            allow_redirects=False,
+        ) as response:
+            return web.Response(
+                status=response.status,
+                headers={
+                    k: v
+                    for k, v in response.headers.items()
+                    if k.lower() not in _HOP_BY_HOP_HEADERS
+                },
+                body=await response.read(),
+            )
+
+    async def _proxy_websocket(self, request: web.Request) -> web.WebSocketResponse:
+        upstream_url = "ws" + self.upstream_url.removeprefix("http") + request.path_qs
+        async with self._session.ws_connect(upstream_url) as upstream:
+            # Pings are answered by hand so a stalled connection goes silent
+            ws = web.WebSocketResponse(autoping=False)
+            await ws.prepare(request)
+            self._websockets.append(ws)
+            to_client = asyncio.create_task(self._forward(upstream, ws))
+            try:
+                async for msg in ws:
+                    if ws in self._stalled:
+                        continue
+                    if msg.type == WSMsgType.PING:
+                        await ws.pong(msg.data)
+                    elif msg.type == WSMsgType.TEXT:
+                        await upstream.send_str(msg.data)
+                    elif msg.type == WSMsgType.BINARY:
+                        await upstream.send_bytes(msg.data)
+            finally:
+                self._websockets.remove(ws)
+                self._stalled.discard(ws)
+                to_client.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await to_client
+        return ws
+
+    async def _forward(
+        self, upstream: aiohttp.ClientWebSocketResponse, ws: web.WebSocketResponse
+    ) -> None:
+        async for msg in upstream:
+            if ws in self._stalled:
+                continue
+            if msg.type == WSMsgType.TEXT:
+                await ws.send_str(msg.data)
+            elif msg.type == WSMsgType.BINARY:
+                await ws.send_bytes(msg.data)
+        await ws.close()
+
+
+class ScenarioResult:
+    def __init__(
+        self, name: str, time_to_recover: float | None, staleness_window: float | None
+    ) -> None:
+        self.name = name
+        self.time_to_recover = time_to_recover
+        self.staleness_window = staleness_window
+
+    def __repr__(self) -> str:
+        return (
+            f"ScenarioResult(name={self.name!r}, "
+            f"time_to_recover={self.time_to_recover}, "
+            f"staleness_window={self.staleness_window})"
+        )
+
+
+class FaultInjectionHarness:
+    """Runs an API client through a proxy against a fake backend.
+
+    While the WebSocket is running, the backend pushes an increasing gravity
+    reading for one Tilt at a fixed interval. The client is stale from the moment
+    a reading is pushed until it has observed that reading or a later one.
+    """
+
+    TILT_ID = "t1"
+
+    def __init__(self, push_interval: float = 0.05, **api_kwargs: Any) -> None:
+        self.push_interval = push_interval
+        self.backend = FakeBrewCreator([ferminator_json("f1", ["t1"]), tilt_json("t1")])
+        self.proxy: FaultInjectingProxy | None = None
+        self.api: BrewCreatorAPI | None = None
+        self._api_kwargs = api_kwargs
+        self._pushes: list[float] = []
+        self._observed: list[tuple[float, int]] = []
+        self._push_task: asyncio.Task[None] | None = None
+
+    async def __aenter__(self) -> Self:
+        await self.backend.start()
+        self.proxy = FaultInjectingProxy(self.backend.url)
+        await self.proxy.start()
+        self.api = BrewCreatorAPI(
+            self.backend.username,
+            self.backend.password,
+            MemoryTokenStorage(),
+            api_url=self.proxy.url,
+            identity_url=self.proxy.url,
+            **self._api_kwargs,
+        )
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        if self._push_task is not None:
+            self._push_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._push_task
+        await self.api.close()
+        await self.proxy.close()
+        await self.backend.close()
+
+    async def start_feed(self) -> None:
+        """Connect the WebSocket and start pushing readings from the backend."""
+        await self.api.list_equipment()
+        await self.api.start_websocket(self._on_equipment_update)
+        await self.wait_for_websocket()
+        self._push_task = asyncio.create_task(self._push_readings())
+        await self.wait_for_reading(0)
+
+    async def wait_for_websocket(self) -> None:
+        while self.backend.websocket_count == 0:
+            await asyncio.sleep(0.01)
+
+    async def wait_for_reading(self, after: float, timeout: float = 120) -> float:
+        """Wait for a reading pushed after the given time to reach the client.
+
+        Returns when it was observed.
+        """
+        async with asyncio.timeout(timeout):
+            while True:
+                first = next((i for i, t in enumerate(self._pushes) if t > after), None)
+                observed = next(
+                    (t for t, i in self._observed if first is not None and i >= first),
+                    None,
+                )
+                if observed is not None:
+                    return observed
+                await asyncio.sleep(self.push_interval / 2)
+
+    def staleness_window(self, start: float, end: float) -> float:
+        """Longest time a reading pushed between start and end went unobserved."""
+        window = 0.0
+        for i, pushed in enumerate(self._pushes):
+            if not start <= pushed <= end:
+                continue
+            observed = next((t for t, j in self._observed if j >= i), end)
+            window = max(window, observed - pushed)
+        return window
+
+    async def _push_readings(self) -> None:
+        while True:
+            reading = len(self._pushes)
+            self._pushes.append(time.monotonic())
+            await self.backend.push_device_twin(
+                {"id": self.TILT_ID, "sg": 1 + reading / 10000}
+            )
+            await asyncio.sleep(self.push_interval)
+
+    async def _on_equipment_update(
+        self, equipment: dict[str, BrewCreatorEquipment]
+    ) -> None:
+        reading = round((equipment[self.TILT_ID].specific_gravity - 1) * 10000)
+        self._observed.append((time.monotonic(), reading))
+
+
+async def _measure_request(
+    name: str,
+    inject: Callable[[FaultInjectionHarness], None],
+    **api_kwargs: Any,
+) -> ScenarioResult:
+    async with FaultInjectionHarness(**api_kwargs) as harness:
+        await harness.api.list_equipment()
+        inject(harness)
+        start = time.monotonic()
+        await harness.api.list_equipment()
+        return ScenarioResult(name, time.monotonic() - start, None)
+
+
+async def _measure_websocket(
+    name: str,
+    inject: Callable[[FaultInjectionHarness], Awaitable[None]],
+    **api_kwargs: Any,
+) -> ScenarioResult:
+    async with FaultInjectionHarness(**api_kwargs) as harness:
+        await harness.start_feed()
+        start = time.monotonic()
+        await inject(harness)
+        recovered = await harness.wait_for_reading(start)
+        await asyncio.sleep(harness.push_interval * 4)
+        return ScenarioResult(
+            name,
+            recovered - start,
+            harness.staleness_window(start, recovered),
+        )
+
+
+async def latency(seconds: float = 0.5, **api_kwargs: Any) -> ScenarioResult:
+    def inject(harness: FaultInjectionHarness) -> None:
+        harness.proxy.latency = seconds
+
+    return await _measure_request(f"latency {seconds}s", inject, **api_kwargs)
+
+
+async def server_errors(count: int = 3, **api_kwargs: Any) -> ScenarioResult:
+    def inject(harness: FaultInjectionHarness) -> None:
+        harness.proxy.fail_requests(500, count, "/api/")
+
+    return await _measure_request(f"{count} x 500", inject, **api_kwargs)
+
+
+async def unauthorized(**api_kwargs: Any) -> ScenarioResult:
+    def inject(harness: FaultInjectionHarness) -> None:
+        harness.proxy.fail_requests(401, 1, "/api/")
+
+    return await _measure_request("401 on valid token", inject, **api_kwargs)
+
+
+async def websocket_close(**api_kwargs: Any) -> ScenarioResult:
+    async def inject(harness: FaultInjectionHarness) -> None:
+        await harness.proxy.close_websockets()
+
+    return await _measure_websocket("websocket close", inject, **api_kwargs)
+
+
+async def malformed_frames(**api_kwargs: Any) -> ScenarioResult:
+    async def inject(harness: FaultInjectionHarness) -> None:
+        await harness.proxy.send_to_clients("not json\x1e")
+        await harness.proxy.send_to_clients('{"type":1,"target":"devicetwin"\x1e')
+
+    return await _measure_websocket("malformed frames", inject, **api_kwargs)
+
+
+async def half_open_socket(**api_kwargs: Any) -> ScenarioResult:
+    async def inject(harness: FaultInjectionHarness) -> None:
+        harness.proxy.stall_websockets()
+
+    return await _measure_websocket("half-open socket", inject, **api_kwargs)
+
+
+SCENARIOS = [
+    latency,
+    server_errors,
+    unauthorized,
+    websocket_close,
+    malformed_frames,
+    half_open_socket,
+]
+
+
+def _format_seconds(value: float | None) -> str:
+    return "-" if value is None else f"{value:.3f}"
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("scenarios", nargs="*", help="Scenarios to run (default all)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+    scenarios = [
+        s for s in SCENARIOS if not args.scenarios or s.__name__ in args.scenarios
+    ]
+    print(f"{'scenario':<24} {'recover (s)':>12} {'stale (s)':>12}")
+    for scenario in scenarios:
+        result = await scenario()
+        print(
+            f"{result.name:<24} {_format_seconds(result.time_to_recover):>12} "
+            f"{_format_seconds(result.staleness_window):>12}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,41 @@
+"""Minimal Home Assistant instance for tests of the integration's HA wiring."""
+
+from types import MappingProxyType
+from typing import Any
+
+from homeassistant.config_entries import SOURCE_USER, ConfigEntries, ConfigEntry
+from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
+from homeassistant.core import CoreState, HomeAssistant
+
+from custom_components.brewcreator.const import DOMAIN
+
+
+async def async_start_home_assistant(config_dir: str) -> HomeAssistant:
+    hass = HomeAssistant(config_dir)
+    hass.config_entries = ConfigEntries(hass, {})
+    await hass.config_entries.async_initialize()
+    hass.set_state(CoreState.running)
+    return hass
+
+
+def add_config_entry(
+    hass: HomeAssistant,
+    username: str,
+    password: str = "secret",
+    unique_id: str | None = None,
+    options: dict[str, Any] | None = None,
+) -> ConfigEntry:
+    entry = ConfigEntry(
+        data={CONF_USERNAME: username, CONF_PASSWORD: password},
+        discovery_keys=MappingProxyType({}),
+        domain=DOMAIN,
+        minor_version=1,
+        options=options or {},
+        source=SOURCE_USER,
+        subentries_data=None,
+        title=username,
+        unique_id=unique_id,
+        version=1,
+    )
+    hass.config_entries._entries[entry.entry_id] = entry
+    return entry
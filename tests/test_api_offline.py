@@ -0,0 +1,470 @@
+import asyncio
+import time
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import aiohttp
+
+from custom_components.brewcreator.api import (
+    BrewCreatorAPI,
+    BrewCreatorEquipment,
+    BrewCreatorInvalidCredentialsError,
+    BrewCreatorTimeoutError,
+    ConnectionStagger,
+    Ferminator,
+    FerminatorMode,
+    RetryPolicy,
+    SignalRJsonProtocol,
+    SignalRMessagePackProtocol,
+    Tilt,
+)
+from tests.fake_brewcreator import (
+    FakeBrewCreator,
+    MemoryTokenStorage,
+    ferminator_json,
+    tilt_json,
+)
+from tests.fault_injection import FaultInjectingProxy
+
+
+class OfflineAPITestCase(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.server = FakeBrewCreator(
+            [ferminator_json("f1", ["t1"]), tilt_json("t1"), tilt_json("t2")]
+        )
+        await self.server.start()
+        self.token_storage = MemoryTokenStorage()
+        self.api = self.create_api(self.server.password)
+
+    async def asyncTearDown(self):
+        await self.api.close()
+        await self.server.close()
+
+    def create_api(
+        self, password: str, hub_protocol: str = SignalRJsonProtocol.name
+    ) -> BrewCreatorAPI:
+        return BrewCreatorAPI(
+            self.server.username,
+            password,
+            self.token_storage,
+            hub_protocol=hub_protocol,
+            api_url=self.server.url,
+            identity_url=self.server.url,
+            write_coalescing_window=0,
+        )
+
+    async def test_login(self):
+        await self.api.verify_username_and_password()
+        self.assertIn(self.token_storage.tokens[0], self.server.access_tokens)
+
+    async def test_login_with_invalid_credentials(self):
+        api = self.create_api("wrong")
+        try:
+            with self.assertRaises(BrewCreatorInvalidCredentialsError):
+                await api.verify_username_and_password()
+        finally:
+            await api.close()
+
+    async def test_list_equipment_across_pages(self):
+        self.server.equipment.update(
+            {f"t{i}": tilt_json(f"t{i}") for i in range(3, 250)}
+        )
+        equipment = await self.api.list_equipment()
+        self.assertEqual(len(equipment), 250)
+        self.assertIsInstance(equipment["f1"], Ferminator)
+        self.assertIsInstance(equipment["t1"], Tilt)
+        self.assertEqual(equipment["f1"].connected_equipment, [equipment["t1"]])
+        self.assertEqual(self.server.requests.count(("GET", "/api/v1.0/equipments")), 3)
+
+    async def test_list_equipment_stops_when_pages_repeat(self):
+        self.server.ignore_page_number = True
+        self.server.equipment.update(
+            {f"t{i}": tilt_json(f"t{i}") for i in range(3, 250)}
+        )
+        equipment = await asyncio.wait_for(self.api.list_equipment(), 5)
+        self.assertEqual(len(equipment), BrewCreatorAPI.EQUIPMENT_PAGE_SIZE)
+        self.assertEqual(self.server.requests.count(("GET", "/api/v1.0/equipments")), 2)
+
+    async def test_unknown_equipment_type_is_skipped(self):
+        self.server.equipment["x1"] = tilt_json(
+            "x1", iotHubBrewEquipmentGroupId="Fermzilla"
+        )
+        equipment = await self.api.list_equipment()
+        self.assertEqual(set(equipment), {"f1", "t1", "t2"})
+
+    async def test_refresh_preserves_unchanged_equipment(self):
+        equipment = dict(await self.api.list_equipment())
+        self.assertEqual(self.api.take_changes().added, {"f1", "t1", "t2"})
+        self.server.equipment["t2"] = tilt_json("t2", sg=1.020)
+        refreshed = await self.api.list_equipment()
+        self.assertIs(refreshed["f1"], equipment["f1"])
+        self.assertIs(refreshed["t1"], equipment["t1"])
+        self.assertIsNot(refreshed["t2"], equipment["t2"])
+        self.assertEqual(self.api.take_changes().modified, {"t2": {"sg"}})
+
+    async def test_unchanged_equipment_list_is_not_decoded_again(self):
+        equipment = dict(await self.api.list_equipment())
+        self.api.take_changes()
+        refreshed = await self.api.list_equipment()
+        self.assertEqual(refreshed, equipment)
+        self.assertFalse(self.api.take_changes())
+        self.assertEqual(
+            self.api.conditional_request_statistics,
+            {"not_modified": 0, "unchanged": 1, "changed": 1},
+        )
+
+    async def test_equipment_json_does_not_hide_changes_from_listing(self):
+        await self.api.list_equipment()
+        self.server.equipment["t1"] = tilt_json("t1", sg=1.0)
+        self.assertEqual((await self.api.equipment_json())["data"][1]["sg"], 1.0)
+        equipment = await self.api.list_equipment()
+        self.assertEqual(equipment["t1"].specific_gravity, 1.0)
+
+    async def test_conditional_requests_with_etags(self):
+        self.server.etags = True
+        await self.api.list_equipment()
+        await self.api.refresh_equipment("t1")
+        self.api.take_changes()
+        equipment = dict(await self.api.list_equipment())
+        await self.api.refresh_equipment("t1")
+        self.assertFalse(self.api.take_changes())
+        self.server.equipment["t1"] = tilt_json("t1", sg=1.020)
+        refreshed = await self.api.refresh_equipment("t1")
+        self.assertEqual(refreshed["t1"].specific_gravity, 1.020)
+        self.assertIsNot(refreshed["t1"], equipment["t1"])
+        self.assertEqual(
+            self.api.take_changes().modified,
+            {"t1": {"sg"}, "f1": {"connectedEquipments"}},
+        )
+        self.assertEqual(
+            self.api.conditional_request_statistics,
+            {"not_modified": 2, "unchanged": 0, "changed": 3},
+        )
+
+    async def test_restored_snapshot_is_replaced_by_listing(self):
+        equipment = self.api.restore_equipment(
+            [ferminator_json("f1", ["t1"]), tilt_json("t1", sg=1.050), tilt_json("t3")]
+        )
+        self.assertEqual(equipment["t1"].specific_gravity, 1.050)
+        self.assertEqual(self.api.take_changes().added, {"f1", "t1", "t3"})
+        equipment = await self.api.list_equipment()
+        self.assertEqual(equipment["t1"].specific_gravity, 1.031)
+        changes = self.api.take_changes()
+        self.assertEqual((changes.added, changes.removed), ({"t2"}, {"t3"}))
+        self.assertEqual(
+            self.api.equipment_snapshot_json(),
+            [e.json for e in equipment.values()],
+        )
+
+    async def test_staggered_logins(self):
+        stagger = ConnectionStagger(spacing=0.2, jitter=0.05)
+        apis = [
+            BrewCreatorAPI(
+                self.server.username,
+                self.server.password,
+                MemoryTokenStorage(),
+                connection_stagger=stagger,
+                api_url=self.server.url,
+                identity_url=self.server.url,
+            )
+            for _ in range(3)
+        ]
+        try:
+            loop = asyncio.get_running_loop()
+            start = loop.time()
+            await asyncio.gather(*(api.list_equipment() for api in apis))
+            self.assertGreaterEqual(loop.time() - start, 0.4)
+        finally:
+            for api in apis:
+                await api.close()
+        self.assertEqual(stagger.statistics["attempts"], 3)
+        self.assertEqual(stagger.statistics["delayed"], 2)
+
+    async def test_refresh_tokens_after_revocation(self):
+        await self.api.list_equipment()
+        self.server.revoke_tokens()
+        equipment = await self.api.list_equipment()
+        self.assertEqual(len(equipment), 3)
+        self.assertEqual(self.server.requests.count(("GET", "/Account/Login")), 2)
+
+    async def test_short_token_lifetime_does_not_renew_continuously(self):
+        self.server.access_token_lifetime = 240
+        await self.api.list_equipment()
+        await asyncio.sleep(0.5)
+        await self.api.list_equipment()
+        self.assertEqual(self.server.requests.count(("POST", "/connect/token")), 1)
+
+    async def test_concurrent_callers_share_token_renewal(self):
+        await self.api.list_equipment()
+        access_token, refresh_token, _ = self.token_storage.tokens
+        self.token_storage.tokens = (
+            access_token,
+            refresh_token,
+            datetime.now() - timedelta(hours=1),
+        )
+        api = self.create_api(self.server.password)
+        try:
+            results = await asyncio.gather(*(api.list_equipment() for _ in range(5)))
+            self.assertTrue(all(len(equipment) == 3 for equipment in results))
+        finally:
+            await api.close()
+        self.assertEqual(self.server.requests.count(("POST", "/connect/token")), 2)
+
+    async def test_deadline_cuts_off_retry(self):
+        async with FaultInjectingProxy(self.server.url) as proxy:
+            api = BrewCreatorAPI(
+                self.server.username,
+                self.server.password,
+                self.token_storage,
+                request_retry_policy=RetryPolicy(
+                    max_attempts=5, base_delay=10, max_delay=10
+                ),
+                api_url=proxy.url,
+                identity_url=proxy.url,
+            )
+            try:
+                await api.list_equipment()
+                proxy.fail_requests(500, count=5, path="/api/v1.0/equipments")
+                start = time.monotonic()
+                # The first retry would be delayed beyond the deadline
+                with (
+                    patch("random.uniform", return_value=10),
+                    self.assertRaises(BrewCreatorTimeoutError),
+                ):
+                    await api.list_equipment(timeout=1)
+                self.assertLess(time.monotonic() - start, 1)
+            finally:
+                await api.close()
+
+    async def test_token_acquired_while_closing_is_not_renewed(self):
+        self.server.access_token_lifetime = 2
+        async with (
+            FaultInjectingProxy(self.server.url) as proxy,
+            aiohttp.ClientSession() as session,
+        ):
+            api = BrewCreatorAPI(
+                self.server.username,
+                self.server.password,
+                self.token_storage,
+                session,
+                api_url=proxy.url,
+                identity_url=proxy.url,
+            )
+            api.TOKEN_MIN_RENEWAL_INTERVAL = 0
+            proxy.latency = 0.1
+            login = asyncio.create_task(api.verify_username_and_password())
+            await asyncio.sleep(0.15)
+            await api.close()
+            await login
+            await asyncio.sleep(1.5)
+        self.assertEqual(self.server.requests.count(("POST", "/connect/token")), 1)
+
+    async def test_set_target_temperature(self):
+        equipment = await self.api.list_equipment()
+        self.assertTrue(await equipment["f1"].set_target_temperature(12.5))
+        self.assertEqual(self.server.puts, [("f1", {"setTemperature": 12.5})])
+        self.assertEqual(self.server.equipment["f1"]["setTemperature"], 12.5)
+
+    async def test_unechoed_write_is_confirmed_by_refresh(self):
+        api = BrewCreatorAPI(
+            self.server.username,
+            self.server.password,
+            self.token_storage,
+            api_url=self.server.url,
+            identity_url=self.server.url,
+            write_coalescing_window=0,
+            optimistic_write_timeout=0.1,
+        )
+        try:
+            equipment = await api.list_equipment()
+            self.assertTrue(await equipment["f1"].set_target_temperature(10.0))
+            with self.assertNoLogs("custom_components.brewcreator.api", "WARNING"):
+                await asyncio.sleep(0.5)
+            equipment = await api.list_equipment()
+            self.assertEqual(equipment["f1"].target_temperature, 10.0)
+            self.assertEqual(
+                self.server.requests.count(("GET", "/api/v1.0/equipments/f1")), 1
+            )
+        finally:
+            await api.close()
+
+    async def test_regulating_write_shows_in_mode(self):
+        equipment = await self.api.list_equipment()
+        self.assertEqual(equipment["f1"].mode, FerminatorMode.COOLING)
+        updates: asyncio.Queue[dict[str, BrewCreatorEquipment]] = asyncio.Queue()
+        await self.api.start_websocket(updates.put)
+        self.assertTrue(await equipment["f1"].set_regulating_temperature(False))
+        # The written value is shown before the server has stopped regulating
+        equipment = await asyncio.wait_for(updates.get(), 5)
+        self.assertEqual(equipment["f1"].mode, FerminatorMode.READY)
+
+    async def test_close_during_write_cancels_writer(self):
+        async with FaultInjectingProxy(self.server.url) as proxy:
+            api = BrewCreatorAPI(
+                self.server.username,
+                self.server.password,
+                self.token_storage,
+                api_url=proxy.url,
+                identity_url=proxy.url,
+                write_coalescing_window=0,
+            )
+            equipment = await api.list_equipment()
+            proxy.latency = 5
+            write = asyncio.create_task(equipment["f1"].set_target_temperature(10.0))
+            await asyncio.sleep(0.2)
+            await api.close()
+            with self.assertRaises(asyncio.CancelledError):
+                await asyncio.wait_for(write, 1)
+
+    async def test_websocket_device_twin_update(self):
+        await self.assert_device_twin_update_received(self.api)
+
+    async def test_websocket_device_twin_update_with_messagepack(self):
+        api = self.create_api(self.server.password, SignalRMessagePackProtocol.name)
+        try:
+            await self.assert_device_twin_update_received(api)
+        finally:
+            await api.close()
+
+    async def test_websocket_gives_up_after_last_attempt(self):
+        async with FaultInjectingProxy(self.server.url) as proxy:
+            api = BrewCreatorAPI(
+                self.server.username,
+                self.server.password,
+                self.token_storage,
+                request_retry_policy=RetryPolicy(
+                    max_attempts=1, base_delay=0.01, max_delay=0.1
+                ),
+                websocket_retry_policy=RetryPolicy(
+                    max_attempts=2,
+                    base_delay=0.01,
+                    max_delay=0.1,
+                    immediate_first_retry=True,
+                ),
+                api_url=proxy.url,
+                identity_url=proxy.url,
+            )
+            try:
+                await api.list_equipment()
+                proxy.fail_requests(500, count=2, path="/telemetry/negotiate")
+                with self.assertLogs("custom_components.brewcreator.api") as logs:
+                    await api.start_websocket(lambda _: asyncio.sleep(0))
+                    await asyncio.sleep(0.3)
+                self.assertTrue(any("Giving up" in line for line in logs.output))
+                self.assertEqual(self.server.websocket_count, 0)
+            finally:
+                await api.close()
+
+    async def test_messagepack_falls_back_to_json_when_rejected(self):
+        self.server.hub_protocols = (SignalRJsonProtocol.name,)
+        api = self.create_api(self.server.password, SignalRMessagePackProtocol.name)
+        try:
+            await self.assert_device_twin_update_received(api)
+            self.assertEqual(api.hub_protocol, SignalRJsonProtocol.name)
+        finally:
+            await api.close()
+
+    async def test_messagepack_falls_back_to_json_without_binary_transfer(self):
+        self.server.transfer_formats = ("Text",)
+        api = self.create_api(self.server.password, SignalRMessagePackProtocol.name)
+        try:
+            await self.assert_device_twin_update_received(api)
+            self.assertEqual(api.hub_protocol, SignalRJsonProtocol.name)
+            self.assertEqual(
+                self.server.requests.count(("POST", "/telemetry/negotiate")), 1
+            )
+        finally:
+            await api.close()
+
+    async def test_start_holds_updates_until_resumed(self):
+        updates: asyncio.Queue[dict[str, BrewCreatorEquipment]] = asyncio.Queue()
+        equipment = await self.api.start(updates.put, hold_updates=True)
+        self.assertEqual(set(equipment), {"f1", "t1", "t2"})
+        while self.server.websocket_count == 0:
+            await asyncio.sleep(0.01)
+        await self.server.push_device_twin({"id": "t1", "sg": 1.012})
+        await asyncio.sleep(0.1)
+        self.assertTrue(updates.empty())
+        self.api.resume_updates()
+        equipment = await asyncio.wait_for(updates.get(), 5)
+        self.assertEqual(equipment["t1"].specific_gravity, 1.012)
+        self.assertEqual(self.server.requests.count(("POST", "/connect/token")), 1)
+        self.assertEqual(
+            set(self.api.startup_timings),
+            {
+                "tokens",
+                "equipment",
+                "websocket_negotiate",
+                "websocket_handshake",
+                "updates_held",
+            },
+        )
+
+    async def test_reconnect_fetches_changes_missed_while_disconnected(self):
+        await self.api.list_equipment()
+        updates: asyncio.Queue[dict[str, BrewCreatorEquipment]] = asyncio.Queue()
+        await self.api.start_websocket(updates.put)
+        while not self.api.websocket_connected:
+            await asyncio.sleep(0.01)
+        # Changed from the app while the WebSocket is down, so never pushed
+        self.server.equipment["f1"]["setTemperature"] = 4.0
+        await self.server.close_websockets()
+        while True:
+            equipment = await asyncio.wait_for(updates.get(), 5)
+            if equipment["f1"].target_temperature == 4.0:
+                break
+        self.assertGreaterEqual(self.api.refresh_statistics["refreshes"], 1)
+
+    async def test_dropped_device_twin_update_triggers_refresh(self):
+        api = BrewCreatorAPI(
+            self.server.username,
+            self.server.password,
+            self.token_storage,
+            websocket_queue_size=2,
+            api_url=self.server.url,
+            identity_url=self.server.url,
+        )
+        release = asyncio.Event()
+        updates: asyncio.Queue[dict[str, BrewCreatorEquipment]] = asyncio.Queue()
+
+        async def on_update(equipment: dict[str, BrewCreatorEquipment]) -> None:
+            await release.wait()
+            await updates.put(equipment)
+
+        try:
+            await api.list_equipment()
+            await api.start_websocket(on_update)
+            while self.server.websocket_count == 0:
+                await asyncio.sleep(0.01)
+            # The first update blocks processing while the others are queued
+            await self.server.push_device_twin({"id": "t1", "sg": 1.010})
+            await asyncio.sleep(0.1)
+            await self.server.push_device_twin({"id": "t2", "sg": 1.005})
+            await self.server.push_device_twin({"id": "t1", "sg": 1.011})
+            await self.server.push_device_twin({"id": "t1", "sg": 1.012})
+            await asyncio.sleep(0.1)
+            release.set()
+            while True:
+                equipment = await asyncio.wait_for(updates.get(), 5)
+                if equipment["t2"].specific_gravity == 1.005:
+                    break
+            self.assertEqual(api.websocket_statistics["dropped"], 1)
+            self.assertEqual(api.refresh_statistics["refreshes"], 1)
+        finally:
+            await api.close()
+
+    async def assert_device_twin_update_received(self, api: BrewCreatorAPI):
+        await api.list_equipment()
+        updates: asyncio.Queue[dict[str, BrewCreatorEquipment]] = asyncio.Queue()
+        await api.start_websocket(updates.put)
+        while self.server.websocket_count == 0:
+            await asyncio.sleep(0.01)
+        await self.server.push_device_twin({"id": "t1", "sg": 1.012})
+        equipment = await asyncio.wait_for(updates.get(), 5)
+        self.assertEqual(equipment["t1"].specific_gravity, 1.012)
+        await api.stop_websocket()
+
+
+if __name__ == "__main__":
+    unittest.main()
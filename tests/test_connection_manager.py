@@ -0,0 +1,91 @@
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from homeassistant.exceptions import ConfigEntryError
+
+from custom_components.brewcreator import (
+    BrewCreatorConnectionManager,
+    async_backfill_unique_id,
+)
+from custom_components.brewcreator.api import BrewCreatorAPI
+from tests.home_assistant import add_config_entry, async_start_home_assistant
+
+
+class ConnectionManagerTestCase(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.config_dir = tempfile.TemporaryDirectory()
+        self.hass = await async_start_home_assistant(self.config_dir.name)
+        self.manager = BrewCreatorConnectionManager.get(self.hass)
+
+    async def asyncTearDown(self):
+        for entry in self.hass.config_entries.async_entries():
+            await self.manager.async_release(entry)
+        await self.hass.async_stop(force=True)
+        self.config_dir.cleanup()
+
+    def test_manager_is_shared(self):
+        self.assertIs(self.manager, BrewCreatorConnectionManager.get(self.hass))
+
+    async def test_account_is_used_by_single_entry(self):
+        first = add_config_entry(self.hass, "brewer@example.com")
+        duplicate = add_config_entry(self.hass, " Brewer@Example.com")
+        self.manager.create_coordinator(first)
+
+        with self.assertRaises(ConfigEntryError):
+            self.manager.create_coordinator(duplicate)
+
+        # Releasing the duplicate must not close the client of the first entry
+        await self.manager.async_release(duplicate)
+        self.assertEqual(
+            [client["entry_id"] for client in self.manager.health["clients"]],
+            [first.entry_id],
+        )
+
+        await self.manager.async_release(first)
+        self.assertEqual(self.manager.health["accounts"], 0)
+        self.manager.create_coordinator(duplicate)
+        self.assertEqual(self.manager.health["accounts"], 1)
+
+    async def test_accounts_share_connection_stagger(self):
+        entries = [
+            add_config_entry(self.hass, "first@example.com"),
+            add_config_entry(self.hass, "second@example.com"),
+        ]
+        with patch(
+            "custom_components.brewcreator.BrewCreatorAPI", wraps=BrewCreatorAPI
+        ) as api_class:
+            for entry in entries:
+                self.manager.create_coordinator(entry)
+
+        first, second = api_class.call_args_list
+        self.assertIsNotNone(first.kwargs["connection_stagger"])
+        self.assertIs(
+            first.kwargs["connection_stagger"], second.kwargs["connection_stagger"]
+        )
+        # Token storage is the third positional argument
+        self.assertIsNot(first.args[2], second.args[2])
+        health = self.manager.health
+        self.assertEqual(health["accounts"], 2)
+        self.assertEqual(
+            {client["entry_id"] for client in health["clients"]},
+            {entry.entry_id for entry in entries},
+        )
+
+    async def test_backfill_unique_id(self):
+        legacy = add_config_entry(self.hass, " Brewer@Example.com")
+        async_backfill_unique_id(self.hass, legacy)
+        self.assertEqual(legacy.unique_id, "brewer@example.com")
+
+        # A duplicate entry of the same account keeps no unique ID
+        duplicate = add_config_entry(self.hass, "brewer@example.com")
+        async_backfill_unique_id(self.hass, duplicate)
+        self.assertIsNone(duplicate.unique_id)
+
+        existing = add_config_entry(self.hass, "other@example.com", unique_id="kept")
+        async_backfill_unique_id(self.hass, existing)
+        self.assertEqual(existing.unique_id, "kept")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from custom_components.brewcreator.api import BrewCreatorAPI, BrewCreatorTimeoutError
+from custom_components.brewcreator.coordinator import (
+    BrewCreatorDataUpdateCoordinator,
+    EquipmentListenerContext,
+)
+from tests.fake_brewcreator import (
+    FakeBrewCreator,
+    MemoryTokenStorage,
+    ferminator_json,
+    tilt_json,
+)
+from tests.home_assistant import add_config_entry, async_start_home_assistant
+
+
+class CoordinatorRoutingTestCase(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.config_dir = tempfile.TemporaryDirectory()
+        self.hass = await async_start_home_assistant(self.config_dir.name)
+        self.server = FakeBrewCreator(
+            [ferminator_json("f1", ["t1"]), tilt_json("t1"), tilt_json("t2")]
+        )
+        await self.server.start()
+        self.api = BrewCreatorAPI(
+            self.server.username,
+            self.server.password,
+            MemoryTokenStorage(),
+            api_url=self.server.url,
+            identity_url=self.server.url,
+            write_coalescing_window=0,
+        )
+        entry = add_config_entry(
+            self.hass, self.server.username, password=self.server.password
+        )
+        self.coordinator = BrewCreatorDataUpdateCoordinator(self.hass, self.api, entry)
+        self.notified: list[str] = []
+        self.remove_listeners = [
+            self.add_listener(
+                "t1 gravity", EquipmentListenerContext("t1", frozenset({"sg"}))
+            ),
+            self.add_listener(
+                "t1 temperature",
+                EquipmentListenerContext("t1", frozenset({"actualTemperature"})),
+            ),
+            self.add_listener(
+                "t2 gravity", EquipmentListenerContext("t2", frozenset({"sg"}))
+            ),
+            self.add_listener("unrouted", None),
+        ]
+        await self.coordinator.async_refresh()
+        self.coordinator.async_resume_updates()
+        self.notified.clear()
+
+    async def asyncTearDown(self):
+        for remove_listener in self.remove_listeners:
+            remove_listener()
+        await self.coordinator.close()
+        await self.server.close()
+        await self.hass.async_stop(force=True)
+        self.config_dir.cleanup()
+
+    def add_listener(self, name: str, context: EquipmentListenerContext | None):
+        return self.coordinator.async_add_listener(
+            lambda: self.notified.append(name), context
+        )
+
+    async def test_change_notifies_listeners_of_changed_fields(self):
+        self.server.equipment["t1"]["sg"] = 1.020
+        await self.coordinator.async_refresh()
+
+        self.assertCountEqual(self.notified, ["t1 gravity", "unrouted"])
+        self.assertEqual(self.coordinator.routing_statistics["listeners_skipped"], 2)
+
+    async def test_failed_refresh_notifies_all_listeners(self):
+        all_listeners = ["t1 gravity", "t1 temperature", "t2 gravity", "unrouted"]
+        with patch.object(
+            self.api, "list_equipment", side_effect=BrewCreatorTimeoutError("timeout")
+        ):
+            await self.coordinator.async_refresh()
+        self.assertFalse(self.coordinator.last_update_success)
+        self.assertCountEqual(self.notified, all_listeners)
+
+        # Entities become available again when the API recovers
+        self.notified.clear()
+        await self.coordinator.async_refresh()
+        self.assertTrue(self.coordinator.last_update_success)
+        self.assertCountEqual(self.notified, all_listeners)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+import unittest
+from datetime import UTC, datetime
+
+from custom_components.brewcreator.api import (
+    EquipmentType,
+    FermentationType,
+    Ferminator,
+    FerminatorMode,
+    FerminatorStatus,
+    Tilt,
+    TiltColor,
+    _link_connected_equipment,
+)
+from tests.fake_brewcreator import ferminator_json, tilt_json
+
+
+class EquipmentTestCase(unittest.TestCase):
+    def test_ferminator_fields(self):
+        ferminator = Ferminator(None, ferminator_json("f1", ["t1"]))
+        self.assertEqual(ferminator.id, "f1")
+        self.assertEqual(ferminator.equipment_type, EquipmentType.FERMINATOR)
+        self.assertEqual(ferminator.mode, FerminatorMode.COOLING)
+        self.assertEqual(ferminator.status, FerminatorStatus.START)
+        self.assertEqual(ferminator.sw_version, "1.2.3")
+        self.assertTrue(ferminator.is_connected)
+        self.assertEqual(ferminator.last_activity_time, datetime(2024, 5, 1, 12, 0))
+
+    def test_batch_info(self):
+        ferminator = Ferminator(None, ferminator_json("f1"))
+        batch_info = ferminator.batch_info
+        self.assertIs(ferminator.batch_info, batch_info)
+        self.assertEqual(batch_info.brew_name, "Pale Ale")
+        self.assertEqual(batch_info.brew_date, datetime(2024, 4, 28))
+        self.assertEqual(batch_info.fermentation_type, FermentationType.TOP)
+
+    def test_no_batch_info_without_brew_name(self):
+        self.assertIsNone(
+            Ferminator(None, ferminator_json("f1", brewName="")).batch_info
+        )
+
+    def test_unknown_enum_values(self):
+        ferminator = Ferminator(
+            None, ferminator_json("f1", lProcess="Defrosting", fermented=None)
+        )
+        self.assertIsNone(ferminator.mode)
+        self.assertIsNone(ferminator.batch_info.fermentation_type)
+
+    def test_unknown_enum_value_is_logged_once(self):
+        with self.assertLogs("custom_components.brewcreator.api") as logs:
+            for _ in range(3):
+                tilt = Tilt(None, tilt_json("t1", color="Teal"))
+        self.assertIsNone(tilt.color)
+        self.assertEqual(len(logs.output), 1)
+
+    def test_tilt_last_activity_time_is_copenhagen_time(self):
+        tilt = Tilt(None, tilt_json("t1", lastActivityTime="2024-07-01T14:00:00"))
+        self.assertEqual(
+            tilt.last_activity_time, datetime(2024, 7, 1, 12, 0, tzinfo=UTC)
+        )
+        self.assertEqual(tilt.color, TiltColor.RED)
+
+    def test_ferminator_temperature_from_connected_tilt(self):
+        equipment = {
+            "f1": Ferminator(None, ferminator_json("f1", ["t1", "t2", "t3"])),
+            "t1": Tilt(None, tilt_json("t1", sg=None)),
+            "t2": Tilt(None, tilt_json("t2", actualTemperature=16.0)),
+        }
+        _link_connected_equipment(equipment)
+        ferminator = equipment["f1"]
+        self.assertEqual(
+            ferminator.connected_equipment, [equipment["t1"], equipment["t2"]]
+        )
+        self.assertIs(ferminator.temperature_source, equipment["t2"])
+        self.assertEqual(ferminator.actual_temperature, 16.0)
+        self.assertEqual(ferminator.actual_temperature_builtin_probe, 18.5)
+
+    def test_ferminator_temperature_without_connected_tilt(self):
+        equipment = {"f1": Ferminator(None, ferminator_json("f1", ["t1"]))}
+        _link_connected_equipment(equipment)
+        self.assertIsNone(equipment["f1"].temperature_source)
+        self.assertEqual(equipment["f1"].actual_temperature, 18.5)
+
+    def test_equipment_is_slotted(self):
+        tilt = Tilt(None, tilt_json("t1"))
+        with self.assertRaises(AttributeError):
+            tilt.extra = 1
+        self.assertEqual(tilt.json["sg"], 1.031)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import unittest
+
+from custom_components.brewcreator.api import (
+    BrewCreatorEquipment,
+    EquipmentChanges,
+    EquipmentRegistry,
+    Ferminator,
+    Tilt,
+)
+from tests.fake_brewcreator import ferminator_json, tilt_json
+
+
+def create_equipment(data: dict) -> BrewCreatorEquipment:
+    if data["iotHubBrewEquipmentGroupId"] == "Ferminator":
+        return Ferminator(None, data)
+    return Tilt(None, data)
+
+
+class EquipmentRegistryTestCase(unittest.TestCase):
+    def setUp(self):
+        self.registry = EquipmentRegistry(create_equipment)
+        self.changes = self.registry.update(
+            [ferminator_json("f1", ["t1"]), tilt_json("t1"), tilt_json("t2")],
+            complete=True,
+        )
+
+    def test_initial_update_adds_everything(self):
+        self.assertEqual(self.changes.added, {"f1", "t1", "t2"})
+        self.assertIs(
+            self.registry.equipment["f1"].temperature_source,
+            self.registry.equipment["t1"],
+        )
+
+    def test_unchanged_equipment_keeps_identity(self):
+        before = dict(self.registry.equipment)
+        changes = self.registry.update(
+            [ferminator_json("f1", ["t1"]), tilt_json("t1"), tilt_json("t2")],
+            complete=True,
+        )
+        self.assertFalse(changes)
+        for equipment_id, equipment in before.items():
+            self.assertIs(self.registry.equipment[equipment_id], equipment)
+
+    def test_modified_fields(self):
+        t2 = self.registry.equipment["t2"]
+        changes = self.registry.update([tilt_json("t2", sg=1.010, abv=5.5)])
+        self.assertEqual(changes.modified, {"t2": {"sg", "abv"}})
+        self.assertIsNot(self.registry.equipment["t2"], t2)
+        self.assertEqual(self.registry.equipment["t2"].specific_gravity, 1.010)
+
+    def test_connected_ferminator_is_relinked(self):
+        ferminator = self.registry.equipment["f1"]
+        changes = self.registry.update([tilt_json("t1", actualTemperature=12.0)])
+        self.assertEqual(
+            changes.modified,
+            {"t1": {"actualTemperature"}, "f1": {"connectedEquipments"}},
+        )
+        self.assertIs(self.registry.equipment["f1"], ferminator)
+        self.assertEqual(ferminator.actual_temperature, 12.0)
+
+    def test_complete_update_removes_missing_equipment(self):
+        changes = self.registry.update(
+            [ferminator_json("f1", ["t1"]), tilt_json("t2")], complete=True
+        )
+        self.assertEqual(changes.removed, {"t1"})
+        self.assertEqual(changes.modified, {"f1": {"connectedEquipments"}})
+        self.assertNotIn("t1", self.registry.equipment)
+        self.assertIsNone(self.registry.equipment["f1"].temperature_source)
+
+
+class EquipmentChangesTestCase(unittest.TestCase):
+    def test_merge(self):
+        changes = EquipmentChanges()
+        first = EquipmentChanges()
+        first.add("t3")
+        first.modify("t1", ["sg"])
+        second = EquipmentChanges()
+        second.modify("t1", ["abv"])
+        second.modify("t3", ["sg"])
+        second.remove("t2")
+        changes.update(first)
+        changes.update(second)
+        self.assertEqual(changes.added, {"t3"})
+        self.assertEqual(changes.removed, {"t2"})
+        self.assertEqual(changes.modified, {"t1": {"sg", "abv"}})
+
+    def test_added_then_removed(self):
+        changes = EquipmentChanges()
+        changes.add("t1")
+        changes.remove("t1")
+        self.assertFalse(changes)
+
+
+if __name__ == "__main__":
+    unittest.main()
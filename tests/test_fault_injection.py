@@ -0,0 +1,45 @@
+import unittest
+
+from custom_components.brewcreator.api import RetryPolicy
+from tests import fault_injection
+
+
+def fast_retries() -> dict[str, RetryPolicy]:
+    return {
+        "request_retry_policy": RetryPolicy(
+            max_attempts=5, base_delay=0.01, max_delay=0.1
+        ),
+        "websocket_retry_policy": RetryPolicy(
+            max_attempts=None,
+            base_delay=0.01,
+            max_delay=0.1,
+            immediate_first_retry=True,
+        ),
+    }
+
+
+class FaultInjectionTestCase(unittest.IsolatedAsyncioTestCase):
+    async def test_recovers_from_latency(self):
+        result = await fault_injection.latency(0.2, **fast_retries())
+        self.assertGreaterEqual(result.time_to_recover, 0.2)
+
+    async def test_recovers_from_server_errors(self):
+        result = await fault_injection.server_errors(3, **fast_retries())
+        self.assertLess(result.time_to_recover, 5)
+
+    async def test_recovers_from_unauthorized(self):
+        result = await fault_injection.unauthorized(**fast_retries())
+        self.assertLess(result.time_to_recover, 5)
+
+    async def test_recovers_from_websocket_close(self):
+        result = await fault_injection.websocket_close(**fast_retries())
+        self.assertLess(result.time_to_recover, 5)
+        self.assertLess(result.staleness_window, 5)
+
+    async def test_ignores_malformed_frames(self):
+        result = await fault_injection.malformed_frames(**fast_retries())
+        self.assertLess(result.staleness_window, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
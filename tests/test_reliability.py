@@ -0,0 +1,278 @@
+import asyncio
+import time
+import unittest
+
+from custom_components.brewcreator.api import (
+    BoundedMessageQueue,
+    BrewCreatorCircuitOpenError,
+    BrewCreatorError,
+    CircuitBreaker,
+    CircuitBreakerState,
+    CoalescingRefreshScheduler,
+    PendingWrites,
+    RetryPolicy,
+    TokenBucketRateLimiter,
+    WriteCoalescer,
+)
+
+
+class BoundedMessageQueueTestCase(unittest.IsolatedAsyncioTestCase):
+    async def test_drops_oldest_message_when_full(self):
+        dropped = []
+        queue = BoundedMessageQueue(2, on_drop=lambda: dropped.append(True))
+        for message in ("a", "b", "c"):
+            queue.put(message)
+        self.assertEqual(await queue.get(), "b")
+        self.assertEqual(await queue.get(), "c")
+        self.assertEqual(dropped, [True])
+        statistics = queue.statistics
+        self.assertEqual(
+            (statistics["received"], statistics["dropped"], statistics["max_depth"]),
+            (3, 1, 2),
+        )
+
+    async def test_clear_drops_unprocessed_messages(self):
+        dropped = []
+        queue = BoundedMessageQueue(5, on_drop=lambda: dropped.append(True))
+        queue.put("a")
+        queue.put("b")
+        queue.clear()
+        self.assertEqual(dropped, [True, True])
+        self.assertEqual(queue.statistics["depth"], 0)
+
+    async def test_get_waits_for_message(self):
+        queue = BoundedMessageQueue(2)
+        get = asyncio.create_task(queue.get())
+        await asyncio.sleep(0)
+        self.assertFalse(get.done())
+        queue.put("a")
+        self.assertEqual(await asyncio.wait_for(get, 1), "a")
+
+
+class WriteCoalescerTestCase(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.requests: list[tuple[str, dict]] = []
+
+    async def _write(self, equipment_id: str, payload: dict) -> bool:
+        self.requests.append((equipment_id, payload))
+        return True
+
+    async def test_merges_writes_with_last_writer_winning(self):
+        coalescer = WriteCoalescer(self._write, 0.05)
+        results = await asyncio.gather(
+            coalescer.write("f1", {"setTemperature": 10, "fanSpeed": 50}),
+            coalescer.write("f1", {"setTemperature": 12}),
+            coalescer.write("t1", {"sg": 1.010}),
+        )
+        self.assertEqual(results, [True, True, True])
+        self.assertEqual(
+            sorted(self.requests),
+            [("f1", {"setTemperature": 12, "fanSpeed": 50}), ("t1", {"sg": 1.010})],
+        )
+        self.assertEqual(
+            coalescer.statistics, {"writes": 3, "withdrawn_writes": 0, "requests": 2}
+        )
+
+    async def test_sends_requests_for_same_equipment_in_order(self):
+        in_flight = asyncio.Event()
+        release = asyncio.Event()
+
+        async def write(equipment_id: str, payload: dict) -> bool:
+            in_flight.set()
+            await release.wait()
+            return await self._write(equipment_id, payload)
+
+        coalescer = WriteCoalescer(write, 0)
+        first = asyncio.create_task(coalescer.write("f1", {"setTemperature": 10}))
+        await in_flight.wait()
+        # Written while the first request is in flight, so sent in a second request
+        second = asyncio.create_task(coalescer.write("f1", {"setTemperature": 12}))
+        await asyncio.sleep(0.01)
+        release.set()
+        self.assertEqual(await asyncio.gather(first, second), [True, True])
+        self.assertEqual(
+            self.requests,
+            [("f1", {"setTemperature": 10}), ("f1", {"setTemperature": 12})],
+        )
+
+    async def test_failed_request_fails_all_merged_writes(self):
+        async def write(equipment_id: str, payload: dict) -> bool:
+            raise BrewCreatorError("Failed")
+
+        coalescer = WriteCoalescer(write, 0.01)
+        results = await asyncio.gather(
+            coalescer.write("f1", {"setTemperature": 10}),
+            coalescer.write("f1", {"fanSpeed": 50}),
+            return_exceptions=True,
+        )
+        self.assertTrue(all(isinstance(r, BrewCreatorError) for r in results))
+
+    async def test_cancelled_write_is_not_sent(self):
+        coalescer = WriteCoalescer(self._write, 0.1)
+        with self.assertRaises(TimeoutError):
+            await asyncio.wait_for(coalescer.write("f1", {"setTemperature": 10}), 0.01)
+        self.assertTrue(await coalescer.write("f1", {"fanSpeed": 50}))
+        self.assertEqual(self.requests, [("f1", {"fanSpeed": 50})])
+        self.assertEqual(coalescer.statistics["withdrawn_writes"], 1)
+
+    async def test_batch_of_cancelled_writes_is_dropped(self):
+        coalescer = WriteCoalescer(self._write, 0.05)
+        with self.assertRaises(TimeoutError):
+            await asyncio.wait_for(coalescer.write("f1", {"setTemperature": 10}), 0.01)
+        await asyncio.sleep(0.1)
+        self.assertEqual(self.requests, [])
+        self.assertEqual(coalescer.statistics["requests"], 0)
+
+
+class CircuitBreakerTestCase(unittest.IsolatedAsyncioTestCase):
+    async def test_opens_after_consecutive_failures(self):
+        breaker = CircuitBreaker(failure_threshold=3, reset_timeout=60)
+        for _ in range(2):
+            breaker.before_request()
+            breaker.record_failure()
+        breaker.before_request()
+        breaker.record_success()
+        self.assertEqual(breaker.state, CircuitBreakerState.CLOSED)
+        for _ in range(3):
+            breaker.before_request()
+            breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreakerState.OPEN)
+        with self.assertRaises(BrewCreatorCircuitOpenError):
+            breaker.before_request()
+        self.assertEqual(breaker.statistics["rejected"], 1)
+
+    async def test_closes_after_successful_trial(self):
+        breaker = self._open_breaker()
+        await asyncio.sleep(0.06)
+        breaker.before_request()
+        self.assertEqual(breaker.state, CircuitBreakerState.HALF_OPEN)
+        # Only a single trial request is let through
+        with self.assertRaises(BrewCreatorCircuitOpenError):
+            breaker.before_request()
+        breaker.record_success()
+        self.assertEqual(breaker.state, CircuitBreakerState.CLOSED)
+        breaker.before_request()
+
+    async def test_opens_again_after_failed_trial(self):
+        breaker = self._open_breaker()
+        await asyncio.sleep(0.06)
+        breaker.before_request()
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreakerState.OPEN)
+        with self.assertRaises(BrewCreatorCircuitOpenError):
+            breaker.before_request()
+        self.assertEqual(breaker.statistics["times_opened"], 2)
+
+    def _open_breaker(self) -> CircuitBreaker:
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+        breaker.before_request()
+        breaker.record_failure()
+        return breaker
+
+
+class TokenBucketRateLimiterTestCase(unittest.IsolatedAsyncioTestCase):
+    async def test_delays_requests_beyond_capacity(self):
+        limiter = TokenBucketRateLimiter(rate=20, capacity=3)
+        start = time.monotonic()
+        for _ in range(5):
+            await limiter.acquire()
+        self.assertGreaterEqual(time.monotonic() - start, 0.09)
+        statistics = limiter.statistics
+        self.assertEqual((statistics["acquired"], statistics["delayed"]), (5, 2))
+
+
+class RetryPolicyTestCase(unittest.TestCase):
+    def test_delays_stay_within_backoff_bounds(self):
+        policy = RetryPolicy(max_attempts=None, base_delay=1, max_delay=8)
+        for _ in range(100):
+            for attempt, bound in ((1, 1), (2, 2), (3, 4), (4, 8), (10, 8)):
+                self.assertTrue(0 <= policy.next_delay(attempt) <= bound)
+
+    def test_immediate_first_retry(self):
+        policy = RetryPolicy(
+            max_attempts=None, base_delay=1, max_delay=8, immediate_first_retry=True
+        )
+        self.assertEqual(policy.next_delay(1), 0)
+        self.assertLessEqual(policy.next_delay(2), 1)
+
+    def test_no_delay_after_last_attempt(self):
+        policy = RetryPolicy(max_attempts=3, base_delay=1, max_delay=8)
+        self.assertIsNotNone(policy.next_delay(2))
+        self.assertIsNone(policy.next_delay(3))
+        self.assertEqual(policy.statistics["exhausted"], 1)
+
+
+class CoalescingRefreshSchedulerTestCase(unittest.IsolatedAsyncioTestCase):
+    async def test_merges_requests_into_one_trailing_refresh(self):
+        started = asyncio.Event()
+        release = asyncio.Event()
+        refreshes = 0
+
+        async def refresh() -> None:
+            nonlocal refreshes
+            refreshes += 1
+            started.set()
+            await release.wait()
+
+        scheduler = CoalescingRefreshScheduler(refresh)
+        scheduler.request_refresh()
+        await started.wait()
+        for _ in range(3):
+            scheduler.request_refresh()
+        release.set()
+        while refreshes < 2:
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.05)
+        self.assertEqual(refreshes, 2)
+        self.assertEqual(
+            scheduler.statistics,
+            {"requests": 4, "merged_requests": 2, "refreshes": 2},
+        )
+
+    async def test_spaces_refreshes_by_min_interval(self):
+        times: list[float] = []
+
+        async def refresh() -> None:
+            times.append(time.monotonic())
+
+        scheduler = CoalescingRefreshScheduler(refresh, min_interval=0.1)
+        scheduler.request_refresh()
+        await asyncio.sleep(0.01)
+        scheduler.request_refresh()
+        while len(times) < 2:
+            await asyncio.sleep(0.01)
+        self.assertGreaterEqual(times[1] - times[0], 0.09)
+
+
+class PendingWritesTestCase(unittest.TestCase):
+    def test_confirm_clears_fields_reported_by_server(self):
+        writes = PendingWrites(30)
+        writes.add("f1", {"setTemperature": 10, "fanSpeed": 50})
+        confirmed = writes.confirm({"f1": {"setTemperature": 10, "fanSpeed": 0}})
+        self.assertEqual(confirmed, {"f1": {"setTemperature": 10}})
+        self.assertEqual(writes.fields(), {"f1": {"fanSpeed": 50}})
+
+    def test_expire_returns_unconfirmed_fields_past_deadline(self):
+        writes = PendingWrites(30)
+        writes.add("f1", {"setTemperature": 10})
+        deadline = writes.next_deadline()
+        self.assertEqual(writes.due(deadline - 1), set())
+        self.assertEqual(writes.expire(deadline - 1), {})
+        self.assertEqual(writes.due(deadline), {"f1"})
+        self.assertEqual(writes.expire(deadline), {"f1": {"setTemperature": 10}})
+        self.assertFalse(writes)
+        self.assertIsNone(writes.next_deadline())
+
+    def test_remove_keeps_later_write(self):
+        writes = PendingWrites(30)
+        writes.add("f1", {"setTemperature": 10})
+        writes.add("f1", {"setTemperature": 12})
+        # Rolling back the first write does not drop the second
+        writes.remove("f1", {"setTemperature": 10})
+        self.assertEqual(writes.fields(), {"f1": {"setTemperature": 12}})
+        writes.remove("f1", {"setTemperature": 12})
+        self.assertFalse(writes)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,118 @@
+import unittest
+
+import msgpack
+
+from custom_components.brewcreator.api import (
+    SignalRJsonProtocol,
+    SignalRMessagePackProtocol,
+    SignalRMessageType,
+)
+
+
+class SignalRJsonProtocolTestCase(unittest.TestCase):
+    def setUp(self):
+        self.protocol = SignalRJsonProtocol()
+
+    def test_parses_batched_records(self):
+        messages = self.protocol.parse_messages(
+            '{"type":6}\x1e'
+            '{"type":1,"target":"devicetwin","arguments":[{"id":"a"}]}\x1e'
+            '{"type":3,"invocationId":"1","error":"failed"}\x1e'
+            '{"type":7,"error":"bye"}\x1e'
+        )
+        self.assertEqual(
+            [m.message_type for m in messages],
+            [
+                SignalRMessageType.PING,
+                SignalRMessageType.INVOCATION,
+                SignalRMessageType.COMPLETION,
+                SignalRMessageType.CLOSE,
+            ],
+        )
+        self.assertEqual(messages[1].target, "devicetwin")
+        self.assertEqual(messages[1].arguments, [{"id": "a"}])
+        self.assertEqual(messages[2].invocation_id, "1")
+        self.assertEqual(messages[2].error, "failed")
+
+    def test_parses_record_without_trailing_separator(self):
+        messages = self.protocol.parse_messages('{"type":6}')
+        self.assertEqual(len(messages), 1)
+        self.assertEqual(messages[0].message_type, SignalRMessageType.PING)
+
+    def test_skips_malformed_records(self):
+        messages = self.protocol.parse_messages('{"type":\x1e{"foo":1}\x1e{"type":6}\x1e')
+        self.assertEqual([m.message_type for m in messages], [SignalRMessageType.PING])
+
+    def test_handshake(self):
+        self.assertEqual(
+            self.protocol.handshake_request(), '{"protocol":"json","version":1}\x1e'
+        )
+        self.assertEqual(self.protocol.parse_handshake_response("{}\x1e"), (True, ""))
+        self.assertEqual(self.protocol.parse_handshake_response("{}"), (True, ""))
+        self.assertFalse(
+            self.protocol.parse_handshake_response(
+                '{"error":"Unsupported protocol"}\x1e'
+            )[0]
+        )
+        self.assertFalse(self.protocol.parse_handshake_response(None)[0])
+
+    def test_encode(self):
+        self.assertEqual(self.protocol.encode_ping(), '{"type":6}\x1e')
+        self.assertEqual(
+            self.protocol.encode_invocation("SubscribeToUser", ["devicetwin"]),
+            '{"arguments":["devicetwin"],"target":"SubscribeToUser","type":1}\x1e',
+        )
+
+
+class SignalRMessagePackProtocolTestCase(unittest.TestCase):
+    def setUp(self):
+        self.protocol = SignalRMessagePackProtocol()
+
+    def test_parses_batched_messages(self):
+        frame = (
+            self.protocol.encode_ping()
+            + self.protocol.encode_invocation("devicetwin", [{"id": "a" * 200}])
+            + self._encode([3, {}, "1", 1, "failed"])
+            + self._encode([7, "bye", True])
+        )
+        messages = self.protocol.parse_messages(frame)
+        self.assertEqual(
+            [m.message_type for m in messages],
+            [
+                SignalRMessageType.PING,
+                SignalRMessageType.INVOCATION,
+                SignalRMessageType.COMPLETION,
+                SignalRMessageType.CLOSE,
+            ],
+        )
+        self.assertEqual(messages[1].target, "devicetwin")
+        self.assertEqual(messages[1].arguments, [{"id": "a" * 200}])
+        self.assertEqual(messages[2].error, "failed")
+        self.assertEqual(messages[3].error, "bye")
+
+    def test_skips_truncated_message(self):
+        frame = self.protocol.encode_ping() + self.protocol.encode_ping()[:-1]
+        messages = self.protocol.parse_messages(frame)
+        self.assertEqual([m.message_type for m in messages], [SignalRMessageType.PING])
+
+    def test_skips_text_frame(self):
+        self.assertEqual(self.protocol.parse_messages('{"type":6}\x1e'), [])
+
+    def test_handshake_response_with_trailing_messages(self):
+        accepted, remainder = self.protocol.parse_handshake_response(
+            b"{}\x1e" + self.protocol.encode_ping()
+        )
+        self.assertTrue(accepted)
+        self.assertEqual(
+            [m.message_type for m in self.protocol.parse_messages(remainder)],
+            [SignalRMessageType.PING],
+        )
+
+    @staticmethod
+    def _encode(message: list) -> bytes:
+        payload = msgpack.packb(message)
+        return bytes([len(payload)]) + payload
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import tempfile
+import unittest
+from datetime import datetime
+
+from homeassistant.const import EVENT_HOMEASSISTANT_FINAL_WRITE
+from homeassistant.helpers.storage import Store
+
+from custom_components.brewcreator.const import DOMAIN
+from custom_components.brewcreator.token_store import BrewCreatorTokenStore
+from tests.home_assistant import add_config_entry, async_start_home_assistant
+
+EXPIRE_TIME = datetime(2026, 1, 1, 12, 0)
+NO_TOKENS = (None, None, None)
+
+
+def legacy_tokens(access_token: str) -> dict[str, str]:
+    return {
+        "access_token": access_token,
+        "refresh_token": f"refresh-{access_token}",
+        "expire_time": EXPIRE_TIME.isoformat(),
+    }
+
+
+class TokenStoreTestCase(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.config_dir = tempfile.TemporaryDirectory()
+        self.hass = await async_start_home_assistant(self.config_dir.name)
+        self.legacy_store = Store(self.hass, 1, f"{DOMAIN}_tokens")
+
+    async def asyncTearDown(self):
+        await self.hass.async_stop(force=True)
+        self.config_dir.cleanup()
+
+    async def flush(self):
+        """Write the pending delayed saves, like Home Assistant does on stop."""
+        self.hass.bus.async_fire(EVENT_HOMEASSISTANT_FINAL_WRITE)
+        await self.hass.async_block_till_done()
+
+    async def load_saved_tokens(self, username: str):
+        """Load tokens from disk, bypassing the store cached for the account."""
+        return await BrewCreatorTokenStore(self.hass, username).load_tokens()
+
+    async def test_legacy_tokens_move_to_account_once(self):
+        add_config_entry(self.hass, "Brewer@example.com")
+        await self.legacy_store.async_save(legacy_tokens("first"))
+
+        await BrewCreatorTokenStore.async_migrate_legacy(self.hass)
+        await self.flush()
+        expected = ("first", "refresh-first", EXPIRE_TIME)
+        store = BrewCreatorTokenStore.for_account(self.hass, "brewer@example.com")
+        self.assertEqual(await store.load_tokens(), expected)
+        self.assertEqual(await self.load_saved_tokens("brewer@example.com"), expected)
+        self.assertIsNone(await Store(self.hass, 1, f"{DOMAIN}_tokens").async_load())
+
+        # Later setups do not migrate again
+        await self.legacy_store.async_save(legacy_tokens("second"))
+        await BrewCreatorTokenStore.async_migrate_legacy(self.hass)
+        await self.flush()
+        self.assertEqual(await self.load_saved_tokens("brewer@example.com"), expected)
+
+    async def test_legacy_tokens_of_unknown_account_are_dropped(self):
+        add_config_entry(self.hass, "first@example.com")
+        add_config_entry(self.hass, "second@example.com")
+        await self.legacy_store.async_save(legacy_tokens("first"))
+
+        await BrewCreatorTokenStore.async_migrate_legacy(self.hass)
+        await self.flush()
+        self.assertEqual(await self.load_saved_tokens("first@example.com"), NO_TOKENS)
+        self.assertEqual(await self.load_saved_tokens("second@example.com"), NO_TOKENS)
+        self.assertIsNone(await Store(self.hass, 1, f"{DOMAIN}_tokens").async_load())
+
+    async def test_remove_only_deletes_tokens_of_account(self):
+        first = BrewCreatorTokenStore.for_account(self.hass, "first@example.com")
+        second = BrewCreatorTokenStore.for_account(self.hass, "second@example.com")
+        await first.save_tokens("first", "refresh-first", EXPIRE_TIME)
+        await second.save_tokens("second", "refresh-second", EXPIRE_TIME)
+        await self.flush()
+
+        await first.remove()
+        await self.flush()
+        self.assertEqual(await first.load_tokens(), NO_TOKENS)
+        self.assertEqual(await self.load_saved_tokens("first@example.com"), NO_TOKENS)
+        self.assertEqual(
+            await self.load_saved_tokens("second@example.com"),
+            ("second", "refresh-second", EXPIRE_TIME),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()